@@ -1,35 +1,108 @@
-from flask import Flask, render_template, request, redirect, url_for
+from flask import Flask, render_template, request, redirect, url_for, jsonify, stream_with_context
 from config import config 
-from models import db, Region, Pays, Universite, Classement 
+from models import db, init_chargement_strict
+from services import calculer_tableau_bord
+from services.cache import cache
+from services.bitmaps import obtenir_index_bitmaps
+from services.colonnes import moteur_colonnes_actif, obtenir_magasin
+from services.dimensions import obtenir_dimensions
+from services.export import EXPORTS, FORMATS_EXPORT
+from services.fragments import init_fragments
+from services.plein_texte import suggerer_universites
+from services.profils import profil_classement
+from services.recits import RECIT_VIDE
+from services.centiles import centiles_classements
+from services.similaires import obtenir_index_similaires
+from services.comparaison import comparer_universites, donnees_comparaison, lire_ids
+from services.trigrammes import obtenir_index_trigrammes
+from services.graphiques import GRAPHIQUES
+from services.curseurs import ENTIER_MAX, ENTIER_MIN, decoder_curseur
+from services.recherche import normaliser_filtres, normaliser_tri, page_recherche, page_triee
+from services.schema import mettre_a_niveau_base, preparer_base
 import os
 import binascii
-from sqlalchemy import and_, func, case
+import click
+from collections import namedtuple
 from math import ceil 
 
 # --- Imports nécessaires pour la recherche (Flask-WTF) ---
 from flask_wtf import FlaskForm
-from wtforms import SelectField, FloatField, SubmitField
+from wtforms import SelectField, FloatField, StringField, SubmitField
 from wtforms.validators import Optional, NumberRange
 # --------------------------------------------------------
 
 # --- DÉFINITION DU FORMULAIRE DE RECHERCHE ---
+# Tris proposés (services/bitmaps.py : COLONNES_TRI) ; vide = ordre du classement
+CHOIX_TRI = [
+    ('', 'Rang du classement'),
+    ('score_global', 'Score global'),
+    ('indic_enseig', 'Enseignement'),
+    ('indic_env_rech', 'Environnement de recherche'),
+    ('indic_qualite_rech', 'Qualité de la recherche'),
+    ('indic_impact_industrie', 'Impact industriel'),
+    ('indic_rel_intern', 'Relations internationales'),
+    ('pop_etud', "Nombre d'étudiants"),
+    ('etud_internationaux_pct', '% étudiants internationaux'),
+]
+# Libellés des indicateurs de la page /comparer (services/comparaison.py)
+LIBELLES_COMPARAISON = {'rang': 'Rang', **dict(CHOIX_TRI)}
+
 class SearchForm(FlaskForm):
+    nom = StringField('Université', validators=[Optional()])
     pays = SelectField('Pays', choices=[], validators=[Optional()])
     annee = SelectField('Année', choices=[], validators=[Optional()])
     score_enseig_min = FloatField('Score Enseignement Min', validators=[Optional(), NumberRange(min=0, max=100)])
     score_rech_min = FloatField('Score Recherche Min', validators=[Optional(), NumberRange(min=0, max=100)])
+    tri = SelectField('Trier par', choices=CHOIX_TRI, validators=[Optional()])
+    ordre = SelectField('Ordre', choices=[('desc', 'Décroissant'), ('asc', 'Croissant')], validators=[Optional()])
     submit = SubmitField('Filtrer')
+
+
+def formulaire_recherche(formdata, dimensions, **kwargs):
+    """
+    Formulaire de recherche lié aux paramètres reçus (POST ou query string).
+
+    Une valeur invalide (année ou pays hors des choix, score non numérique ou
+    hors de [0, 100], tri inconnu) est ignorée comme un champ vide, au lieu
+    de lever une erreur dans la route.
+    """
+    form = SearchForm(formdata=formdata, **kwargs)
+    form.pays.choices = dimensions.choix_pays
+    form.annee.choices = dimensions.choix_annees
+    for field in (form.nom, form.pays, form.annee, form.score_enseig_min, form.score_rech_min,
+                  form.tri, form.ordre):
+        if not field.validate(form):
+            field.data = None
+            field.errors = []
+    return form
+
+
+def filtres_formulaire(form, is_search_request, annee_max):
+    """Filtres normalisés de la liste : par défaut, le classement de l'année max."""
+    if not is_search_request:
+        return normaliser_filtres(annee=annee_max)
+    return normaliser_filtres(
+        annee=form.annee.data or None,
+        pays=form.pays.data,
+        score_enseig_min=form.score_enseig_min.data,
+        score_rech_min=form.score_rech_min.data,
+        nom=form.nom.data,
+    )
 # ---------------------------------------------
 
 
 # --- Classe utilitaire de Pagination Manuelle (utilisée pour simuler le comportement) ---
+# Les boutons Précédent / Suivant utilisent les curseurs (services/curseurs.py) ;
+# les numéros de page restent disponibles pour les liens directs.
 class Pagination:
-    def __init__(self, page, per_page, total_count, items):
+    def __init__(self, page, per_page, total_count, items, curseur_suivant=None, curseur_precedent=None):
         self.page = page
         self.per_page = per_page
         self.total = total_count
         self.items = items
         self.pages = int(ceil(self.total / self.per_page))
+        self.curseur_suivant = curseur_suivant
+        self.curseur_precedent = curseur_precedent
 
     @property
     def has_prev(self):
@@ -55,6 +128,10 @@ class Pagination:
                     yield None
                 yield num
                 last = num
+
+# Données de la liste des universités, calculées dans le fragment en cache du template
+ListeUniversites = namedtuple('ListeUniversites', ['total_count', 'pagination', 'facettes', 'centiles',
+                                                   'valeurs_tri', 'corrections'])
 # ------------------------------------------------------------------------------------------
 
 # --- Fonctions d'aide pour le template ---
@@ -102,9 +179,23 @@ def create_app(config_name=None):
         )
 
     db.init_app(app)
+    init_chargement_strict(app)
+    cache.init_app(app)
+    # Balise {% cache %} des templates (fragments HTML par version des données)
+    init_fragments(app)
 
     with app.app_context():
-        db.create_all() 
+        # Une base complete n'est pas modifiee ; une base anterieure est mise a niveau
+        # une fois, et une base encore incomplete empeche le demarrage (RuntimeError)
+        etapes = preparer_base()
+        if etapes:
+            app.logger.warning("Base mise a niveau au demarrage : %s", ', '.join(etapes))
+
+    @app.cli.command('init-db')
+    def init_db():
+        """Met a niveau une base existante (schema, index, recits, centiles, syntheses)."""
+        etapes = mettre_a_niveau_base()
+        click.echo('\n'.join(etapes) if etapes else 'Base deja a jour.')
 
 
     # Utilisation du ratio dans le fichier dérails universités
@@ -115,6 +206,15 @@ def create_app(config_name=None):
             return '-'
         return f"{int(round(classement.ratio_fem))}% F / {int(round(classement.ratio_hom))}% H"
 
+    @app.template_filter('format_top')
+    def format_top(centile):
+        """Centile annuel (part des lignes au moins aussi bien placées) en « Top x % »."""
+        if centile is None:
+            return ''
+        if centile < 1:
+            return f"Top {centile:.1f} %"
+        return f"Top {int(ceil(round(centile, 6)))} %"
+
     @app.template_filter('format_pib')
     def format_pib(value):
         if value is None: return "-"
@@ -129,449 +229,153 @@ def register_routes(app):
         Enregistre les routes de l'application.
         """
         @app.route("/")
+        @cache.conditionnel()
+        @cache.reponse()
         def index():
             """Page d'accueil avec KPI et graphiques."""
-            # Récupération de l'annee la plus recente ou celle selectionnee
-            annee_max = db.session.query(db.func.max(Classement.annee)).scalar() or 2025
-            annee_recente = request.args.get('annee', annee_max, type=int)
-            
-            # Liste des annees disponibles
-            annees = [a[0] for a in db.session.query(
-                db.distinct(Classement.annee)
-            ).order_by(Classement.annee.desc()).all()]
-
-            # ========== KPI PAYS ==========
-            nb_pays = db.session.query(db.func.count(db.distinct(Pays.id_pays))).join(
-                Universite
-            ).join(Classement).filter(Classement.annee == annee_recente).scalar() or 0
-            
-            # PIB moyen
-            pib_moyen = db.session.query(db.func.avg(Pays.pib_hab)).scalar()
-            pib_moyen = round(pib_moyen, 0) if pib_moyen else 0
-            
-            # Alphabetisation moyenne
-            alpha_moyen = db.session.query(db.func.avg(Pays.alphabetisation_pct)).scalar()
-            alpha_moyen = round(alpha_moyen, 1) if alpha_moyen else 0
-            
-            # Migration moyenne
-            migration_moy = db.session.query(db.func.avg(Pays.migration_nette)).scalar()
-            migration_moy = round(migration_moy, 2) if migration_moy else 0
-            
-            # Pays avec le plus d'universites
-            pays_top_univ_query = db.session.query(
-                Pays.nom_pays,
-                db.func.count(Classement.id_classement).label('nb')
-            ).select_from(Pays).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Pays.nom_pays).order_by(db.desc('nb')).first()
-            
-            pays_top_univ = pays_top_univ_query[0] if pays_top_univ_query else "N/A"
-            pays_top_univ_nb = pays_top_univ_query[1] if pays_top_univ_query else 0
-            
-            # Region avec le plus d'universites
-            region_top_univ_query = db.session.query(
-                Region.nom_region,
-                db.func.count(Classement.id_classement).label('nb')
-            ).select_from(Region).join(
-                Pays, Region.id_region == Pays.id_region
-            ).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Region.nom_region).order_by(db.desc('nb')).first()
-            
-            region_top_univ = region_top_univ_query[0] if region_top_univ_query else "N/A"
-            region_top_univ_nb = region_top_univ_query[1] if region_top_univ_query else 0
+            # Annee selectionnee, sinon la plus recente (resolue par le service)
+            annee = request.args.get('annee', type=int)
+            kpi = calculer_tableau_bord(annee)
 
-            # ========== KPI UNIVERSITES ==========
-            nb_universites = Classement.query.filter_by(annee=annee_recente).count()
-            nb_regions = Region.query.count()
-            
-            # Scores moyens
-            score_moyen = db.session.query(
-                db.func.avg(Classement.score_global)
-            ).filter(Classement.annee == annee_recente).scalar()
-            score_moyen = round(score_moyen, 2) if score_moyen else 0
-
-            enseig_moyen = db.session.query(
-                db.func.avg(Classement.indic_enseig)
-            ).filter(Classement.annee == annee_recente).scalar()
-            enseig_moyen = round(enseig_moyen, 2) if enseig_moyen else 0
-
-            rech_moyen = db.session.query(
-                db.func.avg(Classement.indic_qualite_rech)
-            ).filter(Classement.annee == annee_recente).scalar()
-            rech_moyen = round(rech_moyen, 2) if rech_moyen else 0
-            
-            # Ratio moyen F/H
-            ratio_fh_moyen = db.session.query(
-                db.func.avg(Classement.ratio_fem_hom)
-            ).filter(Classement.annee == annee_recente).scalar()
-            ratio_fh_moyen = round(ratio_fh_moyen, 2) if ratio_fh_moyen else 0
-            
-            # Pourcentage moyen etudiants internationaux
-            etud_inter_moyen = db.session.query(
-                db.func.avg(Classement.etud_internationaux_pct)
-            ).filter(Classement.annee == annee_recente).scalar()
-            etud_inter_moyen = round(etud_inter_moyen, 1) if etud_inter_moyen else 0
-
-            # ========== TOP 5 PAYS PAR ENSEIGNEMENT ==========
-            top_pays_enseig = db.session.query(
-                Pays.nom_pays,
-                db.func.avg(Classement.indic_enseig).label('score')
-            ).select_from(Pays).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Pays.nom_pays).order_by(db.desc('score')).limit(5).all()
-
-            #plus simple de renvoyer les données ce format pour éviter des erreurs d'index ou pour mieux comprendre le code ultérieurment
-
-            data_top_pays_enseig = {"labels": [r[0] for r in top_pays_enseig],
-                                    "data": [float(r[1]) if r[1] is not None else 0 for r in top_pays_enseig]
-                                   }
-            
-            # ========== TOP 5 PAYS PAR RECHERCHE ==========
-            top_pays_rech = db.session.query(
-                Pays.nom_pays,
-                db.func.avg(Classement.indic_qualite_rech).label('score')
-            ).select_from(Pays).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Pays.nom_pays).order_by(db.desc('score')).limit(5).all()
-
-            #plus simple de renvoyer les données ce format pour éviter des erreurs d'index ou pour mieux comprendre le code ultérieurment
-
-            data_top_pays_rech = {  "labels": [r[0] for r in top_pays_rech],
-                                    "data": [float(r[1]) if r[1] is not None else 0 for r in top_pays_rech]
-                                }
-
-            # ========== TOP 10 UNIVERSITES ==========
-            top_10 = Classement.query.filter_by(annee=annee_recente).order_by(
-                Classement.rang
-            ).limit(10).all()
-
-
-
-            # ========== REPARTITION PAR REGION ==========
-            repartition_region = db.session.query(
-                Region.nom_region,
-                db.func.count(Classement.id_classement)
-            ).select_from(Region).join(
-                Pays, Region.id_region == Pays.id_region
-            ).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Region.nom_region).all()
-
-            #plus simple de renvoyer les données ce format pour éviter des erreurs d'index ou pour mieux comprendre le code ultérieurment
-
-
-            data_repartition_region = { "labels": [r[0] for r in repartition_region],
-                                        "data": [int(r[1]) if r[1] is not None else 0 for r in repartition_region]
-                                    }
-
-            # ========== TOP 5 PAYS PAR NOMBRE D'UNIVERSITES ==========
-            top_pays_nb_univ = db.session.query(
-                Pays.nom_pays,
-                db.func.count(Classement.id_classement).label('nb')
-            ).select_from(Pays).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).filter(
-                Classement.annee == annee_recente
-            ).group_by(Pays.nom_pays).order_by(db.desc('nb')).limit(5).all()
-
-            return render_template(
-                'index.html',
-                annee_recente=annee_recente,
-                annees=annees,
-                # KPI Pays
-                nb_pays=nb_pays, pib_moyen=pib_moyen, alpha_moyen=alpha_moyen,
-                migration_moy=migration_moy, pays_top_univ=pays_top_univ,
-                pays_top_univ_nb=pays_top_univ_nb,
-                region_top_univ=region_top_univ, region_top_univ_nb=region_top_univ_nb,
-                # KPI Universites
-                nb_universites=nb_universites, nb_regions=nb_regions,
-                score_moyen=score_moyen, enseig_moyen=enseig_moyen,
-                rech_moyen=rech_moyen, ratio_fh_moyen=ratio_fh_moyen,
-                etud_inter_moyen=etud_inter_moyen,
-                # Graphiques
-                top_pays_enseig=top_pays_enseig, top_pays_rech=top_pays_rech,
-                top_10=top_10, repartition_region=repartition_region,
-                top_pays_nb_univ=top_pays_nb_univ,
-
-                # Graphs versions antho
-                data_top_pays_enseig=data_top_pays_enseig,
-                data_top_pays_rech=data_top_pays_rech,
-                data_repartition_region=data_repartition_region
-                
-            )
+            return render_template('index.html', kpi=kpi)
 
         @app.route("/universites", methods=['GET', 'POST'])
         def universites():
             """Page des universités avec comparaisons graphiques et formulaire de recherche."""
             
-            annee_max = db.session.query(db.func.max(Classement.annee)).scalar() or 2025
-            
-            # --- Préparation des listes de choix pour le formulaire ---
-            
-            # Années disponibles
-            annees_query = db.session.query(
-                db.distinct(Classement.annee)
-            ).order_by(Classement.annee.desc()).all()
-            annee_choices = [('', 'Toutes les années')] + [(str(a[0]), str(a[0])) for a in annees_query]
-
-            # Pays disponibles (ceux ayant au moins un classement)
-            pays_query = db.session.query(
-                db.distinct(Pays.nom_pays)
-            ).join(Universite).join(Classement).order_by(Pays.nom_pays).all()
-            pays_choices = [('', 'Tous les pays')] + [(p[0], p[0]) for p in pays_query]
+            # Années et pays disponibles : chargés une fois par version des données
+            dimensions = obtenir_dimensions()
+            annee_max = dimensions.annee_max or 2025
 
             # Initialisation du formulaire
-            form = SearchForm(request.form)
-            form.pays.choices = pays_choices
-            form.annee.choices = annee_choices
-            
-            # --- 1. Récupération des données graphiques (Top/Bottom 5) ---
-            annee_graph = annee_max # Année max pour les graphiques
-            
-            # 1. Top 5 Enseignement
-            top5_enseig_query = db.session.query(
-                Universite.nom_univ, Classement.indic_enseig
-            ).select_from(Classement).join(Universite).filter(
-                Classement.annee == annee_graph, Classement.indic_enseig.isnot(None) 
-            ).order_by(db.desc(Classement.indic_enseig)).limit(5).all()
+            # GET (liens de pagination) et POST (formulaire) lisent les mêmes champs
+            # (valeurs invalides ignorées : formulaire_recherche)
+            form = formulaire_recherche(request.form if request.method == 'POST' else request.args, dimensions)
             
-            data_top5_teaching = {'labels': [res[0] for res in top5_enseig_query], 'data': [res[1] for res in top5_enseig_query]}
-
-            # 2. Bottom 5 Enseignement
-            bottom5_enseig_query = db.session.query(
-                Universite.nom_univ, Classement.indic_enseig
-            ).select_from(Classement).join(Universite).filter(
-                Classement.annee == annee_graph, Classement.indic_enseig.isnot(None)
-            ).order_by(Classement.indic_enseig.asc()).limit(5).all()
-
-            data_bottom5_teaching = {'labels': [res[0] for res in bottom5_enseig_query], 'data': [res[1] for res in bottom5_enseig_query]}
-
-            # 3. Top 5 Recherche
-            top5_rech_query = db.session.query(
-                Universite.nom_univ, Classement.indic_qualite_rech
-            ).select_from(Classement).join(Universite).filter(
-                Classement.annee == annee_graph, Classement.indic_qualite_rech.isnot(None)
-            ).order_by(db.desc(Classement.indic_qualite_rech)).limit(5).all()
-
-            data_top5_research = {'labels': [res[0] for res in top5_rech_query], 'data': [res[1] for res in top5_rech_query]}
-
-            # 4. Bottom 5 Recherche
-            bottom5_rech_query = db.session.query(
-                Universite.nom_univ, Classement.indic_qualite_rech
-            ).select_from(Classement).join(Universite).filter(
-                Classement.annee == annee_graph, Classement.indic_qualite_rech.isnot(None)
-            ).order_by(Classement.indic_qualite_rech.asc()).limit(5).all()
-
-            data_bottom5_research = {'labels': [res[0] for res in bottom5_rech_query], 'data': [res[1] for res in bottom5_rech_query]}
-            
-            
-            # --- 2. CLASSEMENT INITIAL : TOP 100 UNIVERSITÉS ---
-            top_100_universites_initial = db.session.query(
-                Classement.id_classement, Classement.rang, Universite.nom_univ, Pays.nom_pays, 
-                Region.nom_region, Classement.indic_enseig, Classement.indic_qualite_rech, Classement.score_global
-            ).select_from(Classement).join(
-                Universite, Classement.id_univ == Universite.id_universite
-            ).join(
-                Pays, Universite.id_pays == Pays.id_pays
-            ).join(
-                Region, Pays.id_region == Region.id_region
-            ).filter(
-                # IMPORTANT : Le TOP 100 par défaut utilise toujours l'année max
-                Classement.annee == annee_max
-            ).order_by(Classement.rang.asc()).limit(100).all()
-            
-            # Initialise la liste à afficher avec le TOP 100 par défaut
-            universites_a_afficher = top_100_universites_initial
-            
-            # Détermine l'année à afficher dans le titre du tableau (par défaut l'année max)
-            annee_affichée = annee_max
-            
-            # --- 3. Construction de la requête de base pour la liste et le comptage ---
-            
-            base_query = db.session.query(
-                Classement.id_classement, Classement.rang, Universite.nom_univ, Pays.nom_pays, 
-                Region.nom_region, Classement.indic_enseig, Classement.indic_qualite_rech, Classement.score_global
-            ).select_from(Classement).join(
-                Universite, Classement.id_univ == Universite.id_universite
-            ).join(
-                Pays, Universite.id_pays == Pays.id_pays
-            ).join(
-                Region, Pays.id_region == Region.id_region
-            ).filter(
-                Classement.score_global.isnot(None)
-            ).order_by(Classement.rang.asc())
-
-            # --- 4. Détermination des filtres et de l'état de la recherche ---
+            # --- 1. Graphiques (Top/Bottom k) : chargés par la page via /api/charts/universites ---
+            # Palmarès précalculés pour toutes les années (services/palmares.py)
+            k_palmares = app.config['PALMARES_K']
+
+
+            # --- 2. Détermination des filtres et de l'état de la recherche ---
             
             is_search_request = request.method == 'POST' or any(
                 request.args.get(field.name) not in ('', None)
-                for field in [form.pays, form.annee, form.score_enseig_min, form.score_rech_min]
+                for field in [form.nom, form.pays, form.annee, form.score_enseig_min, form.score_rech_min]
             )
             
-            current_query = base_query
             annee_filtree = int(form.annee.data) if form.annee.data else None
+            annee_graph = annee_filtree or annee_max # Année filtrée, sinon la plus récente
             
-            if not is_search_request:
-                annee_affichée = annee_max
-                current_query = current_query.filter(Classement.annee == annee_max)
-            else:
-                annee_affichée = annee_filtree if annee_filtree else annee_max
-                
-                filters = []
-                
-                if form.annee.data: 
-                     filters.append(Classement.annee == int(form.annee.data))
-                
-                if form.pays.data and form.pays.data != '': 
-                    filters.append(Pays.nom_pays == form.pays.data)
-                    
-                if form.score_enseig_min.data is not None: 
-                    filters.append(Classement.indic_enseig >= form.score_enseig_min.data)
-                    
-                if form.score_rech_min.data is not None: 
-                    filters.append(Classement.indic_qualite_rech >= form.score_rech_min.data)
-
-                if filters:
-                    current_query = current_query.filter(and_(*filters))
+            # Par défaut (ou toutes années) : le titre affiche l'année max
+            annee_affichée = annee_filtree or annee_max
+            filtres = filtres_formulaire(form, is_search_request, annee_max)
             
-            # --- 5. Exécution de la requête avec Pagination ---
+            # --- 3. Exécution de la requête avec Pagination ---
             
             page = request.args.get('page', 1, type=int)
             per_page = 100
-            
-            total_count = current_query.with_entities(func.count(Classement.id_classement)).scalar() or 0
-
             offset = (page - 1) * per_page
-            resultats_page = current_query.limit(per_page).offset(offset).all()
 
-            pagination = Pagination(page, per_page, total_count, resultats_page)
+            # Précédent / Suivant : curseurs opaques, sans OFFSET
+            curseurs = {
+                'apres': decoder_curseur(request.args.get('apres')),
+                'avant': decoder_curseur(request.args.get('avant')),
+            }
+
+            # Tri choisi : permutations annuelles précalculées, pagination par numéro de page
+            colonne_tri, decroissant = normaliser_tri(form.tri.data, form.ordre.data)
+
+            def calculer_liste():
+                """Liste, facettes et centiles : appelée dans le fragment {% cache %}, seulement s'il manque."""
+                valeurs_tri = {}
+                if colonne_tri:
+                    total_count, page_liste, valeurs_tri = page_triee(per_page, offset, colonne_tri, decroissant, **filtres)
+                elif moteur_colonnes_actif():
+                    total_count, page_liste = obtenir_magasin().rechercher(per_page, offset, **curseurs, **filtres)
+                else:
+                    # Liste d'identifiants mémorisée par recherche normalisée (cache actif)
+                    total_count, page_liste = page_recherche(per_page, offset, **curseurs, **filtres)
+
+                # Comptes par année, pays et région sous les filtres courants (index bitmap, sans GROUP BY)
+                facettes = obtenir_index_bitmaps().facettes(**filtres)
+
+                pagination = Pagination(page, per_page, total_count, page_liste.lignes,
+                                        page_liste.suivant, page_liste.precedent)
+
+                # « Top x % » du score global des lignes de la page (lecture par clé primaire)
+                centiles = centiles_classements([u[0] for u in pagination.items])
 
-            universites_a_afficher = pagination.items
+                # Nom sans résultat (faute de frappe) : noms approchés (index de trigrammes)
+                corrections = []
+                if not total_count and filtres.get('nom'):
+                    corrections = obtenir_index_trigrammes().rechercher(filtres['nom'], limite=3)
+
+                return ListeUniversites(total_count, pagination, facettes, centiles, valeurs_tri, corrections)
 
 
             # --- Rendu du template ---
             return render_template(
                 'universités.html',
                 form=form,
-                data_top5_teaching=data_top5_teaching,
-                data_bottom5_teaching=data_bottom5_teaching,
-                data_top5_research=data_top5_research,
-                data_bottom5_research=data_bottom5_research,
-                universites_a_afficher=universites_a_afficher, 
+                annee_graph=annee_graph,
+                k_palmares=k_palmares,
                 is_search_request=is_search_request, 
                 annee_affichée=annee_affichée, 
-                pagination=pagination,             
-                total_count=total_count            
+                page=page,
+                calculer_liste=calculer_liste,
+                filtres=filtres,
+                colonne_tri=colonne_tri,
+                libelle_tri=dict(CHOIX_TRI).get(colonne_tri)
+            )
+
+        @app.route('/universites/export.<format>')
+        def export_universites(format):
+            """Export en flux (CSV ou NDJSON) de toute la liste filtrée, mêmes filtres que /universites."""
+            if format not in EXPORTS:
+                return render_template('404.html'), 404
+
+            dimensions = obtenir_dimensions()
+            form = formulaire_recherche(request.args, dimensions, meta={'csrf': False})
+            is_search_request = any(
+                request.args.get(field.name) not in ('', None)
+                for field in [form.nom, form.pays, form.annee, form.score_enseig_min, form.score_rech_min]
+            )
+            annee_max = dimensions.annee_max or 2025
+            filtres = filtres_formulaire(form, is_search_request, annee_max)
+
+            mimetype, extension = FORMATS_EXPORT[format]
+            nom_fichier = f"universites_{filtres['annee'] or 'toutes'}.{extension}"
+            return app.response_class(
+                stream_with_context(EXPORTS[format](filtres)),
+                mimetype=mimetype,
+                headers={'Content-Disposition': f'attachment; filename="{nom_fichier}"'}
             )
 
         @app.route('/universite/<int:id>')
+        @cache.conditionnel()
+        @cache.reponse()
         def fiche_universite(id):
             """Affiche la fiche détaillée d'une université avec un storytelling amélioré."""
             
-            # 1. Récupérer l'entrée de classement et les jointures
-            classement = db.session.query(
-                Classement, Universite, Pays, Region
-            ).select_from(Classement).join(
-                Universite, Classement.id_univ == Universite.id_universite
-            ).join(
-                Pays, Universite.id_pays == Pays.id_pays
-            ).join(
-                Region, Pays.id_region == Region.id_region 
-            ).filter(Classement.id_classement == id).first()
+            # 1. Profil de l'université (ligne demandée + historique complet, une requête,
+            #    mémorisé par université et version des données : services/profils.py)
+            resultat = profil_classement(id)
             
-            if not classement:
+            if not resultat:
                 return render_template('404.html'), 404
 
-            classement_obj, universite_obj, pays_obj, region_obj = classement
+            profil, classement_obj = resultat
+            universite_obj, pays_obj, region_obj = profil.universite, profil.pays, profil.region
             
-            # 2. Récupérer l'historique pour le graphique
-            historique_query = db.session.query(
-                Classement.annee,
-                Classement.indic_enseig,
-                Classement.indic_qualite_rech,
-                Classement.score_global
-            ).filter(
-                Classement.id_univ == universite_obj.id_universite
-            ).order_by(Classement.annee.asc()).all()
-            
-            historique_data = {
-                'labels': [h[0] for h in historique_query],
-                'data_enseig': [h[1] for h in historique_query],
-                'data_rech': [h[2] for h in historique_query],
-                'data_global': [h[3] for h in historique_query],
-            }
+            # 2. Storytelling : généré en bloc lors du peuplement (services/recits.py)
+            story = profil.recits.get(id, RECIT_VIDE)
 
-            # 3. Storytelling Amélioré (Utilisation directe des balises HTML)
-            story = "Aucune donnée de classement historique disponible pour cette université."
-
-            if historique_query:
-                scores_global = [s for s in historique_data['data_global'] if s is not None]
-                scores_enseig = [s for s in historique_data['data_enseig'] if s is not None]
-                scores_rech = [s for s in historique_data['data_rech'] if s is not None]
-
-                if len(scores_global) >= 2:
-                    
-                    premier_score_global = scores_global[0]
-                    dernier_score_global = scores_global[-1]
-                    diff_global = dernier_score_global - premier_score_global
-                    
-                    diff_enseig = scores_enseig[-1] - scores_enseig[0] if len(scores_enseig) >= 2 else 0
-                    diff_rech = scores_rech[-1] - scores_rech[0] if len(scores_rech) >= 2 else 0
-
-                    story_parts = []
-                    
-                    # Progression Globale
-                    if diff_global > 2:
-                        story_parts.append(f"L'Université <strong>{universite_obj.nom_univ}</strong> a démontré une <strong>progression constante</strong> de son score global, passant de {premier_score_global:.1f} à <strong>{dernier_score_global:.1f}</strong> sur la période observée.")
-                    elif diff_global < -2:
-                        story_parts.append(f"L'Université <strong>{universite_obj.nom_univ}</strong> a connu un <strong>léger déclin</strong> de son score global, perdant {abs(diff_global):.1f} points. Cela signale un besoin potentiel de réinvestissement dans certains domaines.")
-                    else:
-                        story_parts.append(f"L'Université <strong>{universite_obj.nom_univ}</strong> maintient une <strong>performance stable</strong> et de haut niveau, son score global fluctuant autour de <strong>{dernier_score_global:.1f}</strong>.")
-                    
-                    # Analyse des facteurs
-                    if diff_enseig > 2 and diff_rech > 2:
-                        story_parts.append(f"Cette performance est tirée par une <strong>amélioration notable</strong> dans ses deux piliers : l'Enseignement (gain de {diff_enseig:.1f} points) et la Recherche (gain de {diff_rech:.1f} points).")
-                    elif diff_enseig > 2:
-                        story_parts.append(f"L'<strong>excellence en Enseignement</strong> est son principal moteur de croissance, augmentant de {diff_enseig:.1f} points. L'indicateur de Recherche est resté stable ou a légèrement évolué.")
-                    elif diff_rech > 2:
-                        story_parts.append(f"Le <strong>renforcement de la Recherche</strong> est la source principale de sa progression, avec un gain de {diff_rech:.1f} points. Cela indique un impact croissant de ses travaux scientifiques.")
-                    elif diff_enseig < -2 or diff_rech < -2:
-                         if diff_enseig < diff_rech:
-                            story_parts.append(f"Malgré une stabilité globale, l'indicateur d'Enseignement ({diff_enseig:.1f}) montre une légère faiblesse qui pourrait nécessiter une attention particulière.")
-                         else:
-                            story_parts.append(f"Malgré une stabilité globale, l'indicateur de Recherche ({diff_rech:.1f}) montre une légère faiblesse qui pourrait nécessiter une attention particulière.")
-                    
-                    # Conclusion et classement actuel
-                    story_parts.append(f"Avec un rang actuel de <strong>#{classement_obj.rang}</strong>, l'université se positionne comme un leader mondial, reflet de la qualité de l'enseignement supérieur aux {pays_obj.nom_pays}.")
-                    
-                    story = " ".join(story_parts)
-                
-                else:
-                    story = f"Seulement un ou zéro point de données historique trouvé. Le score global actuel est de <strong>{classement_obj.score_global:.1f}</strong> pour l'année {classement_obj.annee}."
+            # 3. Centiles de l'année (« top x % »), lus avec le profil
+            centiles = profil.centiles.get(id)
 
+            # 4. Universités au profil d'indicateurs le plus proche, même année (voisins précalculés)
+            similaires = obtenir_index_similaires().similaires(id, app.config['SIMILAIRES_K'])
 
             return render_template(
                 'fiche_universite.html',
@@ -579,148 +383,82 @@ def register_routes(app):
                 universite=universite_obj, 
                 pays=pays_obj, 
                 region=region_obj,
-                historique_data=historique_data,
-                story=story
+                story=story,
+                centiles=centiles,
+                similaires=similaires
             )
             
+        @app.route('/comparer')
+        @cache.conditionnel()
+        @cache.reponse()
+        def comparer():
+            """Comparaison des historiques de plusieurs universités (?ids=1,2,3)."""
+            try:
+                ids = lire_ids(request.args.get('ids'), app.config['COMPARAISON_MAX'])
+            except ValueError as erreur:
+                return render_template('comparer.html', comparaison=None, erreur=str(erreur), ids=''), 400
+
+            comparaison = donnees_comparaison(comparer_universites(ids))
+            return render_template(
+                'comparer.html',
+                comparaison=comparaison,
+                erreur=None,
+                ids=','.join(str(i) for i in ids),
+                libelles=LIBELLES_COMPARAISON
+            )
+
+        @app.route('/api/comparer')
+        @cache.conditionnel()
+        @cache.reponse()
+        def api_comparer():
+            """Historiques pivotés (années x indicateurs) de plusieurs universités, en JSON."""
+            try:
+                ids = lire_ids(request.args.get('ids'), app.config['COMPARAISON_MAX'])
+            except ValueError as erreur:
+                return jsonify({'erreur': str(erreur)}), 400
+            return jsonify(donnees_comparaison(comparer_universites(ids)))
+
         @app.route("/statistiques")
+        @cache.conditionnel()
+        @cache.reponse()
         def statistiques():
-            """Page des statistiques."""
-
-            # Internationalisation et performance en recherche
-            intern_categorie = case(
-                (Classement.etud_internationaux_pct < 10, '[0–10%['),
-                (Classement.etud_internationaux_pct < 20, '[10–20%['),
-                (Classement.etud_internationaux_pct < 30, '[20–30%['),
-                (Classement.etud_internationaux_pct >= 30, '[30%+]'),
-                else_='Inconnu'
-            ).label('pct_etud_intern')
-            
-            intern_perf_recherche_raw = db.session.query(
-                intern_categorie,
-                func.avg(Classement.indic_env_rech).label('moyenne_qualite_rech')
-            ).group_by(intern_categorie).all()
-            
-            data_intern = [
-                {'classe': row.pct_etud_intern, 'score': float(row.moyenne_qualite_rech) if row.moyenne_qualite_rech else 0}
-                for row in intern_perf_recherche_raw
-            ]
-
-
-            # Richesse des pays et qualité de l'enseignement
-            pib_categorie = case(
-                (Pays.pib_hab <= 1135, 'Faible revenu'),
-                (Pays.pib_hab.between(1136, 4495), 'Revenu intermédiaire'),
-                (Pays.pib_hab >= 4496, 'Haut revenu'),
-                else_='Inconnu'
-            ).label('pib_hab')
-            
-            pib_qual_ens_raw = db.session.query(
-                pib_categorie,
-                func.avg(Classement.indic_enseig).label('moyenne_score_enseignement'),
-                func.avg(Classement.indic_qualite_rech).label('moyenne_score_qualite_recherche')
-            ).select_from(Pays).join(
-                Universite, Universite.id_pays == Pays.id_pays
-            ).join(
-                Classement, Classement.id_univ == Universite.id_universite
-            ).group_by(pib_categorie).all()
-            
-            # Ordre personnalisé pour les catégories
-            ordre_pib = {'Inconnu': 0, 'Faible revenu': 1, 'Revenu intermédiaire': 2, 'Haut revenu': 3}
-            
-            data_pib = sorted([
-                {
-                    'classe': row.pib_hab,
-                    'enseignement': float(row.moyenne_score_enseignement) if row.moyenne_score_enseignement else 0,
-                    'recherche': float(row.moyenne_score_qualite_recherche) if row.moyenne_score_qualite_recherche else 0
-                }
-                for row in pib_qual_ens_raw
-            ], key=lambda x: ordre_pib.get(x['classe'], 999))
-
-            
-            # Alphabétisation et score global
-            alpha_categorie = case(
-                (Pays.alphabetisation_pct < 80, '<80%'),
-                (Pays.alphabetisation_pct.between(80, 90), '[80–90%]'),
-                (Pays.alphabetisation_pct > 90, '>90%'),
-                else_='Inconnu'
-            ).label('pct_alphabetisation')
-            
-            alpha_score_glob_raw = db.session.query(
-                alpha_categorie,
-                func.avg(Classement.score_global).label('moyenne_score_global')
-            ).select_from(Pays).join(
-                Universite, Universite.id_pays == Pays.id_pays
-            ).join(
-                Classement, Classement.id_univ == Universite.id_universite
-            ).group_by(alpha_categorie).all()
-            
-            data_alpha = [
-                {
-                    'classe': row.pct_alphabetisation,
-                    'count': float(row.moyenne_score_global) if row.moyenne_score_global else 0
-                }
-                for row in alpha_score_glob_raw
-            ]
-
-
-            # Ratio femmes / hommes et score d'enseignement
-            ratio_categorie = case(
-                (Classement.ratio_fem_hom < 40, '< 40%'),
-                (Classement.ratio_fem_hom.between(40, 60), '[40–60%]'),
-                (Classement.ratio_fem_hom > 60, '>60%'),
-                else_='Inconnu'
-            ).label('pct_ratio')
-            
-            ratio_hf_score_raw = db.session.query(
-                ratio_categorie,
-                func.avg(Classement.indic_enseig).label('moyenne_score_enseignement'),
-                func.avg(Classement.indic_qualite_rech).label('moyenne_score_qualite_recherche')
-            ).group_by(ratio_categorie).all()
-            
-            # Ordre personnalisé pour les catégories de ratio F/H
-            ordre_ratio = {'Inconnu': 0, '< 40%': 1, '[40–60%]': 2, '>60%': 3}
-            
-            data_ratio = sorted([
-                {
-                    'classe': row.pct_ratio,
-                    'enseignement': float(row.moyenne_score_enseignement) if row.moyenne_score_enseignement else 0,
-                    'recherche': float(row.moyenne_score_qualite_recherche) if row.moyenne_score_qualite_recherche else 0
-                }
-                for row in ratio_hf_score_raw
-            ], key=lambda x: ordre_ratio.get(x['classe'], 999))
-
-
-            # Scores par région
-            scores_region_raw = db.session.query(
-                Region.nom_region.label('region'),
-                func.avg(Classement.indic_enseig).label('moyenne_score_enseignement'),
-                func.avg(Classement.indic_qualite_rech).label('moyenne_score_qualite_recherche')
-            ).select_from(Region).join(
-                Pays, Region.id_region == Pays.id_region
-            ).join(
-                Universite, Pays.id_pays == Universite.id_pays
-            ).join(
-                Classement, Universite.id_universite == Classement.id_univ
-            ).group_by(Region.nom_region).all()
-            
-            data_region = [
-                {
-                    'region': row.region,
-                    'enseignement': float(row.moyenne_score_enseignement) if row.moyenne_score_enseignement else 0,
-                    'recherche': float(row.moyenne_score_qualite_recherche) if row.moyenne_score_qualite_recherche else 0,
-                    'global': (float(row.moyenne_score_enseignement) if row.moyenne_score_enseignement else 0 + float(row.moyenne_score_qualite_recherche) if row.moyenne_score_qualite_recherche else 0) / 2
-                }
-                for row in scores_region_raw
-            ]
-
-
-            return render_template('statistiques.html',
-                                data_intern=data_intern,
-                                data_pib=data_pib,
-                                data_alpha=data_alpha,
-                                data_ratio=data_ratio,
-                                data_region=data_region)
+            """Page des statistiques (graphiques chargés via /api/charts/statistiques)."""
+            return render_template('statistiques.html')
+
+        @app.route('/api/charts/<nom>')
+        @cache.conditionnel()
+        @cache.reponse()
+        def api_graphiques(nom):
+            """Données JSON des graphiques d'une page (voir services/graphiques.py)."""
+            if nom not in GRAPHIQUES:
+                return jsonify({'erreur': f"Graphique inconnu : {nom}"}), 404
+
+            fonction, parametres = GRAPHIQUES[nom]
+            arguments = {p: request.args.get(p, type=int) for p in parametres}
+            if 'id_univ' in arguments and arguments['id_univ'] is None:
+                return jsonify({'erreur': "Paramètre id_univ manquant"}), 400
+            # Entiers non représentables par SQLite (OverflowError dans la requête)
+            for p, valeur in arguments.items():
+                if valeur is not None and not ENTIER_MIN <= valeur <= ENTIER_MAX:
+                    return jsonify({'erreur': f"Paramètre {p} invalide : {valeur}"}), 400
+
+            return jsonify(fonction(**arguments))
+
+        @app.route('/api/universites/suggestions')
+        @cache.conditionnel()
+        @cache.reponse()
+        def api_suggestions():
+            """Saisie semi-automatique du nom d'université (index plein texte, par préfixes)."""
+            saisie = request.args.get('q', '')
+            limite = min(max(request.args.get('limite', 10, type=int), 1), 50)
+            suggestions = suggerer_universites(saisie, limite)
+            if not suggestions:
+                # Aucun préfixe ne correspond : saisie probablement mal orthographiée
+                suggestions = [
+                    {'id_universite': c.id_universite, 'nom_univ': c.nom_univ, 'nom_pays': c.nom_pays}
+                    for c in obtenir_index_trigrammes().rechercher(saisie, limite)
+                ]
+            return jsonify(suggestions)
     
         @app.route('/test-500')
         def test_500():
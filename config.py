@@ -10,18 +10,46 @@ class Config:
     SQLALCHEMY_DATABASE_URI = 'sqlite:///' + os.path.join(BASE_DIR, 'univ.db')
     SQLALCHEMY_TRACK_MODIFICATIONS = False
     SQLALCHEMY_ECHO = False
+    # Leve une erreur sur tout chargement paresseux de relation (N+1), voir models/chargement.py
+    SQLALCHEMY_CHARGEMENT_STRICT = False
 
     DATA_DIR = os.path.join(BASE_DIR,"data")
     CSV_THE = os.path.join(DATA_DIR, "Classement_THE_des_universites_mondiales_2016–2025.csv")
     CSV_FUSIONNE = os.path.join(DATA_DIR, "donnees_fusionnees.csv")
     CSV_PAYS = os.path.join(DATA_DIR, "statistiques_pays_du_monde.csv")
 
+    # Cache des resultats (services/cache.py), invalide a chaque reconstruction de univ.db
+    # CACHE_REPERTOIRE : niveau fichier conserve entre deux redemarrages (None = memoire seule)
+    # CACHE_FICHIER_MAX : nombre maximal de fichiers par version (les plus anciens sont supprimes)
+    CACHE_ACTIF = True
+    CACHE_TAILLE_MAX = 512
+    CACHE_TTL = 3600
+    CACHE_REPERTOIRE = None
+    CACHE_FICHIER_MAX = 2048
+
+    # Moteur des requetes d'agregation et de recherche :
+    # 'sql' (SQLite) ou 'colonnes' (classements charges en tableaux NumPy, services/colonnes.py)
+    # Le magasin en colonnes reste charge avec 'sql' (une fois par version des donnees et par
+    # processus) : l'index bitmap, les tris, les palmares et les universites similaires le lisent
+    MOTEUR_REQUETES = os.environ.get('MOTEUR_REQUETES', 'sql')
+
+    # Palmares annuels (services/palmares.py) : taille par defaut et maximale des top-k / bottom-k
+    PALMARES_K = 5
+    PALMARES_K_MAX = 50
+
+    # Universites similaires d'une fiche (services/similaires.py)
+    SIMILAIRES_K = 10
+
+    # Nombre maximal d'universites comparees (/comparer, services/comparaison.py)
+    COMPARAISON_MAX = 20
+
 class DevelopmentConfig(Config):
     """
     Classe de configuration pour le developpement
     """
     DEBUG = True
     SQLALCHEMY_ECHO = True
+    SQLALCHEMY_CHARGEMENT_STRICT = True
 
 
 class ProductionConfig(Config):
@@ -29,13 +57,18 @@ class ProductionConfig(Config):
 
     DEBUG = False
     SECRET_KEY = os.environ.get('SECRET_KEY') or os.urandom(32).hex()
+    CACHE_TTL = 24 * 3600
+    CACHE_REPERTOIRE = os.path.join(BASE_DIR, 'cache')
 
 
 class TestingConfig(Config):
     """Configuration pour les tests."""
 
     TESTING = True
-    SQLALCHEMY_DATABASE_URI = 'sqlite:///:memory:'
+    # TEST_DATABASE_URL : base de test explicite (ex. copie de univ.db pour les benchmarks)
+    SQLALCHEMY_DATABASE_URI = os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:')
+    CACHE_ACTIF = False
+    SQLALCHEMY_CHARGEMENT_STRICT = True
 
 # Dictionnaire de configurations
 config = {
@@ -386,6 +386,23 @@ function createPieChart(canvaId, labels, data, type = 'pie', dataLabel = "Répar
     return createPieOrDoughnutChart(canvaId, labels, data, type === 'doughnut', dataLabel);
 }
 
+// === CHARGEMENT ASYNCHRONE DES DONNÉES (/api/charts/<nom>) ===
+/**
+ * Récupère les données JSON des graphiques d'une page puis appelle la fonction de rendu.
+ * La page HTML s'affiche sans attendre les agrégats ; les graphiques apparaissent ensuite.
+ */
+function chargerGraphiques(url, rendu) {
+    return fetch(url, { headers: { 'Accept': 'application/json' } })
+        .then(reponse => {
+            if (!reponse.ok) {
+                throw new Error(`HTTP ${reponse.status}`);
+            }
+            return reponse.json();
+        })
+        .then(rendu)
+        .catch(erreur => console.error(`Chargement des graphiques impossible (${url}) :`, erreur));
+}
+
 // === SCROLL TO TOP BUTTON (FONCTION COMMUNE) ===
 /**
  * Initialise le bouton "Remonter en haut" de manière unifiée.
@@ -8,6 +8,13 @@ Ce module initialise Flask-SQLAlchemy et expose les modeles ORM :
 - Pays : Pays avec statistiques socio-economiques
 - Universite : Universites (entite stable)
 - Classement : Classements annuels THE (donnees variables)
+- ResumeAnnee, ResumeAnneePays, ResumeAnneeRegion, ResumeTranche :
+  tables de synthese derivees de Classement
+- RecitClassement : recit de la fiche d'une universite, par classement
+- CentileClassement : position de chaque classement dans son annee (top x %)
+- Ingestion : executions du pipeline de peuplement (version des donnees)
+
+ainsi que les strategies de chargement des relations (models.chargement).
 """
 
 from flask_sqlalchemy import SQLAlchemy
@@ -18,5 +25,16 @@ from models.region import Region
 from models.pays import Pays
 from models.universite import Universite
 from models.classement import Classement
+from models.resume import ResumeAnnee, ResumeAnneePays, ResumeAnneeRegion, ResumeTranche
+from models.recit import RecitClassement
+from models.centile import CentileClassement
+from models.ingestion import Ingestion
+from models.chargement import (ChargementParesseuxError, options_classement_complet,
+                               init_chargement_strict)
 
-__all__ = ['db', 'Region', 'Pays', 'Universite', 'Classement']
+__all__ = [
+    'db', 'Region', 'Pays', 'Universite', 'Classement',
+    'ResumeAnnee', 'ResumeAnneePays', 'ResumeAnneeRegion', 'ResumeTranche',
+    'RecitClassement', 'CentileClassement', 'Ingestion',
+    'ChargementParesseuxError', 'options_classement_complet', 'init_chargement_strict'
+]
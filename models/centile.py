@@ -0,0 +1,49 @@
+"""
+Modele SQLAlchemy pour la table CentileClassement.
+
+Position de chaque ligne de classement parmi celles de son annee, pour le
+score global et les cinq indicateurs. Derivee de Classement, la table est
+calculee en bloc par services.centiles lors du peuplement
+(scripts/populate_db.py).
+"""
+
+
+from models import db
+
+
+class CentileClassement(db.Model):
+    """
+    Classe ORM representant les centiles annuels d'une ligne de classement.
+
+    Chaque valeur est la part (en %) des lignes de l'annee dont l'indicateur
+    est au moins aussi eleve : 3.0 signifie « dans le top 3 % ». NULL si
+    l'indicateur de la ligne est absent.
+
+    Attributes:
+        id_classement (int): Ligne de classement (cle primaire et etrangere).
+        top_score_global (float): Score global.
+        top_enseig (float): Enseignement.
+        top_env_rech (float): Environnement de recherche.
+        top_qualite_rech (float): Qualite de la recherche.
+        top_impact_industrie (float): Impact industriel.
+        top_rel_intern (float): Relations internationales.
+    """
+
+    __tablename__ = 'centile_classement'
+
+    id_classement = db.Column(
+        db.Integer,
+        db.ForeignKey('classement.id_classement', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    top_score_global = db.Column(db.Float)
+    top_enseig = db.Column(db.Float)
+    top_env_rech = db.Column(db.Float)
+    top_qualite_rech = db.Column(db.Float)
+    top_impact_industrie = db.Column(db.Float)
+    top_rel_intern = db.Column(db.Float)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet CentileClassement."""
+        return f"<CentileClassement {self.id_classement}>"
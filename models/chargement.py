@@ -0,0 +1,62 @@
+"""
+Strategies de chargement des relations ORM.
+
+Les relations Classement -> Universite -> Pays -> Region sont declarees en
+lazy='select' : les parcourir sur une liste d'objets emet une requete par
+objet (N+1). Les requetes qui en ont besoin chargent donc ces relations
+explicitement (options_classement_complet).
+
+Mode strict (SQLALCHEMY_CHARGEMENT_STRICT, actif en developpement et en
+test) : tout chargement paresseux d'une relation qui emettrait une requete
+leve ChargementParesseuxError, pour detecter un N+1 avant la production.
+Les relations 'dynamic' (Region.pays, Pays.universites,
+Universite.classements) restent autorisees : ce sont des requetes explicites.
+"""
+
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.exc import InvalidRequestError
+from sqlalchemy.orm import joinedload
+
+from models import db
+from models.classement import Classement
+from models.universite import Universite
+from models.pays import Pays
+
+
+class ChargementParesseuxError(InvalidRequestError):
+    """Chargement paresseux d'une relation non prevu par la requete d'origine."""
+
+
+def options_classement_complet():
+    """
+    Option de requete chargeant Classement.universite.pays.region en une jointure.
+
+    Returns:
+        Load: A passer a Query.options().
+    """
+    return joinedload(Classement.universite).joinedload(Universite.pays).joinedload(Pays.region)
+
+
+def _verifier_chargement(orm_execute_state):
+    """Leve une erreur sur un chargement paresseux lorsque le mode strict est actif."""
+    if not (orm_execute_state.is_relationship_load and orm_execute_state.lazy_loaded_from is not None):
+        return
+    if not has_app_context() or not current_app.config.get('SQLALCHEMY_CHARGEMENT_STRICT'):
+        return
+    etat = orm_execute_state.lazy_loaded_from
+    raise ChargementParesseuxError(
+        f"Chargement paresseux non prevu depuis {etat.class_.__name__} "
+        f"(identite {etat.identity}) ; ajouter une option de chargement a la requete."
+    )
+
+
+def init_chargement_strict(app):
+    """
+    Installe la verification du mode strict (une seule fois pour toutes les applications).
+
+    Args:
+        app (Flask): Application ; le parametre SQLALCHEMY_CHARGEMENT_STRICT est lu a chaque requete.
+    """
+    if not event.contains(db.session, 'do_orm_execute', _verifier_chargement):
+        event.listen(db.session, 'do_orm_execute', _verifier_chargement)
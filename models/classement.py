@@ -31,6 +31,8 @@ class Classement(db.Model):
     ratio_fem (float): Le rapport « femmes / population » parmi les étudiants.
     ratio_hom (float): Le rapport « hommes / population » parmi les étudiants.
     id_univ (int): identifiant de l'université (clé étrangère vers université)
+    id_pays (int): pays de l'université, dénormalisé (copie de universite.id_pays)
+    id_region (int): région du pays, dénormalisée (copie de pays.id_region)
     """
 
     __tablename__ = 'classement'
@@ -54,6 +56,32 @@ class Classement(db.Model):
         db.ForeignKey('universite.id_universite', ondelete='CASCADE'),
         nullable=False
     )
+    # Cles denormalisees : filtres et regroupements par pays ou region sans
+    # jointure. Maintenues par services.denormalisation (populate_db.py).
+    id_pays = db.Column(
+        db.Integer,
+        db.ForeignKey('pays.id_pays', ondelete='SET NULL'),
+        nullable=True
+    )
+    id_region = db.Column(
+        db.Integer,
+        db.ForeignKey('region.id_region', ondelete='SET NULL'),
+        nullable=True
+    )
+
+    # Index : filtre par annee avec tri par rang ou par indicateur (listes,
+    # top 5), historique d'une universite, filtres pays/region par annee.
+    # Crees par db.create_all() et, sur une base existante, par
+    # services.index.creer_index_manquants.
+    __table_args__ = (
+        db.Index('ix_classement_annee_rang', 'annee', 'rang'),
+        db.Index('uq_classement_univ_annee', 'id_univ', 'annee', unique=True),
+        db.Index('ix_classement_annee_enseig', 'annee', 'indic_enseig'),
+        db.Index('ix_classement_annee_rech', 'annee', 'indic_qualite_rech'),
+        db.Index('ix_classement_annee_pays', 'annee', 'id_pays'),
+        db.Index('ix_classement_annee_region', 'annee', 'id_region'),
+    )
+
     # Relation N-1 avec Université
     universite = db.relationship(
         'Universite',
@@ -88,5 +116,7 @@ class Classement(db.Model):
             'indic_rel_intern' : self.indic_rel_intern,
             'ratio_fem' : self.ratio_fem,
             'ratio_hom' : self.ratio_hom,
-            'id_univ' : self.id_univ
+            'id_univ' : self.id_univ,
+            'id_pays' : self.id_pays,
+            'id_region' : self.id_region
         }
\ No newline at end of file
@@ -0,0 +1,33 @@
+"""
+Modele SQLAlchemy pour la table Ingestion.
+
+Chaque execution de scripts/populate_db.py enregistre une ligne : son jeton
+identifie la version des donnees servie par l'application (cles de cache,
+ETag).
+"""
+
+
+from models import db
+
+
+class Ingestion(db.Model):
+    """
+    Classe ORM representant une execution du pipeline de peuplement.
+
+    Attributes:
+        id_ingestion (int): Cle primaire auto-incrementee.
+        jeton (str): Identifiant unique de l'ingestion (uuid hexadecimal).
+        horodatage (datetime): Date de fin du peuplement (UTC).
+        nb_classements (int): Nombre de classements en base a la fin du peuplement.
+    """
+
+    __tablename__ = 'ingestion'
+
+    id_ingestion = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    jeton = db.Column(db.Text, nullable=False, unique=True)
+    horodatage = db.Column(db.DateTime, nullable=False)
+    nb_classements = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet Ingestion."""
+        return f"<Ingestion {self.id_ingestion}: {self.jeton}>"
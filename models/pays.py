@@ -48,6 +48,10 @@ class Pays(db.Model):
         nullable=True
     )
 
+    __table_args__ = (
+        db.Index('ix_pays_region', 'id_region'),
+    )
+
     # Relations
     region = db.relationship('Region', back_populates='pays', lazy='select')
     universites = db.relationship(
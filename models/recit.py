@@ -0,0 +1,34 @@
+"""
+Modele SQLAlchemy pour la table RecitClassement.
+
+Texte de presentation (storytelling) de la fiche d'une universite pour
+chaque ligne de classement. Derive de Classement, il est genere en bloc par
+services.recits lors du peuplement (scripts/populate_db.py).
+"""
+
+
+from models import db
+
+
+class RecitClassement(db.Model):
+    """
+    Classe ORM representant le recit d'une ligne de classement.
+
+    Attributes:
+        id_classement (int): Ligne de classement (cle primaire et etrangere).
+        texte (str): Recit HTML affiche sur la fiche de l'universite.
+    """
+
+    __tablename__ = 'recit_classement'
+
+    id_classement = db.Column(
+        db.Integer,
+        db.ForeignKey('classement.id_classement', ondelete='CASCADE'),
+        primary_key=True,
+        autoincrement=False
+    )
+    texte = db.Column(db.Text, nullable=False)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet RecitClassement."""
+        return f"<RecitClassement {self.id_classement}>"
@@ -0,0 +1,140 @@
+"""
+Modeles SQLAlchemy des tables de synthese.
+
+Ces tables sont derivees de Classement et reconstruites par
+scripts/populate_db.py apres l'insertion des classements. Les moyennes
+sont stockees pour la lecture directe d'une annee ; les sommes et effectifs
+non nuls permettent de recombiner plusieurs annees sans repasser par les
+tables de base.
+"""
+
+
+from models import db
+
+
+class ResumeAnnee(db.Model):
+    """
+    Classe ORM representant les indicateurs globaux d'une annee.
+
+    Attributes:
+        annee (int): Annee (cle primaire).
+        nb_classements (int): Nombre de classements de l'annee.
+        nb_pays (int): Nombre de pays representes.
+        moy_score_global (float): Moyenne du score global.
+        moy_enseig (float): Moyenne de l'indicateur enseignement.
+        moy_qualite_rech (float): Moyenne de l'indicateur qualite de la recherche.
+        moy_ratio_fem_hom (float): Moyenne du ratio femmes / hommes.
+        moy_etud_internationaux (float): Moyenne du pourcentage d'etudiants internationaux.
+    """
+
+    __tablename__ = 'resume_annee'
+
+    annee = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    nb_classements = db.Column(db.Integer, nullable=False, default=0)
+    nb_pays = db.Column(db.Integer, nullable=False, default=0)
+    moy_score_global = db.Column(db.Float)
+    moy_enseig = db.Column(db.Float)
+    moy_qualite_rech = db.Column(db.Float)
+    moy_ratio_fem_hom = db.Column(db.Float)
+    moy_etud_internationaux = db.Column(db.Float)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet ResumeAnnee."""
+        return f"<ResumeAnnee {self.annee}: {self.nb_classements}>"
+
+
+class ResumeAnneePays(db.Model):
+    """
+    Classe ORM representant les agregats d'un pays pour une annee.
+
+    Attributes:
+        annee (int): Annee.
+        id_pays (int): Cle etrangere vers Pays.
+        nb_classements (int): Nombre de classements du pays pour l'annee.
+        moy_enseig (float): Moyenne de l'indicateur enseignement.
+        moy_qualite_rech (float): Moyenne de l'indicateur qualite de la recherche.
+        somme_* (float) / nb_* (int): Somme et effectif non nul de chaque indicateur.
+    """
+
+    __tablename__ = 'resume_annee_pays'
+
+    annee = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_pays = db.Column(
+        db.Integer,
+        db.ForeignKey('pays.id_pays', ondelete='CASCADE'),
+        primary_key=True
+    )
+    nb_classements = db.Column(db.Integer, nullable=False, default=0)
+    moy_enseig = db.Column(db.Float)
+    moy_qualite_rech = db.Column(db.Float)
+    somme_enseig = db.Column(db.Float)
+    nb_enseig = db.Column(db.Integer, nullable=False, default=0)
+    somme_qualite_rech = db.Column(db.Float)
+    nb_qualite_rech = db.Column(db.Integer, nullable=False, default=0)
+    somme_score_global = db.Column(db.Float)
+    nb_score_global = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet ResumeAnneePays."""
+        return f"<ResumeAnneePays {self.annee}/{self.id_pays}: {self.nb_classements}>"
+
+
+class ResumeAnneeRegion(db.Model):
+    """
+    Classe ORM representant les agregats d'une region pour une annee.
+
+    Attributes:
+        annee (int): Annee.
+        id_region (int): Cle etrangere vers Region.
+        nb_classements (int): Nombre de classements de la region pour l'annee.
+        somme_* (float) / nb_* (int): Somme et effectif non nul de chaque indicateur.
+    """
+
+    __tablename__ = 'resume_annee_region'
+
+    annee = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    id_region = db.Column(
+        db.Integer,
+        db.ForeignKey('region.id_region', ondelete='CASCADE'),
+        primary_key=True
+    )
+    nb_classements = db.Column(db.Integer, nullable=False, default=0)
+    somme_enseig = db.Column(db.Float)
+    nb_enseig = db.Column(db.Integer, nullable=False, default=0)
+    somme_qualite_rech = db.Column(db.Float)
+    nb_qualite_rech = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet ResumeAnneeRegion."""
+        return f"<ResumeAnneeRegion {self.annee}/{self.id_region}: {self.nb_classements}>"
+
+
+class ResumeTranche(db.Model):
+    """
+    Classe ORM representant les agregats d'une tranche d'un indicateur
+    propre a chaque classement (part d'etudiants internationaux, ratio F/H).
+
+    Attributes:
+        annee (int): Annee.
+        axe (str): Indicateur decoupe ('intern' ou 'ratio_fh').
+        classe (str): Libelle de la tranche.
+        nb_classements (int): Nombre de classements dans la tranche.
+        somme_* (float) / nb_* (int): Somme et effectif non nul de chaque indicateur.
+    """
+
+    __tablename__ = 'resume_tranche'
+
+    annee = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    axe = db.Column(db.Text, primary_key=True)
+    classe = db.Column(db.Text, primary_key=True)
+    nb_classements = db.Column(db.Integer, nullable=False, default=0)
+    somme_env_rech = db.Column(db.Float)
+    nb_env_rech = db.Column(db.Integer, nullable=False, default=0)
+    somme_enseig = db.Column(db.Float)
+    nb_enseig = db.Column(db.Integer, nullable=False, default=0)
+    somme_qualite_rech = db.Column(db.Float)
+    nb_qualite_rech = db.Column(db.Integer, nullable=False, default=0)
+
+    def __repr__(self):
+        """Representation textuelle de l'objet ResumeTranche."""
+        return f"<ResumeTranche {self.annee}/{self.axe}/{self.classe}: {self.nb_classements}>"
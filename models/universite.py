@@ -25,6 +25,11 @@ class Universite(db.Model):
     nom_univ = db.Column(db.Text)
     id_pays = db.Column(db.Integer,
         db.ForeignKey('pays.id_pays',ondelete="SET NULL"))
+
+    __table_args__ = (
+        db.Index('ix_universite_pays', 'id_pays'),
+        db.Index('ix_universite_nom', 'nom_univ'),
+    )
     
     # Relation N-1 avec Pays
     
@@ -0,0 +1,302 @@
+"""
+Mesure les performances des routes sur une copie de univ.db.
+
+Chaque route est appelee plusieurs fois via le client de test Flask
+(create_app('testing') pointe sur la copie, cache applicatif desactive par
+defaut), en deux series mesurees separement :
+
+- a froid : avant chaque appel, les objets construits par version des
+  donnees (magasin en colonnes, index, profils... services.version) et le
+  cache de resultats sont oublies ; l'appel paie donc leur construction ;
+- a chaud : apres un echauffement, les appels reutilisent ces objets.
+
+Pour chaque route et chaque serie : latences p50/p95/p99, nombre de
+requetes SQL et nombre de lignes lues par requete HTTP. Les resultats sont ecrits en
+JSON ; compares a un fichier de reference, ils font echouer l'execution
+(code retour 1) au-dela du seuil de regression.
+
+Usage :
+    python scripts/benchmark_routes.py
+    python scripts/benchmark_routes.py --repetitions 50 --repetitions-froid 5 --sortie avant.json
+    python scripts/benchmark_routes.py --reference avant.json --seuil 0.2
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+
+import numpy as np
+
+# Ajout du repertoire parent au path pour les imports
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+# Routes mesurees : (nom, URL)
+ROUTES = [
+    ('accueil', '/'),
+    ('accueil_2016', '/?annee=2016'),
+    ('universites', '/universites'),
+    ('universites_page_3', '/universites?page=3'),
+    ('universites_filtre_pays', '/universites?pays=France&annee=2020'),
+    ('universites_filtre_scores', '/universites?score_enseig_min=50&score_rech_min=40'),
+    ('universites_annee_page_2', '/universites?annee=2019&page=2'),
+    ('fiche_1', '/universite/1'),
+    ('fiche_500', '/universite/500'),
+    ('statistiques', '/statistiques'),
+    ('api_accueil', '/api/charts/accueil'),
+    ('api_universites', '/api/charts/universites'),
+    ('api_statistiques', '/api/charts/statistiques'),
+    ('api_historique', '/api/charts/historique?id_univ=1'),
+]
+
+
+class _Compteurs:
+    """Requetes SQL executees et lignes lues depuis le dernier remise_a_zero()."""
+
+    requetes = 0
+    lignes = 0
+
+    @classmethod
+    def remise_a_zero(cls):
+        cls.requetes = 0
+        cls.lignes = 0
+
+
+class _CurseurCompte(sqlite3.Cursor):
+    """Curseur sqlite3 comptant les lignes renvoyees au pilote."""
+
+    def fetchone(self):
+        ligne = super().fetchone()
+        if ligne is not None:
+            _Compteurs.lignes += 1
+        return ligne
+
+    def fetchmany(self, *args, **kwargs):
+        lignes = super().fetchmany(*args, **kwargs)
+        _Compteurs.lignes += len(lignes)
+        return lignes
+
+    def fetchall(self):
+        lignes = super().fetchall()
+        _Compteurs.lignes += len(lignes)
+        return lignes
+
+
+class _ConnexionComptee(sqlite3.Connection):
+    """Connexion sqlite3 dont les curseurs comptent les lignes lues."""
+
+    def cursor(self, factory=_CurseurCompte):
+        return super().cursor(factory)
+
+
+def _instrumenter(engine):
+    """Branche les compteurs sur le moteur SQLAlchemy de l'application."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'do_connect')
+    def _connexion_comptee(dialect, enregistrement, cargs, cparams):
+        cparams['factory'] = _ConnexionComptee
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _compter_requete(*args):
+        _Compteurs.requetes += 1
+
+    # Les connexions deja ouvertes (create_all...) n'utilisent pas la fabrique
+    engine.dispose()
+
+
+def _oublier(app):
+    """Oublie les objets par version et le cache de resultats : le prochain appel est a froid."""
+    from services.cache import cache
+    from services.version import oublier_objets
+
+    oublier_objets()
+    with app.app_context():
+        cache.vider()
+
+
+def _serie(client, url, repetitions, avant_appel=None):
+    """
+    Appelle une route `repetitions` fois et agrege les mesures.
+
+    Args:
+        avant_appel (callable): Appele hors chronometre avant chaque appel.
+
+    Returns:
+        dict: statut, latences (ms) et compteurs par requete HTTP.
+    """
+    durees, requetes, lignes = [], [], []
+    statut = None
+    for _ in range(repetitions):
+        if avant_appel:
+            avant_appel()
+        _Compteurs.remise_a_zero()
+        debut = time.perf_counter()
+        reponse = client.get(url)
+        durees.append((time.perf_counter() - debut) * 1000)
+        requetes.append(_Compteurs.requetes)
+        lignes.append(_Compteurs.lignes)
+        statut = reponse.status_code
+
+    p50, p95, p99 = np.percentile(durees, [50, 95, 99])
+    return {
+        'statut': statut,
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'moyenne_ms': round(float(np.mean(durees)), 3),
+        'requetes_sql': int(np.median(requetes)),
+        'lignes_lues': int(np.median(lignes)),
+    }
+
+
+def _mesurer(app, client, url, repetitions, repetitions_froid, echauffement):
+    """
+    Mesure une route a froid puis a chaud.
+
+    Returns:
+        dict: url, et les mesures de _serie sous 'froid' et 'chaud'.
+    """
+    froid = _serie(client, url, repetitions_froid, lambda: _oublier(app))
+    for _ in range(echauffement):
+        client.get(url)
+    chaud = _serie(client, url, repetitions)
+    return {'url': url, 'froid': froid, 'chaud': chaud}
+
+
+def _comparer(resultats, reference, critere, seuil, plancher_ms):
+    """
+    Compare les mesures a une execution de reference.
+
+    Une route regresse, a froid comme a chaud, si sa latence (`critere` :
+    p50_ms, p95_ms ou p99_ms) depasse celle de la reference de plus de
+    `seuil` (et de plus de `plancher_ms`, pour ignorer le bruit des routes
+    tres rapides), ou si elle execute plus de requetes SQL.
+
+    Returns:
+        list: Descriptions des regressions.
+    """
+    regressions = []
+    for nom, mesures in resultats['routes'].items():
+        for serie in ('froid', 'chaud'):
+            mesure = mesures[serie]
+            avant = reference.get('routes', {}).get(nom, {}).get(serie)
+            if not avant:
+                continue
+            limite = avant[critere] * (1 + seuil)
+            if mesure[critere] > limite and mesure[critere] - avant[critere] > plancher_ms:
+                regressions.append(
+                    f"{nom} ({serie}) : {critere} {mesure[critere]:.1f} ms "
+                    f"(reference {avant[critere]:.1f} ms, limite {limite:.1f} ms)"
+                )
+            if mesure['requetes_sql'] > avant['requetes_sql']:
+                regressions.append(
+                    f"{nom} ({serie}) : {mesure['requetes_sql']} requetes SQL "
+                    f"(reference {avant['requetes_sql']})"
+                )
+    return regressions
+
+
+def main():
+    """
+    Fonction principale du benchmark.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark des routes sur une copie de univ.db")
+    parser.add_argument('--base', default=str(BASE_DIR / 'univ.db'), help="Base SQLite a copier")
+    parser.add_argument('--repetitions', type=int, default=30, help="Appels mesures a chaud par route")
+    parser.add_argument('--repetitions-froid', type=int, default=5, help="Appels mesures a froid par route")
+    parser.add_argument('--echauffement', type=int, default=2, help="Appels non mesures par route")
+    parser.add_argument('--avec-cache', action='store_true', help="Active le cache applicatif")
+    parser.add_argument('--moteur', choices=['sql', 'colonnes'], help="MOTEUR_REQUETES a utiliser")
+    parser.add_argument('--sortie', help="Fichier JSON des resultats (defaut : benchmarks/<date>.json)")
+    parser.add_argument('--reference', help="Resultats JSON d'une execution precedente")
+    parser.add_argument('--critere', choices=['p50_ms', 'p95_ms', 'p99_ms'], default='p50_ms',
+                        help="Latence comparee a la reference")
+    parser.add_argument('--seuil', type=float, default=0.2, help="Regression toleree (0.2 = +20%%)")
+    parser.add_argument('--plancher-ms', type=float, default=2.0, help="Ecart de latence minimal considere")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.base):
+        logger.error(f"Base introuvable : {args.base}")
+        sys.exit(1)
+
+    repertoire = tempfile.mkdtemp(prefix='benchmark_')
+    copie = os.path.join(repertoire, 'univ.db')
+    shutil.copy2(args.base, copie)
+
+    # A definir avant l'import de application (qui cree une instance au chargement)
+    os.environ['FLASK_CONFIG'] = 'testing'
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + copie
+    if args.moteur:
+        os.environ['MOTEUR_REQUETES'] = args.moteur
+
+    from application import create_app
+    from models import db
+
+    try:
+        app = create_app('testing')
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.config['CACHE_ACTIF'] = args.avec_cache
+        app.extensions['cache_resultats'].actif = args.avec_cache
+
+        with app.app_context():
+            _instrumenter(db.engine)
+
+        client = app.test_client()
+        resultats = {
+            'date': datetime.now().isoformat(timespec='seconds'),
+            'base': os.path.abspath(args.base),
+            'repetitions': args.repetitions,
+            'repetitions_froid': args.repetitions_froid,
+            'avec_cache': args.avec_cache,
+            'moteur': app.config.get('MOTEUR_REQUETES'),
+            'routes': {},
+        }
+        for nom, url in ROUTES:
+            mesures = _mesurer(app, client, url, args.repetitions, args.repetitions_froid, args.echauffement)
+            resultats['routes'][nom] = mesures
+            for serie in ('froid', 'chaud'):
+                mesure = mesures[serie]
+                logger.info(
+                    f"{nom:28} {serie:5} {mesure['statut']}  p50 {mesure['p50_ms']:8.2f} ms  "
+                    f"p95 {mesure['p95_ms']:8.2f} ms  p99 {mesure['p99_ms']:8.2f} ms  "
+                    f"sql {mesure['requetes_sql']:3}  lignes {mesure['lignes_lues']}"
+                )
+    finally:
+        shutil.rmtree(repertoire, ignore_errors=True)
+
+    sortie = args.sortie or str(BASE_DIR / 'benchmarks' / f"{datetime.now():%Y%m%d_%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(sortie)), exist_ok=True)
+    with open(sortie, 'w', encoding='utf-8') as f:
+        json.dump(resultats, f, indent=2, ensure_ascii=False)
+    logger.info(f"Resultats ecrits dans {sortie}")
+
+    if args.reference:
+        with open(args.reference, encoding='utf-8') as f:
+            reference = json.load(f)
+        regressions = _comparer(resultats, reference, args.critere, args.seuil, args.plancher_ms)
+        if regressions:
+            for regression in regressions:
+                logger.error(regression)
+            logger.error(f"{len(regressions)} regression(s) par rapport a {args.reference}")
+            sys.exit(1)
+        logger.info(f"Aucune regression par rapport a {args.reference}")
+
+
+if __name__ == '__main__':
+    main()
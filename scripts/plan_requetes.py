@@ -0,0 +1,150 @@
+"""
+Rapport EXPLAIN QUERY PLAN des requetes SQL executees par chaque route.
+
+Chaque route de scripts/benchmark_routes.py est appelee une fois sur une
+copie de univ.db (cache applicatif desactive) ; chaque requete SQL emise
+est reexecutee sous EXPLAIN QUERY PLAN avec ses parametres. Le rapport
+indique, par requete, les index utilises et les tables lues integralement.
+
+Certaines lectures completes sont voulues : elles sont etiquetees dans le
+code (execution_options(etiquette=...)) et listees dans PARCOURS_AUTORISES
+avec leur justification. Elles restent dans le rapport mais ne font pas
+echouer --strict.
+
+Usage :
+    python scripts/plan_requetes.py
+    python scripts/plan_requetes.py --detail           # plans complets
+    python scripts/plan_requetes.py --strict           # code retour 1 si classement est parcourue sans index
+    python scripts/plan_requetes.py --sortie plans.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+
+# Ajout du repertoire parent au path pour les imports
+BASE_DIR = Path(__file__).parent.parent
+sys.path.insert(0, str(BASE_DIR))
+
+from benchmark_routes import ROUTES
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# Tables dont un parcours complet est signale par --strict
+TABLES_SURVEILLEES = ('classement',)
+
+# Parcours complets voulus, exclus de --strict : etiquette de la requete -> justification
+PARCOURS_AUTORISES = {
+    'colonnes.chargement': "chargement du magasin en colonnes (services/colonnes.py), "
+                           "une fois par version des donnees et par processus",
+}
+
+
+def _capturer(engine, requetes):
+    """Enregistre dans `requetes` chaque instruction SQL, ses parametres et son etiquette."""
+    from sqlalchemy import event
+
+    @event.listens_for(engine, 'before_cursor_execute')
+    def _enregistrer(connexion, curseur, instruction, parametres, contexte, multiple):
+        if not multiple and instruction.lstrip().upper().startswith('SELECT'):
+            etiquette = contexte.execution_options.get('etiquette') if contexte else None
+            requetes.append((instruction, tuple(parametres or ()), etiquette))
+
+
+def main():
+    """
+    Fonction principale du rapport.
+    """
+    parser = argparse.ArgumentParser(description="Plans d'execution des requetes de chaque route")
+    parser.add_argument('--base', default=str(BASE_DIR / 'univ.db'), help="Base SQLite a copier")
+    parser.add_argument('--moteur', choices=['sql', 'colonnes'], help="MOTEUR_REQUETES a utiliser")
+    parser.add_argument('--detail', action='store_true', help="Affiche les plans complets")
+    parser.add_argument('--strict', action='store_true',
+                        help="Echoue si une table surveillee est parcourue sans index")
+    parser.add_argument('--sortie', help="Fichier JSON du rapport")
+    args = parser.parse_args()
+
+    if not os.path.exists(args.base):
+        logger.error(f"Base introuvable : {args.base}")
+        sys.exit(1)
+
+    repertoire = tempfile.mkdtemp(prefix='plans_')
+    copie = os.path.join(repertoire, 'univ.db')
+    shutil.copy2(args.base, copie)
+
+    # A definir avant l'import de application (qui cree une instance au chargement)
+    os.environ['FLASK_CONFIG'] = 'testing'
+    os.environ['TEST_DATABASE_URL'] = 'sqlite:///' + copie
+    if args.moteur:
+        os.environ['MOTEUR_REQUETES'] = args.moteur
+
+    from application import create_app
+    from models import db
+    from services.index import plan_requete
+
+    rapport = {}
+    parcours_complets = []
+    try:
+        app = create_app('testing')
+        app.config['WTF_CSRF_ENABLED'] = False
+        app.extensions['cache_resultats'].actif = False
+        client = app.test_client()
+
+        with app.app_context():
+            requetes = []
+            _capturer(db.engine, requetes)
+
+            for nom, url in ROUTES:
+                del requetes[:]
+                statut = client.get(url).status_code
+                plans = []
+                connexion = db.engine.raw_connection()
+                try:
+                    for instruction, parametres, etiquette in requetes:
+                        plan = plan_requete(connexion.driver_connection, instruction, parametres)
+                        plan['sql'] = ' '.join(instruction.split())
+                        plan['autorise'] = PARCOURS_AUTORISES.get(etiquette)
+                        plans.append(plan)
+                finally:
+                    connexion.close()
+                rapport[nom] = {'url': url, 'statut': statut, 'requetes': plans}
+
+                logger.info(f"{nom} ({url}) : {statut}, {len(plans)} requete(s)")
+                for i, plan in enumerate(plans, 1):
+                    index = ', '.join(plan['index']) or '-'
+                    parcours = ', '.join(plan['parcours']) or '-'
+                    autorise = f" (autorise : {plan['autorise']})" if plan['autorise'] and plan['parcours'] else ''
+                    logger.info(f"  [{i}] index : {index} | parcours complets : {parcours}{autorise}")
+                    if args.detail:
+                        logger.info(f"      {plan['sql'][:160]}")
+                        for etape in plan['etapes']:
+                            logger.info(f"        {etape}")
+                    for table in plan['parcours']:
+                        if table in TABLES_SURVEILLEES and not plan['autorise']:
+                            parcours_complets.append(f"{nom} [{i}] : parcours complet de {table}")
+    finally:
+        shutil.rmtree(repertoire, ignore_errors=True)
+
+    if args.sortie:
+        with open(args.sortie, 'w', encoding='utf-8') as f:
+            json.dump(rapport, f, indent=2, ensure_ascii=False)
+        logger.info(f"Rapport ecrit dans {args.sortie}")
+
+    for ligne in parcours_complets:
+        logger.warning(ligne)
+    if parcours_complets and args.strict:
+        logger.error(f"{len(parcours_complets)} parcours complet(s) de {', '.join(TABLES_SURVEILLEES)}")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,6 +10,14 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 from application import create_app
 from models import db, Region, Pays, Universite, Classement
 from config import Config
+from services import (construire_resumes, verifier_resumes,
+                      synchroniser_cles_geographiques, verifier_cles_geographiques)
+from services.index import analyser_base
+from services.plein_texte import installer_index_texte, reconstruire_index_texte, verifier_index_texte
+from services.recits import construire_recits, verifier_recits
+from services.centiles import construire_centiles, verifier_centiles
+from services.trigrammes import IndexTrigrammes
+from services.version import enregistrer_ingestion
 
 logging.basicConfig(
     level=logging.INFO,
@@ -284,6 +292,10 @@ def main():
         logger.info("Reinitialisation des tables...")
         db.drop_all()
         db.create_all()
+        # Table plein texte (hors metadonnees) : declencheurs recrees, contenu vide,
+        # puis alimentee par les declencheurs lors des insertions
+        installer_index_texte()
+        reconstruire_index_texte()
 
         # Chargement du CSV fusionne
         csv_path = Config.CSV_FUSIONNE
@@ -310,6 +322,45 @@ def main():
         logger.info("Insertion des classements...")
         peupler_classements(df, univ_mapping)
 
+        logger.info("-" * 40)
+        logger.info("Synchronisation des cles pays/region des classements...")
+        synchroniser_cles_geographiques()
+
+        logger.info("-" * 40)
+        logger.info("Construction des tables de synthese...")
+        construire_resumes()
+
+        logger.info("-" * 40)
+        logger.info("Generation des recits des fiches universites...")
+        construire_recits()
+
+        logger.info("-" * 40)
+        logger.info("Calcul des centiles annuels des indicateurs...")
+        construire_centiles()
+        # Statistiques des index (crees par create_all) pour l'optimiseur
+        analyser_base()
+        anomalies = (verifier_cles_geographiques() + verifier_resumes() + verifier_index_texte()
+                     + verifier_recits() + verifier_centiles())
+        if anomalies:
+            for anomalie in anomalies:
+                logger.error(anomalie)
+            logger.error("Tables derivees incoherentes. Arret.")
+            sys.exit(1)
+
+        # Universites probablement identiques sous deux orthographes : signalees, non fusionnees
+        doublons = IndexTrigrammes.depuis_base().doublons()
+        for premiere, seconde, similarite in doublons:
+            logger.warning(
+                f"Doublon probable ({similarite:.2f}) : {premiere.nom_univ} [{premiere.id_universite}] / "
+                f"{seconde.nom_univ} [{seconde.id_universite}] ({premiere.nom_pays})"
+            )
+        if doublons:
+            logger.warning(f"{len(doublons)} doublon(s) probable(s) d'universites a verifier")
+
+        # Nouvelle version des donnees : invalide les caches de l'application
+        ingestion = enregistrer_ingestion()
+        logger.info(f"Ingestion enregistree : {ingestion.jeton}")
+
         # Resume final
         logger.info("=" * 60)
         logger.info("RESUME DU PEUPLEMENT")
@@ -0,0 +1,87 @@
+"""
+Verifie la coherence des donnees derivees avec les tables de base :
+cles pays/region denormalisees de classement, tables de synthese, index
+plein texte des noms d'universites, recits des fiches et centiles annuels.
+
+Usage :
+    python scripts/verifier_resumes.py            # verification seule
+    python scripts/verifier_resumes.py --reparer  # resynchronise / reconstruit si divergence
+
+Code de retour 0 si les donnees derivees sont coherentes, 1 sinon.
+"""
+
+import sys
+import logging
+from pathlib import Path
+
+# Ajout du repertoire parent au path pour les imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from application import create_app
+from services import (construire_resumes, verifier_resumes,
+                      synchroniser_cles_geographiques, verifier_cles_geographiques)
+from services.plein_texte import reconstruire_index_texte, verifier_index_texte
+from services.recits import construire_recits, verifier_recits
+from services.centiles import construire_centiles, verifier_centiles
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    """
+    Fonction principale de verification.
+    """
+    reparer = '--reparer' in sys.argv[1:]
+    app = create_app('production')
+
+    with app.app_context():
+        anomalies = verifier_cles_geographiques()
+        if anomalies and reparer:
+            logger.warning(f"{len(anomalies)} divergence(s), resynchronisation des cles pays/region...")
+            synchroniser_cles_geographiques()
+            anomalies = verifier_cles_geographiques()
+
+        # Les syntheses sont regroupees par les cles denormalisees : verifiees ensuite
+        anomalies_resumes = verifier_resumes()
+        if anomalies_resumes and reparer:
+            logger.warning(f"{len(anomalies_resumes)} divergence(s), reconstruction des syntheses...")
+            construire_resumes()
+            anomalies_resumes = verifier_resumes()
+        anomalies += anomalies_resumes
+
+        anomalies_texte = verifier_index_texte()
+        if anomalies_texte and reparer:
+            logger.warning(f"{len(anomalies_texte)} divergence(s), reconstruction de l'index plein texte...")
+            reconstruire_index_texte()
+            anomalies_texte = verifier_index_texte()
+        anomalies += anomalies_texte
+
+        anomalies_recits = verifier_recits()
+        if anomalies_recits and reparer:
+            logger.warning(f"{len(anomalies_recits)} divergence(s), regeneration des recits...")
+            construire_recits()
+            anomalies_recits = verifier_recits()
+        anomalies += anomalies_recits
+
+        anomalies_centiles = verifier_centiles()
+        if anomalies_centiles and reparer:
+            logger.warning(f"{len(anomalies_centiles)} divergence(s), recalcul des centiles...")
+            construire_centiles()
+            anomalies_centiles = verifier_centiles()
+        anomalies += anomalies_centiles
+
+        if anomalies:
+            for anomalie in anomalies:
+                logger.error(anomalie)
+            logger.error(f"{len(anomalies)} divergence(s) entre les donnees derivees et les tables de base")
+            sys.exit(1)
+
+        logger.info("Cles denormalisees, tables de synthese, index plein texte, recits et centiles coherents avec les tables de base")
+
+
+if __name__ == '__main__':
+    main()
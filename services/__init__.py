@@ -0,0 +1,38 @@
+"""
+Services applicatifs pour le projet World-Univ-Rank.
+
+Ce package regroupe la logique de calcul utilisee par les routes Flask :
+- dimensions : annees, pays et regions disponibles (par version des donnees)
+- bitmaps : index bitmap des classements et comptes de facettes
+- tableau_bord : agregation des KPI de la page d'accueil
+- statistiques : agregats par tranche de la page Statistiques
+- graphiques : donnees JSON des graphiques (/api/charts/<nom>)
+- palmares : top-k / bottom-k annuels des indicateurs (par version des donnees)
+- profils : profil d'une universite et historique (une requete, par version des donnees)
+- recits : recits des fiches universites (generes en bloc au peuplement)
+- centiles : centiles annuels des indicateurs (« top x % », calcules en bloc)
+- similaires : universites au profil d'indicateurs le plus proche (plus proches voisins)
+- comparaison : historiques de plusieurs universites pivotes (annees x indicateurs)
+- curseurs : curseurs opaques de pagination de la liste
+- export : export en flux (CSV, NDJSON) de la liste filtree
+- denormalisation : cles pays/region recopiees sur classement
+- fragments : balise {% cache %} des templates (HTML en cache par version)
+- index : index secondaires manquants et plans d'execution
+- plein_texte : recherche plein texte des noms d'universites (FTS5)
+- trigrammes : correspondance approchee des noms (fautes de frappe, doublons)
+- resume : construction et verification des tables de synthese
+- schema : controle au demarrage et mise a niveau d'une base anterieure (flask init-db)
+"""
+
+from services.tableau_bord import IndicateursTableauBord, calculer_tableau_bord
+from services.statistiques import calculer_statistiques
+from services.resume import construire_resumes, verifier_resumes
+from services.denormalisation import (synchroniser_cles_geographiques,
+                                      verifier_cles_geographiques)
+
+__all__ = [
+    'IndicateursTableauBord', 'calculer_tableau_bord',
+    'calculer_statistiques',
+    'construire_resumes', 'verifier_resumes',
+    'synchroniser_cles_geographiques', 'verifier_cles_geographiques'
+]
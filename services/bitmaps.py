@@ -0,0 +1,249 @@
+"""
+Index bitmap des classements et comptes de facettes.
+
+Chaque ligne eligible de la liste des universites (memes regles que
+services.recherche) occupe un bit, dans l'ordre de la liste (annee
+decroissante, rang, id_classement). Un entier Python sert de bitmap :
+
+- un bitmap par annee, par pays et par region ;
+- pour chaque score filtrable, des bitmaps « valeur >= s » pour s entier
+  de 0 a 100 (encodage par intervalles), completes a la volee pour un
+  seuil decimal ;
+- le filtre par nom passe par l'index plein texte (une requete SQL).
+
+Pour les tris de la liste sur un indicateur, la permutation annuelle de la
+colonne est lue dans le magasin en colonnes (MagasinColonnes.ordre) : une
+page triee est une tranche de cette permutation restreinte au bitmap des
+filtres.
+
+Une combinaison de filtres du formulaire est un ET bit a bit, son effectif
+un comptage de bits, et les facettes (effectif par annee, pays ou region
+sous les autres filtres) s'obtiennent sans aucun GROUP BY. L'index est
+construit une fois par version des donnees, sans requete : les lignes, les
+dimensions et les valeurs sont celles du magasin en colonnes
+(services.colonnes), seule copie des classements en memoire, charge quel
+que soit MOTEUR_REQUETES.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from models import db
+from services.colonnes import obtenir_magasin
+from services.plein_texte import ids_universites_texte
+from services.version import obtenir_par_version
+
+
+# Scores filtrables du formulaire : nom du filtre -> colonne
+SCORES = {
+    'score_enseig_min': 'indic_enseig',
+    'score_rech_min': 'indic_qualite_rech',
+}
+
+# Colonnes de tri proposees (valeurs manquantes toujours en fin de liste)
+COLONNES_TRI = (
+    'score_global',
+    'indic_enseig',
+    'indic_env_rech',
+    'indic_qualite_rech',
+    'indic_impact_industrie',
+    'indic_rel_intern',
+    'pop_etud',
+    'etud_internationaux_pct',
+)
+
+# Effectif total et effectifs par valeur de chaque dimension
+Facettes = namedtuple('Facettes', ['total', 'annees', 'pays', 'regions'])
+
+
+def _bitmap(positions, taille):
+    """Bitmap (entier) dont les bits `positions` sont a 1."""
+    bits = np.zeros(taille, dtype=bool)
+    bits[positions] = True
+    return int.from_bytes(np.packbits(bits, bitorder='little').tobytes(), 'little')
+
+
+def positions_bitmap(bitmap, taille):
+    """Positions (np.ndarray croissant) des bits a 1 d'un bitmap."""
+    octets = np.frombuffer(bitmap.to_bytes((taille + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(octets, bitorder='little')[:taille])
+
+
+class IndexBitmaps:
+    """
+    Bitmaps des lignes de la liste des universites.
+
+    Attributes:
+        version (str): Empreinte des donnees indexees.
+        taille (int): Nombre de lignes eligibles (bits).
+        id_classement, id_univ (np.ndarray): Identifiants par position.
+        tout (int): Bitmap de toutes les lignes.
+        annees, pays, regions (dict): Valeur -> bitmap.
+        seuils (dict): Colonne -> liste de 101 bitmaps « valeur >= s ».
+        magasin (MagasinColonnes): Classements en colonnes de la meme version.
+        lignes (np.ndarray): Ligne du magasin de chaque position.
+        position (np.ndarray): Position de chaque ligne du magasin (-1 si non eligible).
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.magasin = obtenir_magasin()
+        magasin = self.magasin
+        eligibles = (~np.isnan(magasin.score_global) & (magasin.region_idx >= 0)
+                     & (magasin.rang != np.iinfo(np.int64).max))
+        self.lignes = magasin.ordre_liste[eligibles[magasin.ordre_liste]]
+        self.position = np.full(magasin.taille, -1, dtype=np.int64)
+        self.position[self.lignes] = np.arange(self.lignes.size)
+
+        self.taille = int(self.lignes.size)
+        self.id_classement = magasin.id_classement[self.lignes]
+        self.id_univ = magasin.id_univ[self.lignes]
+        self.tout = (1 << self.taille) - 1
+
+        self.annees = self._par_valeur(magasin.annee[self.lignes].tolist())
+        self.pays = self._par_valeur(magasin.pays_noms[magasin.pays_idx[self.lignes]].tolist())
+        self.regions = self._par_valeur(magasin.region_noms[magasin.region_idx[self.lignes]].tolist())
+
+        self.seuils = {}
+        for colonne in SCORES.values():
+            valeurs = self.valeurs(colonne)
+            self.seuils[colonne] = [_bitmap(np.flatnonzero(valeurs >= s), self.taille) for s in range(101)]
+
+    def _par_valeur(self, valeurs):
+        """Bitmap des positions de chaque valeur distincte."""
+        positions = {}
+        for position, valeur in enumerate(valeurs):
+            positions.setdefault(valeur, []).append(position)
+        return {valeur: _bitmap(p, self.taille) for valeur, p in positions.items()}
+
+    def valeurs(self, colonne, positions=None):
+        """
+        Valeurs d'une colonne numerique, lues dans le magasin en colonnes.
+
+        Args:
+            colonne (str): Colonne de services.colonnes.COLONNES_NUMERIQUES.
+            positions (np.ndarray): Positions voulues (toutes par defaut).
+
+        Returns:
+            np.ndarray: Valeurs float64 (NaN si absente), une par position.
+        """
+        lignes = self.lignes if positions is None else self.lignes[positions]
+        return getattr(self.magasin, colonne)[lignes]
+
+    def _au_moins(self, colonne, seuil):
+        """Bitmap des lignes dont la colonne vaut au moins `seuil`."""
+        if seuil <= 0:
+            return self.seuils[colonne][0]
+        if seuil > 100:
+            return _bitmap(np.flatnonzero(self.valeurs(colonne) >= seuil), self.taille)
+        entier = math.ceil(seuil)
+        bitmap = self.seuils[colonne][entier] if entier <= 100 else 0
+        if entier != seuil:
+            # Seuil decimal : lignes de [seuil, entier[ prises dans la tranche entiere inferieure
+            tranche = self.seuils[colonne][entier - 1] & ~bitmap
+            positions = positions_bitmap(tranche, self.taille)
+            bitmap |= _bitmap(positions[self.valeurs(colonne, positions) >= seuil], self.taille)
+        return bitmap
+
+    def _nom(self, nom):
+        """Bitmap des lignes des universites correspondant au nom (index plein texte)."""
+        ids = db.session.execute(ids_universites_texte(nom)).scalars().all()
+        return _bitmap(np.flatnonzero(np.isin(self.id_univ, np.array(ids, dtype=np.int64))), self.taille)
+
+    def _bitmaps_filtres(self, annee=None, pays=None, score_enseig_min=None, score_rech_min=None, nom=None):
+        """Bitmap de chaque filtre renseigne, par dimension."""
+        bitmaps = {}
+        if annee is not None:
+            bitmaps['annee'] = self.annees.get(annee, 0)
+        if pays:
+            bitmaps['pays'] = self.pays.get(pays, 0)
+        for filtre, colonne in SCORES.items():
+            seuil = {'score_enseig_min': score_enseig_min, 'score_rech_min': score_rech_min}[filtre]
+            if seuil is not None:
+                bitmaps[filtre] = self._au_moins(colonne, seuil)
+        if nom:
+            bitmaps['nom'] = self._nom(nom)
+        return bitmaps
+
+    @staticmethod
+    def _et(bitmaps, depart, sauf=None):
+        for dimension, bitmap in bitmaps.items():
+            if dimension != sauf:
+                depart &= bitmap
+        return depart
+
+    def filtrer(self, **filtres):
+        """
+        Bitmap des lignes satisfaisant tous les filtres (services.recherche.normaliser_filtres).
+
+        Returns:
+            int: Bitmap, dans l'ordre de la liste.
+        """
+        return self._et(self._bitmaps_filtres(**filtres), self.tout)
+
+    def facettes(self, **filtres):
+        """
+        Effectif de la recherche et comptes par annee, pays et region.
+
+        Le compte d'une valeur d'une dimension applique tous les filtres sauf
+        celui de cette dimension : il indique le resultat obtenu en choisissant
+        cette valeur.
+
+        Returns:
+            Facettes: total, et pour annees, pays et regions des listes de
+            couples (valeur, effectif) non nuls, par effectif decroissant.
+        """
+        bitmaps = self._bitmaps_filtres(**filtres)
+        resultat = self._et(bitmaps, self.tout)
+
+        def compter(dimension, par_valeur):
+            base = self._et(bitmaps, self.tout, sauf=dimension)
+            comptes = [(valeur, (base & bitmap).bit_count()) for valeur, bitmap in par_valeur.items()]
+            return sorted(((v, n) for v, n in comptes if n), key=lambda c: (-c[1], str(c[0])))
+
+        return Facettes(
+            resultat.bit_count(),
+            compter('annee', self.annees),
+            compter('pays', self.pays),
+            # Pas de filtre par region : les comptes suivent tous les filtres
+            compter(None, self.regions),
+        )
+
+    def ordonner(self, bitmap, colonne, decroissant=True, annee=None):
+        """
+        Positions d'un bitmap triees sur une colonne, annee par annee.
+
+        Args:
+            bitmap (int): Lignes a trier (filtrer()).
+            colonne (str): Colonne de COLONNES_TRI.
+            decroissant (bool): Sens du tri (valeurs manquantes en fin d'annee).
+            annee (int): Annee filtree ; sans annee, les annees se suivent de la plus recente a la plus ancienne.
+
+        Returns:
+            np.ndarray: Positions triees.
+        """
+        presentes = np.zeros(self.taille, dtype=bool)
+        presentes[positions_bitmap(bitmap, self.taille)] = True
+        annees = [annee] if annee is not None else sorted(self.annees, reverse=True)
+        if not annees:
+            return np.empty(0, dtype=np.int64)
+        # Permutations du magasin (toutes ses lignes) ramenees aux positions eligibles
+        ordre = self.position[np.concatenate([self.magasin.ordre(a, colonne, decroissant) for a in annees])]
+        ordre = ordre[ordre >= 0]
+        return ordre[presentes[ordre]]
+
+    def ids_classement(self, bitmap):
+        """id_classement des lignes d'un bitmap, dans l'ordre de la liste."""
+        return self.id_classement[positions_bitmap(bitmap, self.taille)]
+
+
+def obtenir_index_bitmaps():
+    """
+    Renvoie l'index bitmap de la version courante des donnees.
+
+    Returns:
+        IndexBitmaps: Index a jour, reconstruit apres une nouvelle ingestion.
+    """
+    return obtenir_par_version('bitmaps', IndexBitmaps)
@@ -0,0 +1,366 @@
+"""
+Cache de resultats et de reponses, invalide par la version des donnees.
+
+Deux niveaux :
+- memoire : LRU borne en taille avec duree de vie (TTL), propre au processus ;
+- fichier (optionnel, CACHE_REPERTOIRE) : survit aux redemarrages, borne
+  en nombre d'entrees par version (CACHE_FICHIER_MAX, les plus anciennes
+  sont supprimees a l'ecriture) et avec la meme duree de vie.
+
+Chaque cle contient l'empreinte de services.version : apres une
+reconstruction de univ.db, aucune entree anterieure ne peut plus etre
+servie, et les niveaux sont purges au premier acces suivant.
+
+Utilisation :
+    cache = CacheResultats()        # dans ce module
+    cache.init_app(app)             # dans create_app
+    cache.obtenir('top5', (annee,), lambda: calcul(annee))
+
+    @cache.conditionnel()           # ETag / Last-Modified, 304 sans calcul
+    @cache.reponse()                # sur une route GET sans contenu de session
+    def statistiques(): ...
+"""
+
+import hashlib
+import os
+import pickle
+import shutil
+import threading
+import time
+from collections import OrderedDict
+from functools import wraps
+
+from flask import current_app, request, make_response
+
+from services.version import empreinte_donnees, version_donnees
+
+
+_ABSENT = object()
+
+
+class _CacheMemoire:
+    """LRU en memoire, borne en nombre d'entrees, avec expiration."""
+
+    def __init__(self, taille_max, ttl):
+        self.taille_max = taille_max
+        self.ttl = ttl
+        self._entrees = OrderedDict()
+        self._verrou = threading.Lock()
+
+    def lire(self, cle):
+        with self._verrou:
+            entree = self._entrees.get(cle, _ABSENT)
+            if entree is _ABSENT:
+                return _ABSENT
+            expiration, valeur = entree
+            if expiration is not None and expiration < time.monotonic():
+                del self._entrees[cle]
+                return _ABSENT
+            self._entrees.move_to_end(cle)
+            return valeur
+
+    def ecrire(self, cle, valeur):
+        expiration = time.monotonic() + self.ttl if self.ttl else None
+        with self._verrou:
+            self._entrees[cle] = (expiration, valeur)
+            self._entrees.move_to_end(cle)
+            while len(self._entrees) > self.taille_max:
+                self._entrees.popitem(last=False)
+
+    def vider(self):
+        with self._verrou:
+            self._entrees.clear()
+
+    def __len__(self):
+        return len(self._entrees)
+
+
+class _CacheFichier:
+    """Entrees serialisees (pickle) dans un sous-repertoire par version, en nombre borne."""
+
+    def __init__(self, repertoire, ttl, taille_max):
+        self.repertoire = repertoire
+        self.ttl = ttl
+        self.taille_max = taille_max
+
+    def _chemin(self, version, cle):
+        return os.path.join(self.repertoire, version, cle + '.pkl')
+
+    def _expire(self, mtime):
+        return bool(self.ttl) and mtime + self.ttl < time.time()
+
+    def lire(self, version, cle):
+        chemin = self._chemin(version, cle)
+        try:
+            if self._expire(os.path.getmtime(chemin)):
+                os.remove(chemin)
+                return _ABSENT
+            with open(chemin, 'rb') as f:
+                return pickle.load(f)
+        except OSError:
+            return _ABSENT
+        except (pickle.PickleError, EOFError, AttributeError, ImportError):
+            # Fichier illisible (tronque, classe disparue) : supprime
+            self._supprimer(chemin)
+            return _ABSENT
+
+    def ecrire(self, version, cle, valeur):
+        chemin = self._chemin(version, cle)
+        try:
+            os.makedirs(os.path.dirname(chemin), exist_ok=True)
+            # Ecriture atomique : un autre processus ne lit jamais un fichier partiel
+            temporaire = f"{chemin}.{os.getpid()}.tmp"
+            with open(temporaire, 'wb') as f:
+                pickle.dump(valeur, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporaire, chemin)
+        except (OSError, pickle.PickleError, TypeError, AttributeError):
+            return
+        self._limiter(os.path.dirname(chemin))
+
+    @staticmethod
+    def _supprimer(chemin):
+        try:
+            os.remove(chemin)
+        except OSError:
+            pass
+
+    def _limiter(self, repertoire):
+        """Supprime les entrees expirees, puis les plus anciennes au-dela de taille_max."""
+        entrees = []
+        try:
+            with os.scandir(repertoire) as iterateur:
+                for entree in iterateur:
+                    if entree.name.endswith('.pkl'):
+                        try:
+                            entrees.append((entree.stat().st_mtime, entree.path))
+                        except OSError:
+                            pass
+        except OSError:
+            return
+        if len(entrees) <= self.taille_max:
+            return
+        entrees.sort()
+        valides = []
+        for mtime, chemin in entrees:
+            if self._expire(mtime):
+                self._supprimer(chemin)
+            else:
+                valides.append(chemin)
+        for chemin in valides[:max(len(valides) - self.taille_max, 0)]:
+            self._supprimer(chemin)
+
+    def purger(self, version_courante):
+        """Supprime les repertoires des versions de donnees obsoletes."""
+        try:
+            noms = os.listdir(self.repertoire)
+        except OSError:
+            return
+        for nom in noms:
+            if nom != version_courante:
+                shutil.rmtree(os.path.join(self.repertoire, nom), ignore_errors=True)
+
+    def vider(self):
+        shutil.rmtree(self.repertoire, ignore_errors=True)
+
+
+class _EtatCache:
+    """Etat du cache pour une application Flask."""
+
+    def __init__(self, config):
+        self.actif = config.get('CACHE_ACTIF', True)
+        self.memoire = _CacheMemoire(
+            config.get('CACHE_TAILLE_MAX', 512),
+            config.get('CACHE_TTL', 3600)
+        )
+        repertoire = config.get('CACHE_REPERTOIRE')
+        self.fichier = _CacheFichier(
+            repertoire, config.get('CACHE_TTL', 3600), config.get('CACHE_FICHIER_MAX', 2048)
+        ) if repertoire else None
+        self.version = None
+        self.verrou = threading.Lock()
+
+
+class CacheResultats:
+    """
+    Cache applicatif partage par toutes les routes.
+
+    Les valeurs mises en cache doivent etre serialisables (pickle) si le
+    niveau fichier est active : tuples, dictionnaires, objets simples.
+    """
+
+    def __init__(self, app=None):
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        """Initialise le cache pour une application (parametres CACHE_*)."""
+        app.extensions['cache_resultats'] = _EtatCache(app.config)
+
+    @property
+    def _etat(self):
+        return current_app.extensions['cache_resultats']
+
+    @property
+    def actif(self):
+        """Vrai si le cache est active pour l'application courante (CACHE_ACTIF)."""
+        return self._etat.actif
+
+    def version(self):
+        """
+        Empreinte courante des donnees ; purge les entrees d'une version precedente.
+
+        Returns:
+            str: Empreinte de services.version.
+        """
+        etat = self._etat
+        empreinte = empreinte_donnees()
+        if empreinte != etat.version:
+            with etat.verrou:
+                if empreinte != etat.version:
+                    etat.memoire.vider()
+                    if etat.fichier:
+                        etat.fichier.purger(empreinte)
+                    etat.version = empreinte
+        return empreinte
+
+    @staticmethod
+    def _cle(nom, params):
+        brut = repr((nom, params)).encode('utf-8')
+        return hashlib.sha256(brut).hexdigest()
+
+    def obtenir(self, nom, params, calcul):
+        """
+        Renvoie la valeur en cache pour (nom, params), sinon la calcule et la stocke.
+
+        Args:
+            nom (str): Espace de nommage (route ou fonction).
+            params (tuple): Parametres normalises (hachables par repr).
+            calcul (callable): Fonction sans argument qui produit la valeur.
+
+        Returns:
+            La valeur en cache ou nouvellement calculee.
+        """
+        etat = self._etat
+        if not etat.actif:
+            return calcul()
+
+        version = self.version()
+        cle = self._cle(nom, params)
+
+        valeur = etat.memoire.lire(cle)
+        if valeur is not _ABSENT:
+            return valeur
+
+        if etat.fichier:
+            valeur = etat.fichier.lire(version, cle)
+            if valeur is not _ABSENT:
+                etat.memoire.ecrire(cle, valeur)
+                return valeur
+
+        valeur = calcul()
+        # La version peut avoir change pendant le calcul : on ne stocke alors rien
+        if self.version() == version:
+            etat.memoire.ecrire(cle, valeur)
+            if etat.fichier:
+                etat.fichier.ecrire(version, cle, valeur)
+        return valeur
+
+    def memoriser(self, nom=None):
+        """
+        Decorateur : met en cache le resultat d'une fonction selon ses arguments.
+        """
+        def decorateur(fonction):
+            espace = nom or f"{fonction.__module__}.{fonction.__qualname__}"
+
+            @wraps(fonction)
+            def enveloppe(*args, **kwargs):
+                params = (args, tuple(sorted(kwargs.items())))
+                return self.obtenir(espace, params, lambda: fonction(*args, **kwargs))
+            return enveloppe
+        return decorateur
+
+    def reponse(self, nom=None):
+        """
+        Decorateur de route : met en cache la reponse complete d'une requete GET.
+
+        La cle comprend le point d'entree, les arguments d'URL et la query
+        string triee. A reserver aux pages sans contenu propre a la session.
+        """
+        def decorateur(vue):
+            @wraps(vue)
+            def enveloppe(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return vue(*args, **kwargs)
+
+                params = (
+                    tuple(sorted(kwargs.items())),
+                    tuple(sorted(request.args.items(multi=True)))
+                )
+
+                def calcul():
+                    rendu = make_response(vue(*args, **kwargs))
+                    return (rendu.get_data(), rendu.status_code, rendu.mimetype)
+
+                corps, statut, mimetype = self.obtenir(nom or request.endpoint, params, calcul)
+                return current_app.response_class(corps, status=statut, mimetype=mimetype)
+            return enveloppe
+        return decorateur
+
+    def conditionnel(self):
+        """
+        Decorateur de route : requetes conditionnelles HTTP (ETag / Last-Modified).
+
+        L'ETag (fort) est derive de l'empreinte des donnees, du point d'entree
+        et des arguments ; Last-Modified est la date de la derniere ingestion.
+        Une requete dont If-None-Match (ou a defaut If-Modified-Since)
+        correspond recoit un 304 sans que la vue ne soit executee. Comme
+        reponse(), a reserver aux pages sans contenu propre a la session.
+        """
+        def decorateur(vue):
+            @wraps(vue)
+            def enveloppe(*args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return vue(*args, **kwargs)
+
+                version = version_donnees()
+                etag = self._cle('etag', (
+                    version.empreinte,
+                    request.endpoint,
+                    tuple(sorted(kwargs.items())),
+                    tuple(sorted(request.args.items(multi=True)))
+                ))[:32]
+                derniere_modification = version.horodatage.replace(microsecond=0)
+
+                if request.if_none_match:
+                    # 'If-None-Match: *' ne prouve rien sur l'existence de la ressource : la vue repond
+                    non_modifie = (not request.if_none_match.star_tag
+                                   and request.if_none_match.contains_weak(etag))
+                else:
+                    non_modifie = (request.if_modified_since is not None
+                                   and request.if_modified_since >= derniere_modification)
+
+                if non_modifie:
+                    rendu = current_app.response_class(status=304)
+                else:
+                    rendu = make_response(vue(*args, **kwargs))
+                    # Les erreurs (404...) ne sont pas rendues conditionnelles
+                    if rendu.status_code != 200:
+                        return rendu
+
+                rendu.set_etag(etag)
+                rendu.last_modified = derniere_modification
+                # Le navigateur revalide a chaque affichage : une nouvelle ingestion est vue aussitot
+                rendu.cache_control.no_cache = True
+                return rendu
+            return enveloppe
+        return decorateur
+
+    def vider(self):
+        """Vide les deux niveaux du cache."""
+        etat = self._etat
+        etat.memoire.vider()
+        if etat.fichier:
+            etat.fichier.vider()
+
+
+cache = CacheResultats()
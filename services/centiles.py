@@ -0,0 +1,141 @@
+"""
+Centiles annuels des indicateurs de classement (« top x % »).
+
+Pour chaque ligne de classement, la part des lignes de la meme annee dont
+l'indicateur est au moins aussi eleve est calculee en une passe vectorisee
+(pandas : rang decroissant par annee, en pourcentage, egalites au rang le
+plus bas) et stockee dans centile_classement. La fiche d'une universite et
+la liste lisent ensuite ces valeurs par cle primaire, sans requete de
+fenetrage sur toute l'annee.
+
+- construire_centiles : reconstruction complete (peuplement) ;
+- verifier_centiles : comparaison avec un recalcul ;
+- completer_centiles : calcul pour une base sans centiles (flask init-db) ;
+- centiles_classements : lecture des centiles de lignes donnees.
+"""
+
+import logging
+import math
+
+import pandas as pd
+from sqlalchemy import func, insert
+
+from models import db, Classement, CentileClassement
+
+logger = logging.getLogger(__name__)
+
+
+# Colonne de Classement -> colonne de CentileClassement
+COLONNES_CENTILES = {
+    'score_global': 'top_score_global',
+    'indic_enseig': 'top_enseig',
+    'indic_env_rech': 'top_env_rech',
+    'indic_qualite_rech': 'top_qualite_rech',
+    'indic_impact_industrie': 'top_impact_industrie',
+    'indic_rel_intern': 'top_rel_intern',
+}
+
+
+def calculer_centiles():
+    """
+    Centiles de chaque ligne de classement dans son annee.
+
+    Returns:
+        pd.DataFrame: Colonnes de CentileClassement, indexe par id_classement
+        (NaN pour un indicateur absent).
+    """
+    lignes = db.session.query(
+        Classement.id_classement, Classement.annee, *[getattr(Classement, c) for c in COLONNES_CENTILES]
+    ).all()
+    df = pd.DataFrame(lignes, columns=['id_classement', 'annee', *COLONNES_CENTILES]).set_index('id_classement')
+    indicateurs = df[list(COLONNES_CENTILES)].apply(pd.to_numeric, errors='coerce')
+
+    # Rang decroissant en % des valeurs connues de l'annee ; a egalite, la part de
+    # toutes les lignes ex aequo (« au moins aussi eleve »)
+    centiles = indicateurs.groupby(df['annee']).rank(ascending=False, method='max', pct=True) * 100
+    return centiles.rename(columns=COLONNES_CENTILES).sort_index()
+
+
+def construire_centiles():
+    """
+    Recalcule tous les centiles a partir des classements.
+
+    Returns:
+        int: Nombre de lignes ecrites.
+    """
+    centiles = calculer_centiles()
+    db.session.query(CentileClassement).delete()
+    if len(centiles):
+        enregistrements = centiles.astype(object).where(centiles.notna(), None).reset_index()
+        db.session.execute(insert(CentileClassement), enregistrements.to_dict('records'))
+    db.session.commit()
+    logger.info(f"Centiles centile_classement : {len(centiles)} lignes")
+    return len(centiles)
+
+
+def verifier_centiles():
+    """
+    Compare les centiles stockes a un recalcul.
+
+    Returns:
+        list: Descriptions des divergences (liste vide si tout est coherent).
+    """
+    attendus = calculer_centiles()
+    colonnes = list(COLONNES_CENTILES.values())
+    stockes = {
+        ligne[0]: ligne[1:]
+        for ligne in db.session.query(CentileClassement.id_classement, *[getattr(CentileClassement, c) for c in colonnes])
+    }
+
+    anomalies = []
+    manquants = set(attendus.index) - stockes.keys()
+    if manquants:
+        anomalies.append(f"centile_classement : {len(manquants)} ligne(s) manquante(s), ex. {min(manquants)}")
+    en_trop = stockes.keys() - set(attendus.index)
+    if en_trop:
+        anomalies.append(f"centile_classement : {len(en_trop)} ligne(s) en trop, ex. {min(en_trop)}")
+
+    for id_classement, valeurs in attendus.iterrows():
+        stocke = stockes.get(id_classement)
+        if stocke is None:
+            continue
+        for nom, a, b in zip(colonnes, valeurs, stocke):
+            egales = (b is None) if pd.isna(a) else (b is not None and math.isclose(a, b, rel_tol=1e-9))
+            if not egales:
+                anomalies.append(f"centile_classement {id_classement} : {nom} = {b}, attendu {a}")
+    return anomalies
+
+
+def completer_centiles():
+    """
+    Calcule les centiles d'une base peuplee avant la creation de centile_classement.
+
+    Sans effet si la table contient deja des lignes ou si la base est vide.
+
+    Returns:
+        bool: Vrai si les centiles ont ete calcules.
+    """
+    if db.session.query(CentileClassement.id_classement).first() is not None:
+        return False
+    if not db.session.query(func.count(Classement.id_classement)).scalar():
+        return False
+    construire_centiles()
+    return True
+
+
+def centiles_classements(ids):
+    """
+    Centiles de lignes de classement (lecture par cle primaire).
+
+    Args:
+        ids (list): id_classement.
+
+    Returns:
+        dict: id_classement -> CentileClassement.
+    """
+    if not ids:
+        return {}
+    return {
+        c.id_classement: c
+        for c in db.session.query(CentileClassement).filter(CentileClassement.id_classement.in_(list(ids)))
+    }
@@ -0,0 +1,400 @@
+"""
+Moteur en colonnes : la table Classement chargee en tableaux NumPy.
+
+Avec MOTEUR_REQUETES = 'colonnes' (config.py), il remplace les requetes
+d'agregation, de top-k et de filtrage des routes index(), universites() et
+statistiques() par des operations vectorisees. Les classements (joints aux
+cles Universite/Pays/Region) sont charges une seule fois par processus,
+puis recharges lorsque la version des donnees change.
+
+Le magasin est toujours resident, y compris avec MOTEUR_REQUETES = 'sql' :
+c'est l'unique copie en memoire des classements, et l'index bitmap
+(services.bitmaps), les palmares (services.palmares) et l'index des
+universites similaires (services.similaires) lisent ses colonnes et ses
+permutations annuelles (ordre()) au lieu de recharger la table.
+MOTEUR_REQUETES ne choisit que le moteur des agregats et de la liste.
+
+Les resultats reproduisent la semantique SQL des requetes d'origine :
+les valeurs NULL sont des NaN ignores par les moyennes et exclus des
+comparaisons, et le ratio F/H (colonne texte) est compare comme du texte
+et moyenne selon son prefixe numerique, comme le fait SQLite.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+from flask import current_app
+from sqlalchemy import select
+
+from models import db, Region, Pays, Universite, Classement
+from services.plein_texte import ids_universites_texte
+from services.curseurs import PageListe, curseurs_page
+from services.version import obtenir_par_version
+
+
+# Ligne de la liste des universites (meme ordre que la requete SQL de la route)
+LigneClassement = namedtuple('LigneClassement', [
+    'id_classement', 'rang', 'nom_univ', 'nom_pays', 'nom_region',
+    'indic_enseig', 'indic_qualite_rech', 'score_global', 'annee'
+])
+
+COLONNES_NUMERIQUES = (
+    'score_global', 'indic_enseig', 'indic_env_rech', 'indic_qualite_rech',
+    'indic_impact_industrie', 'indic_rel_intern', 'pop_etud', 'ratio_etud_pers',
+    'etud_internationaux_pct', 'ratio_fem', 'ratio_hom'
+)
+
+# Etiquette (execution_options) de la lecture complete de classement au
+# chargement : parcours attendu, une fois par version (scripts/plan_requetes.py)
+ETIQUETTE_CHARGEMENT = 'colonnes.chargement'
+
+_PREFIXE_NUMERIQUE = re.compile(r'\s*[+-]?(\d+\.?\d*|\.\d+)([eE][+-]?\d+)?')
+
+
+def _valeur_numerique_sqlite(texte):
+    """Conversion numerique d'un texte telle que l'applique avg() dans SQLite."""
+    correspondance = _PREFIXE_NUMERIQUE.match(texte)
+    return float(correspondance.group(0)) if correspondance else 0.0
+
+
+def _flottants(valeurs):
+    """Colonne SQL -> tableau float64, NULL devenant NaN."""
+    return np.array(valeurs, dtype=np.float64)
+
+
+def _moyenne(valeurs):
+    """Moyenne en ignorant les NaN ; None si aucune valeur (comme avg() en SQL)."""
+    valides = valeurs[~np.isnan(valeurs)]
+    return float(valides.mean()) if valides.size else None
+
+
+def _moyennes_groupees(groupes, valeurs, nb_groupes):
+    """Moyenne par groupe (codes entiers >= 0) en ignorant les NaN ; NaN si groupe vide."""
+    presents = ~np.isnan(valeurs)
+    sommes = np.bincount(groupes[presents], weights=valeurs[presents], minlength=nb_groupes)
+    effectifs = np.bincount(groupes[presents], minlength=nb_groupes)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(effectifs > 0, sommes / np.maximum(effectifs, 1), np.nan)
+
+
+def _ou_none(valeur):
+    """NaN -> None pour restituer un resultat au format des requetes SQL."""
+    return None if valeur is None or np.isnan(valeur) else float(valeur)
+
+
+def _lignes_par_tranche(tranches, *colonnes):
+    """Agregats (moyennes) par libelle de tranche, tries comme un GROUP BY SQLite."""
+    resultat = []
+    for libelle in sorted(set(tranches.tolist())):
+        masque = tranches == libelle
+        resultat.append((libelle,) + tuple(_moyenne(c[masque]) for c in colonnes))
+    return resultat
+
+
+class MagasinColonnes:
+    """
+    Classements en colonnes NumPy, avec les dimensions Pays et Region.
+
+    Attributes:
+        version (str): Empreinte des donnees chargees.
+        id_classement, annee, rang, id_univ (np.ndarray): Colonnes entieres.
+        <indicateur> (np.ndarray): Colonnes float64 (NaN pour NULL).
+        pays_idx, region_idx (np.ndarray): Indice du pays / de la region de
+            chaque ligne dans pays_noms / region_noms, -1 si absent.
+        univ_noms (np.ndarray): Nom de l'universite de chaque ligne.
+        ordres (dict): (annee, colonne, decroissant) -> lignes de l'annee
+            triees sur une colonne numerique (voir ordre()).
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self._charger()
+
+    # ------------------------------------------------------------------
+    # Chargement
+    # ------------------------------------------------------------------
+
+    def _charger(self):
+        regions = db.session.query(Region.id_region, Region.nom_region).order_by(Region.nom_region).all()
+        self.region_noms = np.array([r.nom_region for r in regions], dtype=object)
+        index_region = {r.id_region: i for i, r in enumerate(regions)}
+
+        pays = db.session.query(
+            Pays.id_pays, Pays.nom_pays, Pays.id_region,
+            Pays.pib_hab, Pays.alphabetisation_pct, Pays.migration_nette
+        ).order_by(Pays.nom_pays).all()
+        self.pays_noms = np.array([p.nom_pays for p in pays], dtype=object)
+        self.pays_region_idx = np.array([index_region.get(p.id_region, -1) for p in pays], dtype=np.int64)
+        self.pays_pib_hab = _flottants([p.pib_hab for p in pays])
+        self.pays_alphabetisation_pct = _flottants([p.alphabetisation_pct for p in pays])
+        self.pays_migration_nette = _flottants([p.migration_nette for p in pays])
+        index_pays = {p.id_pays: i for i, p in enumerate(pays)}
+        self.index_pays_par_nom = {p.nom_pays: i for i, p in enumerate(pays)}
+
+        colonnes = [getattr(Classement, c) for c in COLONNES_NUMERIQUES]
+        lignes = db.session.execute(
+            select(
+                Classement.id_classement, Classement.annee, Classement.rang, Classement.id_univ,
+                Universite.nom_univ, Classement.id_pays, Classement.ratio_fem_hom, *colonnes
+            ).select_from(Classement).outerjoin(
+                Universite, Classement.id_univ == Universite.id_universite
+            ).order_by(Classement.id_classement).execution_options(etiquette=ETIQUETTE_CHARGEMENT)
+        ).all()
+        valeurs = list(zip(*lignes)) if lignes else [()] * (7 + len(colonnes))
+
+        self.taille = len(lignes)
+        self.id_classement = np.array(valeurs[0], dtype=np.int64)
+        self.annee = np.array(valeurs[1], dtype=np.int64)
+        self.rang = np.array([r if r is not None else np.iinfo(np.int64).max for r in valeurs[2]], dtype=np.int64)
+        self.id_univ = np.array(valeurs[3], dtype=np.int64)
+        self.univ_noms = np.array(valeurs[4], dtype=object)
+        self.pays_idx = np.array([index_pays.get(p, -1) for p in valeurs[5]], dtype=np.int64)
+        self.region_idx = np.where(
+            self.pays_idx >= 0, self.pays_region_idx[np.maximum(self.pays_idx, 0)], -1
+        ) if self.taille else np.array([], dtype=np.int64)
+
+        # Ratio F/H : texte d'origine (comparaisons) et valeur numerique (moyennes)
+        textes = valeurs[6]
+        self.ratio_fem_hom_nul = np.array([t is None for t in textes], dtype=bool)
+        self.ratio_fem_hom_texte = np.array(['' if t is None else str(t) for t in textes], dtype=str)
+        self.ratio_fem_hom_num = _flottants([
+            np.nan if t is None else _valeur_numerique_sqlite(str(t)) for t in textes
+        ])
+
+        for i, nom in enumerate(COLONNES_NUMERIQUES):
+            setattr(self, nom, _flottants(valeurs[7 + i]))
+
+        # Index derives : lignes de chaque annee et ordre de la liste
+        # (annee decroissante, rang, id_classement), comme services.recherche
+        self.annees = np.unique(self.annee)[::-1]
+        self.lignes_annee = {int(a): np.flatnonzero(self.annee == a) for a in self.annees}
+        self.ordre_liste = np.lexsort((self.id_classement, self.rang, -self.annee))
+
+        # Permutations annuelles de chaque colonne numerique, dans les deux sens
+        self.ordres = {}
+        for annee, lignes in self.lignes_annee.items():
+            lignes = lignes[np.lexsort((self.id_classement[lignes], self.rang[lignes]))]
+            for nom in COLONNES_NUMERIQUES:
+                valeurs = getattr(self, nom)[lignes]
+                manquantes = np.isnan(valeurs)
+                for decroissant in (True, False):
+                    cle = np.where(manquantes, 0.0, -valeurs if decroissant else valeurs)
+                    # Tri stable : a egalite, l'ordre de la liste est conserve
+                    self.ordres[(annee, nom, decroissant)] = lignes[np.lexsort((cle, manquantes))]
+
+    def lignes_de_l_annee(self, annee):
+        """Indices des lignes d'une annee (tableau vide si annee inconnue)."""
+        return self.lignes_annee.get(annee, np.array([], dtype=np.int64))
+
+    def ordre(self, annee, colonne, decroissant=True):
+        """
+        Lignes d'une annee triees sur une colonne numerique.
+
+        Les valeurs manquantes sont en fin ; les egalites suivent l'ordre de
+        la liste (rang, puis id_classement).
+
+        Args:
+            annee (int): Annee.
+            colonne (str): Colonne de COLONNES_NUMERIQUES.
+            decroissant (bool): Sens du tri.
+
+        Returns:
+            np.ndarray: Indices des lignes (vide si annee inconnue).
+        """
+        return self.ordres.get((annee, colonne, decroissant), np.array([], dtype=np.int64))
+
+    # ------------------------------------------------------------------
+    # Page d'accueil
+    # ------------------------------------------------------------------
+
+    def lister_annees(self):
+        """Couples (annee, nb_classements), de la plus recente a la plus ancienne."""
+        return [(int(a), int(self.lignes_annee[int(a)].size)) for a in self.annees]
+
+    def moyennes_pays(self):
+        """PIB, alphabetisation et migration moyens (tous pays), et nombre de regions."""
+        return (_moyenne(self.pays_pib_hab), _moyenne(self.pays_alphabetisation_pct),
+                _moyenne(self.pays_migration_nette), int(self.region_noms.size))
+
+    def agregats_annee(self, annee):
+        """Moyennes des scores de l'annee (score global, enseignement, recherche, F/H, internationaux)."""
+        lignes = self.lignes_de_l_annee(annee)
+        return tuple(_moyenne(c[lignes]) for c in (
+            self.score_global, self.indic_enseig, self.indic_qualite_rech,
+            self.ratio_fem_hom_num, self.etud_internationaux_pct
+        ))
+
+    def agregats_par_pays(self, annee):
+        """Tuples (pays, region, nb, moyenne enseignement, moyenne recherche), tries par pays."""
+        lignes = self.lignes_de_l_annee(annee)
+        lignes = lignes[self.pays_idx[lignes] >= 0]
+        codes = self.pays_idx[lignes]
+        nb_pays = self.pays_noms.size
+        effectifs = np.bincount(codes, minlength=nb_pays)
+        enseig = _moyennes_groupees(codes, self.indic_enseig[lignes], nb_pays)
+        rech = _moyennes_groupees(codes, self.indic_qualite_rech[lignes], nb_pays)
+
+        resultat = []
+        for i in np.flatnonzero(effectifs):
+            region = self.pays_region_idx[i]
+            resultat.append((
+                self.pays_noms[i],
+                self.region_noms[region] if region >= 0 else None,
+                int(effectifs[i]), _ou_none(enseig[i]), _ou_none(rech[i])
+            ))
+        return resultat
+
+    # ------------------------------------------------------------------
+    # Top-k et liste filtree
+    # ------------------------------------------------------------------
+
+    def top_k(self, annee, colonne, k, decroissant=True):
+        """
+        Indices des k lignes extremes d'une annee pour une colonne (NaN exclus).
+
+        Les egalites sont departagees par id_classement croissant.
+        """
+        lignes = self.lignes_de_l_annee(annee)
+        valeurs = getattr(self, colonne)[lignes]
+        presents = ~np.isnan(valeurs)
+        lignes, valeurs = lignes[presents], valeurs[presents]
+        ordre = np.argsort(-valeurs if decroissant else valeurs, kind='stable')
+        return lignes[ordre[:k]]
+
+    def noms_et_valeurs(self, indices, colonne):
+        """Donnees Chart.js {'labels', 'data'} pour des lignes et une colonne."""
+        valeurs = getattr(self, colonne)
+        return {'labels': [self.univ_noms[i] for i in indices],
+                'data': [float(valeurs[i]) for i in indices]}
+
+    def lignes(self, indices):
+        """Lignes de la liste des universites (LigneClassement) pour des indices."""
+        resultat = []
+        for i in indices:
+            region = self.region_idx[i]
+            resultat.append(LigneClassement(
+                int(self.id_classement[i]), int(self.rang[i]), self.univ_noms[i],
+                self.pays_noms[self.pays_idx[i]] if self.pays_idx[i] >= 0 else None,
+                self.region_noms[region] if region >= 0 else None,
+                _ou_none(self.indic_enseig[i]), _ou_none(self.indic_qualite_rech[i]),
+                _ou_none(self.score_global[i]), int(self.annee[i])
+            ))
+        return resultat
+
+    def masque_recherche(self, annee=None, pays=None, score_enseig_min=None, score_rech_min=None, nom=None):
+        """
+        Masque booleen des lignes de la liste des universites pour des filtres.
+
+        Comme la requete SQL, seules les lignes ayant un score global, un rang
+        et un pays rattache a une region sont eligibles. Le filtre par nom
+        interroge l'index plein texte (une requete SQL).
+        """
+        masque = (~np.isnan(self.score_global) & (self.region_idx >= 0)
+                  & (self.rang != np.iinfo(np.int64).max))
+        if annee is not None:
+            masque &= self.annee == annee
+        if pays:
+            code = self.index_pays_par_nom.get(pays, -2)
+            masque &= self.pays_idx == code
+        if score_enseig_min is not None:
+            masque &= self.indic_enseig >= score_enseig_min
+        if score_rech_min is not None:
+            masque &= self.indic_qualite_rech >= score_rech_min
+        if nom:
+            ids = db.session.execute(ids_universites_texte(nom)).scalars().all()
+            masque &= np.isin(self.id_univ, np.array(ids, dtype=np.int64))
+        return masque
+
+    def _position(self, ordonnes, cle, inclusive=False):
+        """Nombre de lignes de `ordonnes` situees avant la cle (ou egales si inclusive)."""
+        annee, rang, id_classement = cle
+        a, r, i = self.annee[ordonnes], self.rang[ordonnes], self.id_classement[ordonnes]
+        dernier = (i <= id_classement) if inclusive else (i < id_classement)
+        avant = (a > annee) | ((a == annee) & ((r < rang) | ((r == rang) & dernier)))
+        return int(np.count_nonzero(avant))
+
+    def rechercher(self, limite, offset=0, apres=None, avant=None, **filtres):
+        """
+        Page de la liste filtree, memes regles que services.recherche.page_universites.
+
+        Returns:
+            tuple: (nombre total de resultats, PageListe de LigneClassement).
+        """
+        masque = self.masque_recherche(**filtres)
+        ordonnes = self.ordre_liste[masque[self.ordre_liste]]
+
+        if avant is not None:
+            fin = self._position(ordonnes, avant)
+            debut = max(fin - limite, 0)
+        else:
+            if apres is not None:
+                debut = self._position(ordonnes, apres, inclusive=True)
+            else:
+                debut = offset
+            fin = debut + limite
+        page = ordonnes[debut:fin]
+
+        lignes = self.lignes(page)
+        suivant, precedent = curseurs_page(
+            [(l.annee, l.rang, l.id_classement) for l in lignes], debut > 0, fin < ordonnes.size
+        )
+        return int(ordonnes.size), PageListe(lignes, suivant, precedent)
+
+    # ------------------------------------------------------------------
+    # Page Statistiques
+    # ------------------------------------------------------------------
+
+    def lignes_statistiques(self):
+        """Agregats par tranche, au meme format que services.statistiques."""
+        intern = self.etud_internationaux_pct
+        tranches_intern = np.select(
+            [intern < 10, intern < 20, intern < 30, intern >= 30],
+            ['[0–10%[', '[10–20%[', '[20–30%[', '[30%+]'], default='Inconnu'
+        )
+
+        ratio, nul = self.ratio_fem_hom_texte, self.ratio_fem_hom_nul
+        tranches_ratio = np.select(
+            [~nul & (ratio < '40'), ~nul & (ratio >= '40') & (ratio <= '60'), ~nul & (ratio > '60')],
+            ['< 40%', '[40–60%]', '>60%'], default='Inconnu'
+        )
+
+        avec_pays = self.pays_idx >= 0
+        pib = self.pays_pib_hab[self.pays_idx[avec_pays]]
+        tranches_pib = np.select(
+            [pib <= 1135, (pib >= 1136) & (pib <= 4495), pib >= 4496],
+            ['Faible revenu', 'Revenu intermédiaire', 'Haut revenu'], default='Inconnu'
+        )
+        alpha = self.pays_alphabetisation_pct[self.pays_idx[avec_pays]]
+        tranches_alpha = np.select(
+            [alpha < 80, (alpha >= 80) & (alpha <= 90), alpha > 90],
+            ['<80%', '[80–90%]', '>90%'], default='Inconnu'
+        )
+
+        avec_region = self.region_idx >= 0
+        regions = self.region_noms[self.region_idx[avec_region]]
+
+        return {
+            'intern': _lignes_par_tranche(tranches_intern, self.indic_env_rech),
+            'pib': _lignes_par_tranche(tranches_pib, self.indic_enseig[avec_pays],
+                                       self.indic_qualite_rech[avec_pays]),
+            'alpha': _lignes_par_tranche(tranches_alpha, self.score_global[avec_pays]),
+            'ratio': _lignes_par_tranche(tranches_ratio, self.indic_enseig, self.indic_qualite_rech),
+            'region': _lignes_par_tranche(regions, self.indic_enseig[avec_region],
+                                          self.indic_qualite_rech[avec_region]),
+        }
+
+
+def moteur_colonnes_actif():
+    """Vrai si la configuration demande le moteur en colonnes."""
+    return current_app.config.get('MOTEUR_REQUETES', 'sql') == 'colonnes'
+
+
+def obtenir_magasin():
+    """
+    Renvoie le magasin du processus, (re)charge si la version des donnees a change.
+
+    Returns:
+        MagasinColonnes: Magasin a jour.
+    """
+    return obtenir_par_version('colonnes', MagasinColonnes)
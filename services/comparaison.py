@@ -0,0 +1,138 @@
+"""
+Comparaison de plusieurs universites (page /comparer et /api/comparer).
+
+Les historiques des universites comparees viennent du chargeur de profils
+(services.profils.profils_universites) : une seule requete IN pour toutes
+celles qui ne sont pas deja en memoire, quel que soit leur nombre. Ils sont
+ensuite pivotes en un tableau universites x annees x indicateurs, aligne
+sur l'union des annees.
+"""
+
+import re
+from collections import namedtuple
+
+import numpy as np
+
+from services.curseurs import ENTIER_MAX
+from services.profils import profils_universites
+
+
+# Colonnes comparees (champs de Classement)
+INDICATEURS_COMPARAISON = (
+    'rang',
+    'score_global',
+    'indic_enseig',
+    'indic_env_rech',
+    'indic_qualite_rech',
+    'indic_impact_industrie',
+    'indic_rel_intern',
+)
+
+# Universite comparee et sa ligne de classement la plus recente
+UniversiteComparee = namedtuple('UniversiteComparee', ['id_univ', 'nom_univ', 'nom_pays', 'id_classement_recent',
+                                                       'annee_recente'])
+
+# Resultat : annees, universites trouvees, valeurs[universite, annee, indicateur]
+# (NaN si absente), identifiants sans classement
+Comparaison = namedtuple('Comparaison', ['annees', 'universites', 'valeurs', 'introuvables'])
+
+_SEPARATEURS = re.compile(r'[\s,;]+')
+
+
+def lire_ids(texte, maximum):
+    """
+    Identifiants d'universites d'un parametre d'URL ("1,2,3").
+
+    Args:
+        texte (str): Identifiants separes par des virgules ou des espaces.
+        maximum (int): Nombre maximal d'identifiants distincts.
+
+    Returns:
+        list: Identifiants distincts, dans l'ordre de saisie.
+
+    Raises:
+        ValueError: Identifiant non entier ou hors des entiers SQLite, ou
+            nombre maximal depasse.
+    """
+    ids = []
+    for morceau in _SEPARATEURS.split((texte or '').strip()):
+        if not morceau:
+            continue
+        if not (morceau.isascii() and morceau.isdigit()) or int(morceau) > ENTIER_MAX:
+            raise ValueError(f"Identifiant invalide : {morceau}")
+        if int(morceau) not in ids:
+            ids.append(int(morceau))
+    if len(ids) > maximum:
+        raise ValueError(f"{len(ids)} universites demandees, {maximum} au plus")
+    return ids
+
+
+def comparer_universites(ids_univ):
+    """
+    Historiques de plusieurs universites, pivotes par annee et indicateur.
+
+    Args:
+        ids_univ (list): Identifiants d'universites (ordre conserve).
+
+    Returns:
+        Comparaison: Tableau aligne sur l'union des annees.
+    """
+    profils = profils_universites(ids_univ)
+    trouves = [i for i in ids_univ if i in profils]
+    annees = sorted({c.annee for i in trouves for c in profils[i].classements})
+    colonne_annee = {annee: j for j, annee in enumerate(annees)}
+
+    valeurs = np.full((len(trouves), len(annees), len(INDICATEURS_COMPARAISON)), np.nan)
+    universites = []
+    for u, id_univ in enumerate(trouves):
+        profil = profils[id_univ]
+        for classement in profil.classements:
+            valeurs[u, colonne_annee[classement.annee]] = [
+                np.nan if getattr(classement, nom) is None else getattr(classement, nom)
+                for nom in INDICATEURS_COMPARAISON
+            ]
+        recent = profil.classements[-1]
+        universites.append(UniversiteComparee(
+            id_univ, profil.universite.nom_univ, profil.pays.nom_pays, recent.id_classement, recent.annee
+        ))
+
+    return Comparaison(annees, universites, valeurs, [i for i in ids_univ if i not in profils])
+
+
+def donnees_comparaison(comparaison):
+    """
+    Forme JSON d'une comparaison (valeurs absentes a null).
+
+    Returns:
+        dict: annees, indicateurs, introuvables et, par universite, une serie
+        annuelle par indicateur et les valeurs de son annee la plus recente.
+    """
+    def _valeur(nom, v):
+        if np.isnan(v):
+            return None
+        return int(v) if nom == 'rang' else float(v)
+
+    position_annee = {annee: j for j, annee in enumerate(comparaison.annees)}
+    return {
+        'annees': comparaison.annees,
+        'indicateurs': list(INDICATEURS_COMPARAISON),
+        'introuvables': comparaison.introuvables,
+        'universites': [
+            {
+                'id_univ': u.id_univ,
+                'nom_univ': u.nom_univ,
+                'nom_pays': u.nom_pays,
+                'id_classement_recent': u.id_classement_recent,
+                'annee_recente': u.annee_recente,
+                'series': {
+                    nom: [_valeur(nom, v) for v in comparaison.valeurs[i, :, k]]
+                    for k, nom in enumerate(INDICATEURS_COMPARAISON)
+                },
+                'recent': {
+                    nom: _valeur(nom, comparaison.valeurs[i, position_annee[u.annee_recente], k])
+                    for k, nom in enumerate(INDICATEURS_COMPARAISON)
+                },
+            }
+            for i, u in enumerate(comparaison.universites)
+        ],
+    }
@@ -0,0 +1,74 @@
+"""
+Curseurs de pagination de la liste des universites.
+
+Un curseur est la cle de tri (annee, rang, id_classement) d'une ligne,
+encodee en base64 pour l'URL : la page suivante reprend apres la derniere
+ligne affichee, la precedente avant la premiere. Partages par
+services.recherche (SQL) et services.colonnes (moteur en colonnes).
+"""
+
+import base64
+import binascii
+import json
+from collections import namedtuple
+
+
+# Bornes des entiers SQLite (64 bits signes)
+ENTIER_MIN, ENTIER_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Lignes d'une page et curseurs vers les pages voisines (None en bout de liste)
+PageListe = namedtuple('PageListe', ['lignes', 'suivant', 'precedent'])
+
+
+def encoder_curseur(annee, rang, id_classement):
+    """
+    Curseur opaque d'une position dans la liste.
+
+    Returns:
+        str: Jeton utilisable dans une URL.
+    """
+    brut = json.dumps([int(annee), int(rang), int(id_classement)], separators=(',', ':'))
+    return base64.urlsafe_b64encode(brut.encode('ascii')).decode('ascii').rstrip('=')
+
+
+def decoder_curseur(jeton):
+    """
+    Cle de tri (annee, rang, id_classement) d'un curseur.
+
+    Un jeton qui ne decode pas en trois entiers representables par SQLite
+    (flottant, booleen, valeur hors 64 bits...) est invalide.
+
+    Returns:
+        tuple: La cle, ou None si le jeton est absent ou invalide.
+    """
+    if not jeton:
+        return None
+    try:
+        brut = base64.urlsafe_b64decode(jeton + '=' * (-len(jeton) % 4))
+        cle = json.loads(brut)
+    except (binascii.Error, ValueError, TypeError, RecursionError):
+        return None
+    if not isinstance(cle, list) or len(cle) != 3 or not all(
+        type(valeur) is int and ENTIER_MIN <= valeur <= ENTIER_MAX for valeur in cle
+    ):
+        return None
+    return tuple(cle)
+
+
+def curseurs_page(cles, plus_avant, plus_apres):
+    """
+    Curseurs suivant / precedent d'une page a partir des cles de ses lignes.
+
+    Args:
+        cles (list): Cles (annee, rang, id_classement) des lignes, dans l'ordre.
+        plus_avant (bool): Des lignes precedent la page.
+        plus_apres (bool): Des lignes suivent la page.
+
+    Returns:
+        tuple: (curseur suivant, curseur precedent), None en bout de liste.
+    """
+    if not cles:
+        return None, None
+    suivant = encoder_curseur(*cles[-1]) if plus_apres else None
+    precedent = encoder_curseur(*cles[0]) if plus_avant else None
+    return suivant, precedent
@@ -0,0 +1,115 @@
+"""
+Cles geographiques denormalisees de la table classement.
+
+classement.id_pays et classement.id_region recopient universite.id_pays et
+pays.id_region : les requetes filtrent ou regroupent par pays ou region sur
+la seule table classement (index (annee, id_pays) et (annee, id_region)).
+
+- migrer_cles_geographiques : ajoute les colonnes a une base anterieure
+  (db.create_all ne modifie pas une table existante) puis les remplit ;
+- synchroniser_cles_geographiques : recalcule les cles depuis les tables
+  sources, apres le peuplement ;
+- verifier_cles_geographiques : signale toute derive.
+"""
+
+import logging
+
+from sqlalchemy import func, inspect, select, text, update
+
+from models import db, Pays, Universite, Classement
+
+logger = logging.getLogger(__name__)
+
+
+def _pays_source():
+    """Pays de l'universite de chaque classement (sous-requete correlee)."""
+    return select(Universite.id_pays).where(
+        Universite.id_universite == Classement.id_univ
+    ).scalar_subquery()
+
+
+def _region_source():
+    """Region du pays de l'universite de chaque classement (sous-requete correlee)."""
+    return select(Pays.id_region).join(
+        Universite, Universite.id_pays == Pays.id_pays
+    ).where(
+        Universite.id_universite == Classement.id_univ
+    ).scalar_subquery()
+
+
+def synchroniser_cles_geographiques():
+    """
+    Recalcule classement.id_pays et classement.id_region depuis les tables sources.
+
+    Returns:
+        int: Nombre de classements mis a jour.
+    """
+    resultat = db.session.execute(
+        update(Classement).values(id_pays=_pays_source(), id_region=_region_source()),
+        execution_options={'synchronize_session': False}
+    )
+    db.session.commit()
+    logger.info(f"Cles geographiques synchronisees : {resultat.rowcount} classements")
+    return resultat.rowcount
+
+
+def verifier_cles_geographiques(exemples=5):
+    """
+    Compare les cles denormalisees aux tables sources.
+
+    Args:
+        exemples (int): Nombre d'identifiants de classements cites par anomalie.
+
+    Returns:
+        list: Descriptions des divergences (liste vide si tout est coherent).
+    """
+    anomalies = []
+    for colonne, source in ((Classement.id_pays, _pays_source()),
+                            (Classement.id_region, _region_source())):
+        # IS NOT : NULL d'un cote et valeur de l'autre est aussi une derive
+        condition = colonne.is_not(source)
+        nb = db.session.query(func.count(Classement.id_classement)).filter(condition).scalar() or 0
+        if nb:
+            ids = [i for i, in db.session.query(Classement.id_classement).filter(
+                condition
+            ).order_by(Classement.id_classement).limit(exemples)]
+            anomalies.append(
+                f"classement.{colonne.key} : {nb} ligne(s) divergente(s), par exemple id_classement {ids}"
+            )
+    return anomalies
+
+
+def migrer_cles_geographiques():
+    """
+    Ajoute les colonnes et index denormalises a une table classement existante.
+
+    Sans effet si les colonnes existent deja. Les cles sont remplies apres ajout.
+
+    Returns:
+        bool: Vrai si la table a ete modifiee.
+    """
+    inspecteur = inspect(db.engine)
+    if not inspecteur.has_table(Classement.__tablename__):
+        return False
+    existantes = {c['name'] for c in inspecteur.get_columns(Classement.__tablename__)}
+    manquantes = [c for c in ('id_pays', 'id_region') if c not in existantes]
+    if not manquantes:
+        return False
+
+    cibles = {'id_pays': 'pays(id_pays)', 'id_region': 'region(id_region)'}
+    with db.engine.begin() as connexion:
+        for nom in manquantes:
+            connexion.execute(text(
+                f"ALTER TABLE classement ADD COLUMN {nom} INTEGER "
+                f"REFERENCES {cibles[nom]} ON DELETE SET NULL"
+            ))
+    # Seuls les index des nouvelles colonnes : les autres (dont l'index unique
+    # (id_univ, annee), que des doublons peuvent contredire) relevent de
+    # services.index.creer_index_manquants
+    for index in Classement.__table__.indexes:
+        if any(colonne.name in manquantes for colonne in index.columns):
+            index.create(db.engine, checkfirst=True)
+
+    logger.info(f"Colonnes {', '.join(manquantes)} ajoutees a classement")
+    synchroniser_cles_geographiques()
+    return True
@@ -0,0 +1,78 @@
+"""
+Dimensions de consultation : annees, pays et regions disponibles.
+
+Ces listes ne changent qu'a une reconstruction de univ.db ; elles sont
+chargees une fois par version des donnees (services.version) et servent
+aux listes deroulantes (SearchForm) et au selecteur d'annee de l'accueil.
+"""
+
+from sqlalchemy import func
+
+from models import db, Region, Pays, Classement, ResumeAnnee
+from services.version import obtenir_par_version
+
+
+def lister_annees():
+    """
+    Liste les annees disponibles avec leur nombre de classements.
+
+    Returns:
+        tuple: (couples (annee, nb_classements) de la plus recente a la plus
+        ancienne, booleen indiquant s'ils proviennent des tables de synthese).
+    """
+    # Des lignes dans resume_annee indiquent que les syntheses ont ete construites
+    resumes = db.session.query(
+        ResumeAnnee.annee, ResumeAnnee.nb_classements
+    ).order_by(ResumeAnnee.annee.desc()).all()
+    if resumes:
+        return resumes, True
+    return db.session.query(
+        Classement.annee, func.count(Classement.id_classement)
+    ).group_by(Classement.annee).order_by(Classement.annee.desc()).all(), False
+
+
+class Dimensions:
+    """
+    Listes de reference d'une version des donnees.
+
+    Attributes:
+        version (str): Empreinte des donnees chargees.
+        annees_effectifs (list): Couples (annee, nb_classements), plus recente en tete.
+        depuis_resumes (bool): Vrai si les effectifs proviennent des tables de synthese.
+        annees (list): Annees disponibles, plus recente en tete.
+        annee_max (int): Annee la plus recente (None si la base est vide).
+        pays (list): Noms des pays ayant au moins un classement, tries.
+        regions (list): Noms des regions, tries.
+    """
+
+    def __init__(self, version):
+        self.version = version
+        annees_effectifs, self.depuis_resumes = lister_annees()
+        self.annees_effectifs = [tuple(ligne) for ligne in annees_effectifs]
+        self.annees = [a for a, _ in self.annees_effectifs]
+        self.annee_max = self.annees[0] if self.annees else None
+
+        self.pays = [nom for nom, in db.session.query(
+            Pays.nom_pays
+        ).join(Classement, Classement.id_pays == Pays.id_pays).distinct().order_by(Pays.nom_pays)]
+        self.regions = [nom for nom, in db.session.query(Region.nom_region).order_by(Region.nom_region)]
+
+    @property
+    def choix_annees(self):
+        """Choix du SelectField annee, precedes de l'option 'toutes'."""
+        return [('', 'Toutes les années')] + [(str(a), str(a)) for a in self.annees]
+
+    @property
+    def choix_pays(self):
+        """Choix du SelectField pays, precedes de l'option 'tous'."""
+        return [('', 'Tous les pays')] + [(p, p) for p in self.pays]
+
+
+def obtenir_dimensions():
+    """
+    Renvoie les dimensions de la version courante des donnees.
+
+    Returns:
+        Dimensions: Listes de reference, rechargees apres une nouvelle ingestion.
+    """
+    return obtenir_par_version('dimensions', Dimensions)
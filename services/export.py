@@ -0,0 +1,92 @@
+"""
+Export en flux de la liste des universites (CSV ou NDJSON).
+
+Tout le resultat filtre est exporte, pas seulement la page affichee. Les
+lignes sont lues par lots (yield_per, curseur serveur via stream_results)
+et chaque lot est serialise puis envoye aussitot : la memoire utilisee ne
+depend pas du nombre de lignes exportees.
+"""
+
+import csv
+import io
+import json
+
+from models import db
+from services.recherche import requete_liste_universites
+
+
+# Lignes lues et envoyees par lot
+TAILLE_LOT = 500
+
+# Colonnes exportees : (nom dans le fichier, champ de requete_liste_universites)
+COLONNES_EXPORT = (
+    ('annee', 'annee'),
+    ('rang', 'rang'),
+    ('universite', 'nom_univ'),
+    ('pays', 'nom_pays'),
+    ('region', 'nom_region'),
+    ('score_enseignement', 'indic_enseig'),
+    ('score_recherche', 'indic_qualite_rech'),
+    ('score_global', 'score_global'),
+    ('id_classement', 'id_classement'),
+)
+
+# Format -> (type MIME, extension)
+FORMATS_EXPORT = {
+    'csv': ('text/csv; charset=utf-8', 'csv'),
+    'ndjson': ('application/x-ndjson', 'ndjson'),
+}
+
+
+def _lots(filtres):
+    """Lots de lignes de la liste filtree, dans l'ordre de la page /universites."""
+    resultat = db.session.execute(
+        requete_liste_universites(**filtres).statement,
+        execution_options={'yield_per': TAILLE_LOT, 'stream_results': True}
+    )
+    try:
+        for lot in resultat.partitions():
+            yield lot
+    finally:
+        resultat.close()
+
+
+def exporter_csv(filtres):
+    """
+    Generateur du fichier CSV (en-tete puis un morceau par lot).
+
+    Args:
+        filtres (dict): Filtres normalises (services.recherche.normaliser_filtres).
+
+    Yields:
+        str: Morceaux du fichier.
+    """
+    tampon = io.StringIO()
+    ecrivain = csv.writer(tampon)
+    ecrivain.writerow([nom for nom, _ in COLONNES_EXPORT])
+    for lot in _lots(filtres):
+        ecrivain.writerows([[getattr(ligne, champ) for _, champ in COLONNES_EXPORT] for ligne in lot])
+        yield tampon.getvalue()
+        tampon.seek(0)
+        tampon.truncate()
+    yield tampon.getvalue()
+
+
+def exporter_ndjson(filtres):
+    """
+    Generateur du fichier NDJSON (un objet JSON par ligne).
+
+    Args:
+        filtres (dict): Filtres normalises (services.recherche.normaliser_filtres).
+
+    Yields:
+        str: Morceaux du fichier.
+    """
+    for lot in _lots(filtres):
+        yield ''.join(
+            json.dumps({nom: getattr(ligne, champ) for nom, champ in COLONNES_EXPORT}, ensure_ascii=False) + '\n'
+            for ligne in lot
+        )
+
+
+EXPORTS = {'csv': exporter_csv, 'ndjson': exporter_ndjson}
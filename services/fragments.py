@@ -0,0 +1,66 @@
+"""
+Cache de fragments de templates Jinja.
+
+Extension ajoutant la balise {% cache %} a l'environnement Jinja de
+l'application : le HTML rendu d'un bloc est conserve dans le cache de
+resultats (services.cache), sous une cle faite du nom du fragment et des
+arguments explicites de la balise. Comme toute entree de ce cache, il est
+invalide par une nouvelle version des donnees.
+
+    {% cache 'universites.liste', form.annee.data, page %}
+        ... tableau ...
+    {% endcache %}
+
+Les arguments doivent decrire entierement le contenu du bloc (valeurs
+simples : nombres, chaines, tuples). Un bloc contenant un jeton CSRF ou
+tout contenu propre a la session ne doit pas etre mis en cache.
+
+Pour qu'un fragment en cache evite aussi les requetes, la vue passe au
+template une fonction appelee dans le bloc, et non des donnees deja
+calculees :
+
+    {% cache 'universites.liste', ... %}
+        {% set liste = calculer_liste() %}
+        ...
+    {% endcache %}
+
+Une page deja mise en cache en entier (cache.reponse) n'a pas besoin de
+fragment.
+"""
+
+from jinja2 import nodes
+from jinja2.ext import Extension
+from markupsafe import Markup
+
+from services.cache import cache
+
+
+class CacheFragments(Extension):
+    """Balise {% cache nom, arg1, arg2... %} ... {% endcache %}."""
+
+    tags = {'cache'}
+
+    def parse(self, parser):
+        ligne = next(parser.stream).lineno
+        arguments = [parser.parse_expression()]
+        while parser.stream.skip_if('comma'):
+            arguments.append(parser.parse_expression())
+        corps = parser.parse_statements(('name:endcache',), drop_needle=True)
+        return nodes.CallBlock(
+            self.call_method('_rendre', [nodes.List(arguments)]), [], [], corps
+        ).set_lineno(ligne)
+
+    def _rendre(self, arguments, caller):
+        """HTML du bloc, depuis le cache ou rendu puis stocke."""
+        nom, params = arguments[0], tuple(arguments[1:])
+        return Markup(cache.obtenir(f"fragment.{nom}", params, lambda: str(caller())))
+
+
+def init_fragments(app):
+    """
+    Ajoute la balise {% cache %} a l'environnement Jinja de l'application.
+
+    Args:
+        app (Flask): Application, apres cache.init_app.
+    """
+    app.jinja_env.add_extension(CacheFragments)
@@ -0,0 +1,128 @@
+"""
+Donnees des graphiques, servies en JSON par /api/charts/<nom>.
+
+Les pages HTML ne contiennent plus que les KPI et les tableaux ; chaque
+page charge ensuite ses graphiques de facon asynchrone (static/js/chart.js,
+chargerGraphiques). Chaque fonction renvoie un dictionnaire serialisable
+en JSON, dont les cles sont les identifiants de graphiques de la page.
+"""
+
+from flask import current_app
+
+from services.dimensions import obtenir_dimensions
+from services.palmares import donnees_graphique, obtenir_palmares, INDICATEURS
+from services.profils import profil_universite
+from services.statistiques import calculer_statistiques
+from services.tableau_bord import calculer_repartitions
+
+
+# Annee des graphiques si la base est vide (comme la page /universites)
+ANNEE_PAR_DEFAUT = 2025
+
+
+def _annee_et_k(annee, k):
+    """Annee (la plus recente par defaut) et taille des palmares, bornee par PALMARES_K_MAX."""
+    if annee is None:
+        annee = obtenir_dimensions().annee_max or ANNEE_PAR_DEFAUT
+    if k is None:
+        k = current_app.config['PALMARES_K']
+    return annee, min(max(k, 1), current_app.config['PALMARES_K_MAX'])
+
+
+def graphiques_accueil(annee=None):
+    """
+    Graphiques de la page d'accueil.
+
+    Args:
+        annee (int): Annee demandee. Par defaut, l'annee la plus recente.
+
+    Returns:
+        dict: top_pays_enseig, top_pays_rech et repartition_region.
+    """
+    # Seul le parcours par pays : ni KPI globaux ni top 10 (deja calcules pour la page HTML)
+    repartitions = calculer_repartitions(annee)
+    return {
+        'top_pays_enseig': repartitions.data_top_pays_enseig,
+        'top_pays_rech': repartitions.data_top_pays_rech,
+        'repartition_region': repartitions.data_repartition_region,
+    }
+
+
+def graphiques_universites(annee=None, k=None):
+    """
+    Top k et bottom k en enseignement et en recherche (page /universites).
+
+    Args:
+        annee (int): Annee demandee. Par defaut, l'annee la plus recente.
+        k (int): Taille des palmares. Par defaut, PALMARES_K.
+
+    Returns:
+        dict: top_teaching, bottom_teaching, top_research et bottom_research.
+    """
+    annee, k = _annee_et_k(annee, k)
+    palmares = obtenir_palmares()
+    return {
+        'top_teaching': donnees_graphique(palmares.premiers(annee, 'indic_enseig', k)),
+        'bottom_teaching': donnees_graphique(palmares.derniers(annee, 'indic_enseig', k)),
+        'top_research': donnees_graphique(palmares.premiers(annee, 'indic_qualite_rech', k)),
+        'bottom_research': donnees_graphique(palmares.derniers(annee, 'indic_qualite_rech', k)),
+    }
+
+
+def graphiques_palmares(annee=None, k=None):
+    """
+    Palmares de tous les indicateurs pour une annee.
+
+    Args:
+        annee (int): Annee demandee. Par defaut, l'annee la plus recente.
+        k (int): Taille des palmares. Par defaut, PALMARES_K.
+
+    Returns:
+        dict: Pour chaque indicateur de services.palmares.INDICATEURS,
+        {'premiers': ..., 'derniers': ...} au format Chart.js.
+    """
+    annee, k = _annee_et_k(annee, k)
+    palmares = obtenir_palmares()
+    return {
+        indicateur: {
+            'premiers': donnees_graphique(palmares.premiers(annee, indicateur, k)),
+            'derniers': donnees_graphique(palmares.derniers(annee, indicateur, k)),
+        }
+        for indicateur in INDICATEURS
+    }
+
+
+def graphiques_statistiques():
+    """
+    Graphiques de la page Statistiques (toutes annees).
+
+    Returns:
+        dict: intern, pib, alpha, ratio et region.
+    """
+    return {nom[len('data_'):]: valeur for nom, valeur in calculer_statistiques().items()}
+
+
+def historique_universite(id_univ):
+    """
+    Evolution annuelle des scores d'une universite (profil memorise, services.profils).
+
+    Args:
+        id_univ (int): Identifiant de l'universite.
+
+    Returns:
+        dict: labels (annees), data_enseig, data_rech et data_global.
+    """
+    profil = profil_universite(id_univ)
+    if profil is None:
+        return {'labels': [], 'data_enseig': [], 'data_rech': [], 'data_global': []}
+    return profil.historique
+
+
+# Nom du graphique -> (fonction, parametres entiers acceptes dans la query string)
+GRAPHIQUES = {
+    'accueil': (graphiques_accueil, ('annee',)),
+    'universites': (graphiques_universites, ('annee', 'k')),
+    'palmares': (graphiques_palmares, ('annee', 'k')),
+    'statistiques': (graphiques_statistiques, ()),
+    'historique': (historique_universite, ('id_univ',)),
+}
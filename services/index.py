@@ -0,0 +1,92 @@
+"""
+Index secondaires du schema et plans d'execution.
+
+Les index sont declares dans les modeles (__table_args__) : db.create_all()
+les cree avec une nouvelle table, mais pas sur une table deja presente.
+
+- creer_index_manquants : ajoute a une base existante les index declares ;
+- analyser_base : met a jour les statistiques de l'optimiseur (ANALYZE) ;
+- plan_requete : plan d'execution SQLite (EXPLAIN QUERY PLAN) d'une requete.
+"""
+
+import logging
+import re
+
+from sqlalchemy import inspect, text
+from sqlalchemy.exc import IntegrityError
+
+from models import db
+
+logger = logging.getLogger(__name__)
+
+# "SCAN classement" / "SEARCH classement USING INDEX ix_... (annee=?)"
+_MOTIF_INDEX = re.compile(r'USING (?:COVERING )?INDEX (\w+)')
+_MOTIF_PARCOURS = re.compile(r'^SCAN (\w+)(?: AS \w+)?$')
+
+
+def creer_index_manquants():
+    """
+    Cree les index declares dans les modeles et absents de la base.
+
+    Un index unique contredit par les donnees n'est pas cree (erreur journalisee).
+
+    Returns:
+        list: Noms des index crees.
+    """
+    inspecteur = inspect(db.engine)
+    crees = []
+    for table in db.metadata.sorted_tables:
+        if not inspecteur.has_table(table.name):
+            continue
+        existants = {i['name'] for i in inspecteur.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name in existants:
+                continue
+            try:
+                index.create(db.engine)
+            except IntegrityError as e:
+                logger.error(f"Index {index.name} non cree (doublons dans {table.name}) : {e.orig}")
+                continue
+            crees.append(index.name)
+
+    if crees:
+        logger.info(f"Index crees : {', '.join(crees)}")
+        analyser_base()
+    return crees
+
+
+def analyser_base():
+    """
+    Recalcule les statistiques utilisees par l'optimiseur SQLite pour choisir les index.
+    """
+    with db.engine.begin() as connexion:
+        connexion.execute(text('ANALYZE'))
+
+
+def plan_requete(connexion, instruction, parametres=()):
+    """
+    Plan d'execution d'une requete SQL.
+
+    Args:
+        connexion: Connexion DBAPI sqlite3.
+        instruction (str): Requete SQL (parametres en ?).
+        parametres (tuple): Valeurs des parametres.
+
+    Returns:
+        dict: etapes (lignes du plan), index (index utilises) et parcours
+        (tables lues integralement sans index).
+    """
+    curseur = connexion.cursor()
+    try:
+        curseur.execute('EXPLAIN QUERY PLAN ' + instruction, parametres)
+        etapes = [ligne[-1] for ligne in curseur.fetchall()]
+    finally:
+        curseur.close()
+
+    index, parcours = [], []
+    for etape in etapes:
+        index.extend(_MOTIF_INDEX.findall(etape))
+        trouve = _MOTIF_PARCOURS.match(etape)
+        if trouve:
+            parcours.append(trouve.group(1))
+    return {'etapes': etapes, 'index': sorted(set(index)), 'parcours': sorted(set(parcours))}
@@ -0,0 +1,92 @@
+"""
+Palmares annuels (top-k / bottom-k) des indicateurs de classement.
+
+Pour chaque annee et chaque indicateur, l'ordre complet des universites est
+la permutation annuelle du magasin en colonnes (services.colonnes.
+MagasinColonnes.ordre), calculee une fois par version des donnees : les k
+premieres ou k dernieres s'obtiennent par simple tranche, en O(k), pour
+n'importe quelle annee et n'importe quel k. Les valeurs manquantes, placees
+en fin de permutation, sont exclues. Le magasin est charge quel que soit
+MOTEUR_REQUETES (voir services.colonnes).
+
+Les egalites sont departagees dans l'ordre de la liste des universites
+(rang, puis id_classement), comme les tris de /universites.
+"""
+
+from collections import namedtuple
+
+import numpy as np
+
+from services.colonnes import obtenir_magasin
+
+
+# Indicateurs disponibles (colonnes de Classement)
+INDICATEURS = (
+    'score_global',
+    'indic_enseig',
+    'indic_env_rech',
+    'indic_qualite_rech',
+    'indic_impact_industrie',
+    'indic_rel_intern',
+)
+
+# Entree d'un palmares
+EntreePalmares = namedtuple('EntreePalmares', ['id_classement', 'id_univ', 'nom_univ', 'valeur'])
+
+
+class Palmares:
+    """
+    Palmares annuels de chaque indicateur, lus dans le magasin en colonnes.
+
+    Attributes:
+        magasin (MagasinColonnes): Classements en colonnes de la version courante.
+        annees (list): Annees disponibles, plus recente en tete.
+    """
+
+    def __init__(self, magasin):
+        self.magasin = magasin
+        self.annees = [int(a) for a in magasin.annees]
+
+    def _entrees(self, annee, indicateur, decroissant, k):
+        magasin = self.magasin
+        lignes = magasin.ordre(annee, indicateur, decroissant)[:k]
+        valeurs = getattr(magasin, indicateur)[lignes]
+        presentes = ~np.isnan(valeurs)
+        return [
+            EntreePalmares(int(magasin.id_classement[i]), int(magasin.id_univ[i]), magasin.univ_noms[i], float(v))
+            for i, v in zip(lignes[presentes], valeurs[presentes])
+        ]
+
+    def premiers(self, annee, indicateur, k):
+        """
+        Les k universites ayant la valeur la plus haute de l'indicateur pour l'annee.
+
+        Returns:
+            list: EntreePalmares, meilleure en tete (vide si annee inconnue).
+        """
+        return self._entrees(annee, indicateur, True, k)
+
+    def derniers(self, annee, indicateur, k):
+        """
+        Les k universites ayant la valeur la plus basse de l'indicateur pour l'annee.
+
+        Returns:
+            list: EntreePalmares, plus basse en tete (vide si annee inconnue).
+        """
+        return self._entrees(annee, indicateur, False, k)
+
+
+def donnees_graphique(entrees):
+    """Donnees Chart.js {'labels', 'data'} d'un palmares."""
+    return {'labels': [e.nom_univ for e in entrees], 'data': [e.valeur for e in entrees]}
+
+
+def obtenir_palmares():
+    """
+    Renvoie les palmares de la version courante des donnees.
+
+    Returns:
+        Palmares: Palmares a jour, recalcules apres une nouvelle ingestion
+        (avec le magasin en colonnes).
+    """
+    return Palmares(obtenir_magasin())
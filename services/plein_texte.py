@@ -0,0 +1,199 @@
+"""
+Recherche plein texte des universites (SQLite FTS5).
+
+La table virtuelle universite_fts indexe le nom de chaque universite et
+celui de son pays (rowid = id_universite), sans accents ni casse, avec
+des index de prefixes pour la saisie semi-automatique. Des declencheurs
+sur universite et pays la maintiennent a jour ; db.create_all() ne gerant
+pas les tables virtuelles :
+
+- installer_index_texte : cree la table et les declencheurs s'ils manquent
+  (base existante, ou apres db.drop_all qui supprime les declencheurs) ;
+- reconstruire_index_texte : la remplit depuis les tables sources ;
+- verifier_index_texte : signale toute derive ;
+- ids_universites_texte / suggerer_universites : interrogation par MATCH.
+"""
+
+import logging
+import re
+
+from sqlalchemy import column, func, select, table, text
+
+from models import db, Pays, Universite
+
+logger = logging.getLogger(__name__)
+
+TABLE_TEXTE = 'universite_fts'
+
+# Table virtuelle vue par SQLAlchemy : rowid et colonne cachee du meme nom (MATCH)
+universite_fts = table(TABLE_TEXTE, column('rowid'), column('nom_univ'), column('nom_pays'),
+                       column(TABLE_TEXTE), column('rank'))
+
+_CREATION = (
+    f"CREATE VIRTUAL TABLE IF NOT EXISTS {TABLE_TEXTE} USING fts5("
+    "nom_univ, nom_pays, tokenize = 'unicode61 remove_diacritics 2', prefix = '2 3')"
+)
+
+_PAYS_UNIV = "(SELECT nom_pays FROM pays WHERE id_pays = NEW.id_pays)"
+
+_DECLENCHEURS = {
+    'universite_fts_ai': f"""
+        CREATE TRIGGER IF NOT EXISTS universite_fts_ai AFTER INSERT ON universite BEGIN
+            INSERT INTO {TABLE_TEXTE}(rowid, nom_univ, nom_pays)
+            VALUES (NEW.id_universite, NEW.nom_univ, {_PAYS_UNIV});
+        END""",
+    'universite_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS universite_fts_au AFTER UPDATE OF nom_univ, id_pays ON universite BEGIN
+            UPDATE {TABLE_TEXTE} SET nom_univ = NEW.nom_univ, nom_pays = {_PAYS_UNIV}
+            WHERE rowid = NEW.id_universite;
+        END""",
+    'universite_fts_ad': f"""
+        CREATE TRIGGER IF NOT EXISTS universite_fts_ad AFTER DELETE ON universite BEGIN
+            DELETE FROM {TABLE_TEXTE} WHERE rowid = OLD.id_universite;
+        END""",
+    'pays_fts_au': f"""
+        CREATE TRIGGER IF NOT EXISTS pays_fts_au AFTER UPDATE OF nom_pays ON pays BEGIN
+            UPDATE {TABLE_TEXTE} SET nom_pays = NEW.nom_pays
+            WHERE rowid IN (SELECT id_universite FROM universite WHERE id_pays = NEW.id_pays);
+        END""",
+}
+
+# Mots de la saisie : lettres et chiffres, le reste separe les mots
+_MOTIF_MOT = re.compile(r'\w+', re.UNICODE)
+
+
+def installer_index_texte():
+    """
+    Cree la table plein texte et ses declencheurs s'ils manquent.
+
+    La table est remplie si elle vient d'etre creee.
+
+    Returns:
+        bool: Vrai si la table a ete creee.
+    """
+    with db.engine.begin() as connexion:
+        existait = connexion.execute(text(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :nom"
+        ), {'nom': TABLE_TEXTE}).first() is not None
+        connexion.execute(text(_CREATION))
+        for instruction in _DECLENCHEURS.values():
+            connexion.execute(text(instruction))
+
+    if not existait:
+        reconstruire_index_texte()
+    return not existait
+
+
+def reconstruire_index_texte():
+    """
+    Remplit la table plein texte depuis universite et pays.
+
+    Returns:
+        int: Nombre d'universites indexees.
+    """
+    with db.engine.begin() as connexion:
+        connexion.execute(text(f"DELETE FROM {TABLE_TEXTE}"))
+        resultat = connexion.execute(text(
+            f"INSERT INTO {TABLE_TEXTE}(rowid, nom_univ, nom_pays) "
+            "SELECT u.id_universite, u.nom_univ, p.nom_pays "
+            "FROM universite u LEFT JOIN pays p ON p.id_pays = u.id_pays"
+        ))
+        # Fusion des segments de l'index apres un remplissage en masse
+        connexion.execute(text(f"INSERT INTO {TABLE_TEXTE}({TABLE_TEXTE}) VALUES ('optimize')"))
+    logger.info(f"Index plein texte reconstruit : {resultat.rowcount} universites")
+    return resultat.rowcount
+
+
+def verifier_index_texte(exemples=5):
+    """
+    Compare la table plein texte aux tables universite et pays.
+
+    Args:
+        exemples (int): Nombre d'identifiants cites par anomalie.
+
+    Returns:
+        list: Descriptions des divergences (liste vide si tout est coherent).
+    """
+    source = select(
+        Universite.id_universite.label('id'), Universite.nom_univ, Pays.nom_pays
+    ).outerjoin(Pays, Pays.id_pays == Universite.id_pays).subquery()
+
+    manquantes = select(source.c.id).outerjoin(
+        universite_fts, universite_fts.c.rowid == source.c.id
+    ).where(
+        universite_fts.c.nom_univ.is_not(source.c.nom_univ)
+        | universite_fts.c.nom_pays.is_not(source.c.nom_pays)
+    )
+    orphelines = select(universite_fts.c.rowid).where(
+        universite_fts.c.rowid.not_in(select(Universite.id_universite))
+    )
+
+    anomalies = []
+    for libelle, requete in (("universites absentes ou divergentes", manquantes),
+                             ("entrees sans universite", orphelines)):
+        nb = db.session.execute(select(func.count()).select_from(requete.subquery())).scalar() or 0
+        if nb:
+            ids = db.session.execute(requete.order_by(requete.selected_columns[0]).limit(exemples)).scalars().all()
+            anomalies.append(f"{TABLE_TEXTE} : {nb} {libelle}, par exemple {ids}")
+    return anomalies
+
+
+def requete_texte(saisie):
+    """
+    Expression MATCH FTS5 d'une saisie libre : chaque mot, entre guillemets,
+    est cherche comme prefixe, et tous les mots doivent etre presents.
+
+    Returns:
+        str: Expression MATCH, ou None si la saisie ne contient aucun mot.
+    """
+    mots = _MOTIF_MOT.findall(saisie or '')
+    if not mots:
+        return None
+    return ' '.join(f'"{mot}"*' for mot in mots)
+
+
+def condition_texte(saisie):
+    """
+    Condition SQLAlchemy sur la table virtuelle pour une saisie libre.
+
+    Returns:
+        ColumnElement: Condition MATCH, ou None si la saisie est vide.
+    """
+    expression = requete_texte(saisie)
+    if expression is None:
+        return None
+    return universite_fts.c[TABLE_TEXTE].op('MATCH')(expression)
+
+
+def ids_universites_texte(saisie):
+    """
+    Sous-requete des id_universite correspondant a une saisie.
+
+    Returns:
+        Select: SELECT rowid ... WHERE MATCH, ou None si la saisie est vide.
+    """
+    condition = condition_texte(saisie)
+    if condition is None:
+        return None
+    return select(universite_fts.c.rowid).where(condition)
+
+
+def suggerer_universites(saisie, limite=10):
+    """
+    Suggestions de saisie semi-automatique, par pertinence (bm25).
+
+    Args:
+        saisie (str): Debut du nom de l'universite ou du pays.
+        limite (int): Nombre maximal de suggestions.
+
+    Returns:
+        list: Dictionnaires id_universite, nom_univ et nom_pays.
+    """
+    condition = condition_texte(saisie)
+    if condition is None:
+        return []
+    lignes = db.session.execute(
+        select(universite_fts.c.rowid, universite_fts.c.nom_univ, universite_fts.c.nom_pays)
+        .where(condition).order_by(universite_fts.c.rank).limit(limite)
+    ).all()
+    return [{'id_universite': l[0], 'nom_univ': l[1], 'nom_pays': l[2]} for l in lignes]
@@ -0,0 +1,180 @@
+"""
+Profils des universites (page /universite/<id>).
+
+Un profil rassemble l'universite, son pays, sa region et toutes ses lignes
+de classement, annee par annee, avec leur recit (services.recits) et leurs
+centiles annuels (services.centiles). Il est lu en une seule requete (la ligne
+demandee designe l'universite, dont tout l'historique est joint) puis
+memorise par universite et par version des donnees : la fiche de
+n'importe quelle annee d'une universite deja vue, et son graphique
+d'historique, ne font plus aucune requete. Plusieurs profils absents de la
+memoire sont lus ensemble, en une requete IN (profils_universites).
+
+Les profils sont des tuples nommes detaches de la session SQLAlchemy.
+"""
+
+import threading
+from collections import namedtuple
+
+from models import db, Region, Pays, Universite, Classement, RecitClassement, CentileClassement
+from services.version import obtenir_par_version
+
+
+def _champs(modele):
+    """Attributs colonnes d'un modele, dans l'ordre de declaration."""
+    return [attribut.key for attribut in modele.__mapper__.column_attrs]
+
+
+# Instantanes des lignes, memes attributs que les modeles
+ClassementProfil = namedtuple('ClassementProfil', _champs(Classement))
+UniversiteProfil = namedtuple('UniversiteProfil', _champs(Universite))
+PaysProfil = namedtuple('PaysProfil', _champs(Pays))
+RegionProfil = namedtuple('RegionProfil', _champs(Region))
+CentilesProfil = namedtuple('CentilesProfil', _champs(CentileClassement))
+
+# Profil complet : classements par annee croissante, historique des graphiques,
+# recits et centiles par id_classement
+ProfilUniversite = namedtuple('ProfilUniversite',
+                              ['universite', 'pays', 'region', 'classements', 'historique', 'recits', 'centiles'])
+
+_MODELES = (
+    (Classement, ClassementProfil), (Universite, UniversiteProfil), (Pays, PaysProfil), (Region, RegionProfil),
+    (CentileClassement, CentilesProfil),
+)
+# Position de Classement.id_univ dans les lignes de _charger
+_POSITION_ID_UNIV = ClassementProfil._fields.index('id_univ')
+
+# Ecritures dans les memoires de profils
+_verrou = threading.Lock()
+
+
+class _Profils:
+    """Profils memorises d'une version des donnees."""
+
+    def __init__(self, version):
+        self.version = version
+        # id_univ -> ProfilUniversite (None : universite sans profil)
+        self.par_univ = {}
+        # id_classement -> id_univ, pour toutes les lignes des profils charges
+        self.univ_de = {}
+
+    def memoriser(self, id_univ, profil):
+        with _verrou:
+            self.par_univ[id_univ] = profil
+            if profil is not None:
+                self.univ_de.update((c.id_classement, id_univ) for c in profil.classements)
+
+
+def _memoire():
+    """Profils memorises de la version courante des donnees."""
+    return obtenir_par_version('profils', _Profils)
+
+
+def _charger(condition_univ):
+    """
+    Lit les profils des universites d'une condition, en une requete.
+
+    Args:
+        condition_univ: Condition SQL sur Classement.id_univ.
+
+    Returns:
+        dict: id_univ -> ProfilUniversite (universites ayant au moins une ligne).
+    """
+    colonnes = [getattr(modele, champ) for modele, type_ in _MODELES for champ in type_._fields]
+    lignes = db.session.query(*colonnes, RecitClassement.texte).select_from(Classement).join(
+        Universite, Classement.id_univ == Universite.id_universite
+    ).join(
+        Pays, Universite.id_pays == Pays.id_pays
+    ).join(
+        Region, Pays.id_region == Region.id_region
+    ).outerjoin(
+        RecitClassement, RecitClassement.id_classement == Classement.id_classement
+    ).outerjoin(
+        CentileClassement, CentileClassement.id_classement == Classement.id_classement
+    ).filter(condition_univ).order_by(
+        Classement.id_univ.asc(), Classement.annee.asc(), Classement.id_classement.asc()
+    ).all()
+
+    par_univ = {}
+    for ligne in lignes:
+        par_univ.setdefault(ligne[_POSITION_ID_UNIV], []).append(ligne)
+    return {id_univ: _assembler(lignes_univ) for id_univ, lignes_univ in par_univ.items()}
+
+
+def _assembler(lignes):
+    """Profil d'une universite a partir de ses lignes (meme ordre que les colonnes de _charger)."""
+    instantanes = []
+    debut = 0
+    for _, type_ in _MODELES:
+        fin = debut + len(type_._fields)
+        instantanes.append([type_(*ligne[debut:fin]) for ligne in lignes])
+        debut = fin
+    classements = tuple(instantanes[0])
+    return ProfilUniversite(
+        instantanes[1][0], instantanes[2][0], instantanes[3][0], classements,
+        {
+            'labels': [c.annee for c in classements],
+            'data_enseig': [c.indic_enseig for c in classements],
+            'data_rech': [c.indic_qualite_rech for c in classements],
+            'data_global': [c.score_global for c in classements],
+        },
+        {c.id_classement: ligne[-1] for c, ligne in zip(classements, lignes) if ligne[-1] is not None},
+        {c.id_classement: c for c in instantanes[4] if c.id_classement is not None}
+    )
+
+
+def profils_universites(ids_univ):
+    """
+    Profils de plusieurs universites, memorises par version des donnees.
+
+    Les profils absents de la memoire sont lus ensemble, en une requete IN.
+
+    Args:
+        ids_univ (list): Identifiants d'universites.
+
+    Returns:
+        dict: id_univ -> ProfilUniversite, pour les universites ayant au moins un classement.
+    """
+    memoire = _memoire()
+    manquants = sorted({i for i in ids_univ if i not in memoire.par_univ})
+    if manquants:
+        charges = _charger(Classement.id_univ.in_(manquants))
+        for id_univ in manquants:
+            memoire.memoriser(id_univ, charges.get(id_univ))
+    return {i: memoire.par_univ[i] for i in ids_univ if memoire.par_univ.get(i) is not None}
+
+
+def profil_universite(id_univ):
+    """
+    Profil d'une universite, memorise par version des donnees.
+
+    Returns:
+        ProfilUniversite: Profil, None si l'universite n'a aucun classement.
+    """
+    return profils_universites([id_univ]).get(id_univ)
+
+
+def profil_classement(id_classement):
+    """
+    Profil de l'universite d'une ligne de classement, et cette ligne.
+
+    Une ligne inconnue de la memoire est lue avec tout l'historique de son
+    universite, dans la meme requete (sous-requete sur id_classement).
+
+    Returns:
+        tuple: (ProfilUniversite, ClassementProfil), None si la ligne n'existe pas.
+    """
+    memoire = _memoire()
+    id_univ = memoire.univ_de.get(id_classement)
+    if id_univ is None:
+        univ_de_la_ligne = db.session.query(Classement.id_univ).filter(
+            Classement.id_classement == id_classement
+        ).scalar_subquery()
+        charges = _charger(Classement.id_univ == univ_de_la_ligne)
+        if not charges:
+            return None
+        id_univ, profil = next(iter(charges.items()))
+        memoire.memoriser(id_univ, profil)
+    profil = memoire.par_univ[id_univ]
+    ligne = next((c for c in profil.classements if c.id_classement == id_classement), None)
+    return (profil, ligne) if ligne is not None else None
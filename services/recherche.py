@@ -0,0 +1,306 @@
+"""
+Recherche dans la liste des universites (page /universites).
+
+La liste est triee sur une cle stable (annee decroissante, rang,
+id_classement) et paginee par curseur : la page suivante reprend apres la
+derniere ligne affichee, la precedente avant la premiere, sans OFFSET.
+Les curseurs transmis dans l'URL sont opaques (services.curseurs).
+Le moteur en colonnes (services.colonnes.MagasinColonnes.rechercher)
+applique les memes filtres, le meme tri et les memes curseurs.
+
+Avec le cache actif, chaque combinaison de filtres (normalisee) est
+resolue une seule fois par version des donnees : la liste ordonnee des
+id_classement et son effectif sont conserves, et toute page de la meme
+recherche n'est plus qu'une tranche de cette liste.
+
+Un tri choisi sur un indicateur (page_triee) ne passe pas par un ORDER BY :
+la page est une tranche des permutations annuelles precalculees du magasin
+en colonnes, restreintes aux filtres par l'index bitmap
+(services.bitmaps.IndexBitmaps.ordonner), paginee par numero de page.
+"""
+
+import math
+from collections import namedtuple
+
+import numpy as np
+from sqlalchemy import and_, func, or_, select
+
+from models import db, Region, Pays, Universite, Classement
+from services.bitmaps import COLONNES_TRI, obtenir_index_bitmaps
+from services.cache import cache
+from services.curseurs import ENTIER_MAX, ENTIER_MIN, PageListe, curseurs_page
+from services.plein_texte import ids_universites_texte, requete_texte
+
+
+# Resultat complet d'une recherche : id_classement ordonnes et effectif
+ResultatRecherche = namedtuple('ResultatRecherche', ['ids', 'total'])
+
+
+def normaliser_filtres(annee=None, pays=None, score_enseig_min=None, score_rech_min=None, nom=None):
+    """
+    Forme canonique des filtres de recherche (GET ou POST, valeurs vides ou non).
+
+    Une valeur non numerique, non finie ou hors des entiers SQLite est
+    traitee comme un filtre absent.
+
+    Returns:
+        dict: annee (int), pays (str), score_enseig_min et score_rech_min
+        (float), nom (mots de la saisie), None pour un filtre absent.
+    """
+    def _entier(valeur):
+        try:
+            valeur = None if valeur in (None, '') else int(valeur)
+        except (TypeError, ValueError, OverflowError):
+            return None
+        return valeur if valeur is not None and ENTIER_MIN <= valeur <= ENTIER_MAX else None
+
+    def _flottant(valeur):
+        try:
+            valeur = None if valeur in (None, '') else float(valeur)
+        except (TypeError, ValueError):
+            return None
+        return round(valeur, 6) if valeur is not None and math.isfinite(valeur) else None
+
+    pays = (pays or '').strip() or None
+    return {
+        'annee': _entier(annee),
+        'pays': pays,
+        'score_enseig_min': _flottant(score_enseig_min),
+        'score_rech_min': _flottant(score_rech_min),
+        'nom': ' '.join((nom or '').split()) if requete_texte(nom) else None,
+    }
+
+
+def normaliser_tri(tri=None, ordre=None):
+    """
+    Forme canonique du tri choisi dans la liste.
+
+    Returns:
+        tuple: (colonne de COLONNES_TRI ou None pour l'ordre du classement,
+        True si decroissant).
+    """
+    colonne = tri if tri in COLONNES_TRI else None
+    return colonne, ordre != 'asc'
+
+
+def _conditions(annee=None, pays=None, score_enseig_min=None, score_rech_min=None, nom=None):
+    """Conditions sur la seule table classement (cles pays/region denormalisees)."""
+    conditions = [
+        Classement.score_global.isnot(None),
+        Classement.rang.isnot(None),
+        # Equivaut a la jointure interne sur Region : pays rattache a une region
+        Classement.id_region.isnot(None),
+    ]
+    if annee is not None:
+        conditions.append(Classement.annee == annee)
+    if pays:
+        conditions.append(
+            Classement.id_pays == select(Pays.id_pays).where(Pays.nom_pays == pays).scalar_subquery()
+        )
+    if score_enseig_min is not None:
+        conditions.append(Classement.indic_enseig >= score_enseig_min)
+    if score_rech_min is not None:
+        conditions.append(Classement.indic_qualite_rech >= score_rech_min)
+    if nom:
+        # Index plein texte (services.plein_texte), jamais de LIKE '%...%'
+        conditions.append(Classement.id_univ.in_(ids_universites_texte(nom)))
+    return conditions
+
+
+def _apres(cle):
+    """Lignes situees strictement apres la cle (annee decroissante, rang, id)."""
+    annee, rang, id_classement = cle
+    return or_(
+        Classement.annee < annee,
+        and_(Classement.annee == annee, or_(
+            Classement.rang > rang,
+            and_(Classement.rang == rang, Classement.id_classement > id_classement)
+        ))
+    )
+
+
+def _avant(cle):
+    """Lignes situees strictement avant la cle."""
+    annee, rang, id_classement = cle
+    return or_(
+        Classement.annee > annee,
+        and_(Classement.annee == annee, or_(
+            Classement.rang < rang,
+            and_(Classement.rang == rang, Classement.id_classement < id_classement)
+        ))
+    )
+
+
+def requete_liste_universites(annee=None, pays=None, score_enseig_min=None, score_rech_min=None, nom=None):
+    """
+    Requete de la liste des universites, triee par annee (recente d'abord) puis rang.
+
+    Args:
+        annee (int): Annee du classement (None = toutes).
+        pays (str): Nom du pays (None ou '' = tous).
+        score_enseig_min (float): Score enseignement minimal.
+        score_rech_min (float): Score recherche minimal.
+        nom (str): Mots du nom de l'universite ou du pays (prefixes).
+
+    Returns:
+        Query: Lignes (id_classement, rang, nom_univ, nom_pays, nom_region,
+        indic_enseig, indic_qualite_rech, score_global, annee).
+    """
+    return db.session.query(
+        Classement.id_classement, Classement.rang, Universite.nom_univ, Pays.nom_pays,
+        Region.nom_region, Classement.indic_enseig, Classement.indic_qualite_rech, Classement.score_global,
+        Classement.annee
+    ).select_from(Classement).join(
+        Universite, Classement.id_univ == Universite.id_universite
+    ).join(
+        Pays, Classement.id_pays == Pays.id_pays
+    ).join(
+        Region, Classement.id_region == Region.id_region
+    ).filter(
+        *_conditions(annee, pays, score_enseig_min, score_rech_min, nom)
+    ).order_by(Classement.annee.desc(), Classement.rang.asc(), Classement.id_classement.asc())
+
+
+def compter_universites(**filtres):
+    """
+    Nombre de lignes de la liste, compte sur la seule table classement.
+
+    Returns:
+        int: Nombre total de resultats.
+    """
+    return db.session.query(
+        func.count(Classement.id_classement)
+    ).filter(*_conditions(**filtres)).scalar() or 0
+
+
+def page_universites(limite, offset=0, apres=None, avant=None, **filtres):
+    """
+    Une page de la liste, par curseur si possible, sinon par decalage.
+
+    Args:
+        limite (int): Nombre de lignes par page.
+        offset (int): Decalage, utilise seulement sans curseur (liens de numero de page).
+        apres (tuple): Cle de la derniere ligne de la page precedente.
+        avant (tuple): Cle de la premiere ligne de la page suivante.
+        **filtres: Filtres de requete_liste_universites.
+
+    Returns:
+        PageListe: Lignes de la page et curseurs voisins.
+    """
+    requete = requete_liste_universites(**filtres)
+
+    if avant is not None:
+        # Page precedente : lecture a rebours depuis le curseur, puis remise dans l'ordre
+        lignes = requete.filter(_avant(avant)).order_by(None).order_by(
+            Classement.annee.asc(), Classement.rang.desc(), Classement.id_classement.desc()
+        ).limit(limite + 1).all()
+        plus_avant = len(lignes) > limite
+        lignes = lignes[:limite][::-1]
+        plus_apres = True
+    else:
+        if apres is not None:
+            requete = requete.filter(_apres(apres))
+            plus_avant = True
+        else:
+            requete = requete.offset(offset)
+            plus_avant = offset > 0
+        lignes = requete.limit(limite + 1).all()
+        plus_apres = len(lignes) > limite
+        lignes = lignes[:limite]
+
+    cles = [(l.annee, l.rang, l.id_classement) for l in lignes]
+    suivant, precedent = curseurs_page(cles, plus_avant, plus_apres)
+    return PageListe(lignes, suivant, precedent)
+
+
+def rechercher_ids(**filtres):
+    """
+    Liste ordonnee des id_classement d'une recherche, en cache par version des donnees.
+
+    Args:
+        **filtres: Filtres normalises (normaliser_filtres).
+
+    Returns:
+        ResultatRecherche: ids (tuple) et total.
+    """
+    def calcul():
+        ids = tuple(i for i, in db.session.query(Classement.id_classement).filter(
+            *_conditions(**filtres)
+        ).order_by(Classement.annee.desc(), Classement.rang.asc(), Classement.id_classement.asc()))
+        return ResultatRecherche(ids, len(ids))
+
+    return cache.obtenir('recherche.ids', tuple(sorted(filtres.items())), calcul)
+
+
+def _lignes_par_ids(ids):
+    """Lignes de la liste pour des id_classement, dans l'ordre donne."""
+    if not ids:
+        return []
+    lignes = {l.id_classement: l for l in requete_liste_universites().filter(
+        Classement.id_classement.in_(ids)
+    ).order_by(None)}
+    return [lignes[i] for i in ids if i in lignes]
+
+
+def page_recherche(limite, offset=0, apres=None, avant=None, **filtres):
+    """
+    Page d'une recherche et effectif total.
+
+    Avec le cache actif, la page est une tranche de la liste memorisee
+    (rechercher_ids) ; sinon, ou si le curseur n'y figure pas, elle est lue
+    par curseur (page_universites) et l'effectif est compte.
+
+    Returns:
+        tuple: (nombre total de resultats, PageListe).
+    """
+    if cache.actif:
+        resultat = rechercher_ids(**filtres)
+        ids = resultat.ids
+        positions = None
+        if avant is not None or apres is not None:
+            try:
+                position = ids.index((avant or apres)[2])
+                positions = (max(position - limite, 0), position) if avant is not None \
+                    else (position + 1, position + 1 + limite)
+            except ValueError:
+                positions = None
+        else:
+            positions = (offset, offset + limite)
+
+        if positions is not None:
+            debut, fin = positions
+            lignes = _lignes_par_ids(ids[debut:fin])
+            cles = [(l.annee, l.rang, l.id_classement) for l in lignes]
+            suivant, precedent = curseurs_page(cles, debut > 0, fin < resultat.total)
+            return resultat.total, PageListe(lignes, suivant, precedent)
+
+    return compter_universites(**filtres), page_universites(limite, offset, apres, avant, **filtres)
+
+
+def page_triee(limite, offset, colonne, decroissant=True, **filtres):
+    """
+    Page de la liste triee sur un indicateur, et effectif total.
+
+    Les filtres sont resolus par l'index bitmap et l'ordre est lu dans les
+    permutations annuelles precalculees du magasin en colonnes : seules les
+    lignes de la page sont ensuite lues en base, par cle primaire.
+
+    Args:
+        limite (int): Nombre de lignes par page.
+        offset (int): Decalage dans la liste triee.
+        colonne (str): Colonne de COLONNES_TRI.
+        decroissant (bool): Sens du tri (valeurs manquantes en fin d'annee).
+        **filtres: Filtres normalises (normaliser_filtres).
+
+    Returns:
+        tuple: (nombre total de resultats, PageListe sans curseurs,
+        dict id_classement -> valeur de la colonne, None si absente).
+    """
+    index = obtenir_index_bitmaps()
+    positions = index.ordonner(index.filtrer(**filtres), colonne, decroissant, filtres.get('annee'))
+    page = positions[offset:offset + limite]
+    ids = index.id_classement[page].tolist()
+    valeurs = {
+        i: None if np.isnan(v) else float(v) for i, v in zip(ids, index.valeurs(colonne, page).tolist())
+    }
+    return int(positions.size), PageListe(_lignes_par_ids(ids), None, None), valeurs
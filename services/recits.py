@@ -0,0 +1,207 @@
+"""
+Recits (storytelling) des fiches d'universites, generes en bloc.
+
+Le recit d'une fiche ne depend que de l'historique de l'universite (ecarts
+entre premier et dernier score global, d'enseignement et de recherche) et
+de la ligne affichee (rang, score, annee). Il est donc calcule pour toutes
+les lignes de classement en une passe vectorisee (pandas : premiers et
+derniers scores par universite, choix des phrases par masques) et stocke
+dans recit_classement : la route /universite/<id> ne lit plus qu'un texte.
+
+- construire_recits : reconstruction complete (peuplement) ;
+- verifier_recits : comparaison avec un recalcul ;
+- completer_recits : generation pour une base sans recits (flask init-db).
+"""
+
+import logging
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import func, insert
+
+from models import db, Pays, Universite, Classement, RecitClassement
+
+logger = logging.getLogger(__name__)
+
+
+# Ecart (en points) au-dela duquel un score est considere en hausse ou en baisse
+SEUIL_EVOLUTION = 2
+
+# Recit d'une fiche sans classement
+RECIT_VIDE = "Aucune donnée de classement historique disponible pour cette université."
+
+
+def _donnees():
+    """Lignes de classement avec le nom de l'universite et du pays."""
+    lignes = db.session.query(
+        Classement.id_classement, Classement.id_univ, Classement.annee, Classement.rang,
+        Classement.score_global, Classement.indic_enseig, Classement.indic_qualite_rech,
+        Universite.nom_univ, Pays.nom_pays
+    ).join(
+        Universite, Classement.id_univ == Universite.id_universite
+    ).outerjoin(
+        Pays, Universite.id_pays == Pays.id_pays
+    ).all()
+    colonnes = ['id_classement', 'id_univ', 'annee', 'rang', 'score_global', 'indic_enseig',
+                'indic_qualite_rech', 'nom_univ', 'nom_pays']
+    df = pd.DataFrame(lignes, columns=colonnes)
+    for colonne in ('score_global', 'indic_enseig', 'indic_qualite_rech'):
+        df[colonne] = pd.to_numeric(df[colonne], errors='coerce')
+    return df
+
+
+def _texte(serie, format_='.1f'):
+    """Valeurs formatees ('-' si absentes)."""
+    return serie.map(lambda v: '-' if pd.isna(v) else format(v, format_))
+
+
+def calculer_recits(df=None):
+    """
+    Recit de chaque ligne de classement.
+
+    Args:
+        df (pd.DataFrame): Lignes de _donnees() ; lues en base si absent.
+
+    Returns:
+        pd.Series: Recit HTML indexe par id_classement.
+    """
+    if df is None:
+        df = _donnees()
+    if df.empty:
+        return pd.Series([], index=pd.Index([], name='id_classement'), dtype=object)
+
+    # Premier / dernier score non nul de chaque universite, par annee croissante
+    historique = df.sort_values(['id_univ', 'annee']).groupby('id_univ')
+    scores = {}
+    for nom, colonne in (('global', 'score_global'), ('enseig', 'indic_enseig'), ('rech', 'indic_qualite_rech')):
+        premier = historique[colonne].first()
+        dernier = historique[colonne].last()
+        nombre = historique[colonne].count()
+        scores[nom] = (premier, dernier, nombre)
+
+    univ = pd.DataFrame({
+        'premier': scores['global'][0],
+        'dernier': scores['global'][1],
+        'points': scores['global'][2],
+    })
+    univ['diff_global'] = univ['dernier'] - univ['premier']
+    for nom in ('enseig', 'rech'):
+        premier, dernier, nombre = scores[nom]
+        univ[f'diff_{nom}'] = (dernier - premier).where(nombre >= 2, 0.0)
+
+    lignes = df.join(univ, on='id_univ')
+    nom_univ = lignes['nom_univ'].fillna('').astype(str)
+    dg, de, dr = lignes['diff_global'], lignes['diff_enseig'], lignes['diff_rech']
+    s = SEUIL_EVOLUTION
+
+    # Progression globale
+    debut = "L'Université <strong>" + nom_univ + "</strong> "
+    progression = np.select(
+        [dg > s, dg < -s],
+        [
+            debut + "a démontré une <strong>progression constante</strong> de son score global, passant de "
+            + _texte(lignes['premier']) + " à <strong>" + _texte(lignes['dernier'])
+            + "</strong> sur la période observée.",
+            debut + "a connu un <strong>léger déclin</strong> de son score global, perdant "
+            + _texte(dg.abs()) + " points. Cela signale un besoin potentiel de réinvestissement "
+            "dans certains domaines.",
+        ],
+        debut + "maintient une <strong>performance stable</strong> et de haut niveau, son score global "
+        "fluctuant autour de <strong>" + _texte(lignes['dernier']) + "</strong>."
+    )
+
+    # Analyse des facteurs (phrase absente si aucun ecart notable)
+    baisse = (de < -s) | (dr < -s)
+    facteurs = np.select(
+        [(de > s) & (dr > s), de > s, dr > s, baisse & (de < dr), baisse],
+        [
+            "Cette performance est tirée par une <strong>amélioration notable</strong> dans ses deux "
+            "piliers : l'Enseignement (gain de " + _texte(de) + " points) et la Recherche (gain de "
+            + _texte(dr) + " points).",
+            "L'<strong>excellence en Enseignement</strong> est son principal moteur de croissance, "
+            "augmentant de " + _texte(de) + " points. L'indicateur de Recherche est resté stable ou a "
+            "légèrement évolué.",
+            "Le <strong>renforcement de la Recherche</strong> est la source principale de sa progression, "
+            "avec un gain de " + _texte(dr) + " points. Cela indique un impact croissant de ses travaux "
+            "scientifiques.",
+            "Malgré une stabilité globale, l'indicateur d'Enseignement (" + _texte(de) + ") montre une "
+            "légère faiblesse qui pourrait nécessiter une attention particulière.",
+            "Malgré une stabilité globale, l'indicateur de Recherche (" + _texte(dr) + ") montre une "
+            "légère faiblesse qui pourrait nécessiter une attention particulière.",
+        ],
+        ''
+    )
+    facteurs = pd.Series(facteurs, index=lignes.index)
+
+    # Conclusion : rang de la ligne affichee
+    rang = lignes['rang'].map(lambda v: '-' if pd.isna(v) else str(int(v)))
+    conclusion = (
+        "Avec un rang actuel de <strong>#" + rang + "</strong>, l'université se positionne comme un leader "
+        "mondial, reflet de la qualité de l'enseignement supérieur aux " + lignes['nom_pays'].fillna('-').astype(str) + "."
+    )
+    complet = progression + " " + facteurs.where(facteurs == '', facteurs + " ") + conclusion
+
+    # Un seul score global connu : recit court sur la ligne affichee
+    court = (
+        "Seulement un ou zéro point de données historique trouvé. Le score global actuel est de <strong>"
+        + _texte(lignes['score_global']) + "</strong> pour l'année " + lignes['annee'].astype(str) + "."
+    )
+    recits = pd.Series(np.where(lignes['points'] >= 2, complet, court), index=lignes['id_classement'])
+    return recits.sort_index()
+
+
+def construire_recits():
+    """
+    Regenere tous les recits a partir des classements.
+
+    Returns:
+        int: Nombre de recits ecrits.
+    """
+    recits = calculer_recits()
+    db.session.query(RecitClassement).delete()
+    if len(recits):
+        db.session.execute(insert(RecitClassement), [
+            {'id_classement': int(i), 'texte': texte} for i, texte in recits.items()
+        ])
+    db.session.commit()
+    logger.info(f"Recits recit_classement : {len(recits)} lignes")
+    return len(recits)
+
+
+def verifier_recits():
+    """
+    Compare les recits stockes a un recalcul.
+
+    Returns:
+        list: Descriptions des divergences (liste vide si tout est coherent).
+    """
+    attendus = calculer_recits().to_dict()
+    stockes = dict(db.session.query(RecitClassement.id_classement, RecitClassement.texte))
+    anomalies = []
+    manquants = attendus.keys() - stockes.keys()
+    if manquants:
+        anomalies.append(f"recit_classement : {len(manquants)} recit(s) manquant(s), ex. {min(manquants)}")
+    en_trop = stockes.keys() - attendus.keys()
+    if en_trop:
+        anomalies.append(f"recit_classement : {len(en_trop)} recit(s) en trop, ex. {min(en_trop)}")
+    differents = sorted(i for i in attendus.keys() & stockes.keys() if attendus[i] != stockes[i])
+    if differents:
+        anomalies.append(f"recit_classement : {len(differents)} recit(s) perime(s), ex. {differents[0]}")
+    return anomalies
+
+
+def completer_recits():
+    """
+    Genere les recits d'une base peuplee avant la creation de recit_classement.
+
+    Sans effet si la table contient deja des recits ou si la base est vide.
+
+    Returns:
+        bool: Vrai si les recits ont ete generes.
+    """
+    if db.session.query(RecitClassement.id_classement).first() is not None:
+        return False
+    if not db.session.query(func.count(Classement.id_classement)).scalar():
+        return False
+    construire_recits()
+    return True
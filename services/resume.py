@@ -0,0 +1,196 @@
+"""
+Construction et verification des tables de synthese.
+
+Les tables resume_* sont reconstruites en bloc (INSERT ... SELECT) apres
+le peuplement des classements, ou a la mise a niveau d'une base peuplee
+avant leur creation (completer_resumes). La verification recalcule les
+memes agregats sur les tables de base et signale toute divergence.
+"""
+
+import logging
+import math
+
+from sqlalchemy import func, insert, literal, select
+
+from models import (db, Classement, ResumeAnnee,
+                    ResumeAnneePays, ResumeAnneeRegion, ResumeTranche)
+from services.statistiques import tranche_intern, tranche_ratio_fh
+
+logger = logging.getLogger(__name__)
+
+
+def _requete_resume_annee():
+    """Agregats globaux par annee."""
+    return select(
+        Classement.annee,
+        func.count(Classement.id_classement),
+        func.count(func.distinct(Classement.id_pays)),
+        func.avg(Classement.score_global),
+        func.avg(Classement.indic_enseig),
+        func.avg(Classement.indic_qualite_rech),
+        func.avg(Classement.ratio_fem_hom),
+        func.avg(Classement.etud_internationaux_pct)
+    ).group_by(Classement.annee)
+
+
+def _requete_resume_annee_pays():
+    """Agregats par annee et par pays."""
+    return select(
+        Classement.annee,
+        Classement.id_pays,
+        func.count(Classement.id_classement),
+        func.avg(Classement.indic_enseig),
+        func.avg(Classement.indic_qualite_rech),
+        func.sum(Classement.indic_enseig),
+        func.count(Classement.indic_enseig),
+        func.sum(Classement.indic_qualite_rech),
+        func.count(Classement.indic_qualite_rech),
+        func.sum(Classement.score_global),
+        func.count(Classement.score_global)
+    ).filter(
+        Classement.id_pays.isnot(None)
+    ).group_by(Classement.annee, Classement.id_pays)
+
+
+def _requete_resume_annee_region():
+    """Agregats par annee et par region (les pays sans region sont exclus)."""
+    return select(
+        Classement.annee,
+        Classement.id_region,
+        func.count(Classement.id_classement),
+        func.sum(Classement.indic_enseig),
+        func.count(Classement.indic_enseig),
+        func.sum(Classement.indic_qualite_rech),
+        func.count(Classement.indic_qualite_rech)
+    ).filter(
+        Classement.id_region.isnot(None)
+    ).group_by(Classement.annee, Classement.id_region)
+
+
+def _requete_resume_tranche(axe, tranche):
+    """Agregats par annee et par tranche d'un indicateur de classement."""
+    return select(
+        Classement.annee,
+        literal(axe),
+        tranche,
+        func.count(Classement.id_classement),
+        func.sum(Classement.indic_env_rech),
+        func.count(Classement.indic_env_rech),
+        func.sum(Classement.indic_enseig),
+        func.count(Classement.indic_enseig),
+        func.sum(Classement.indic_qualite_rech),
+        func.count(Classement.indic_qualite_rech)
+    ).group_by(Classement.annee, tranche)
+
+
+def _definitions():
+    """
+    Associe chaque table de synthese a ses colonnes (dans l'ordre du SELECT)
+    et aux requetes qui la calculent.
+    """
+    tranche_cols = ['annee', 'axe', 'classe', 'nb_classements',
+                    'somme_env_rech', 'nb_env_rech', 'somme_enseig', 'nb_enseig',
+                    'somme_qualite_rech', 'nb_qualite_rech']
+    return [
+        (ResumeAnnee,
+         ['annee', 'nb_classements', 'nb_pays', 'moy_score_global', 'moy_enseig',
+          'moy_qualite_rech', 'moy_ratio_fem_hom', 'moy_etud_internationaux'],
+         [_requete_resume_annee()]),
+        (ResumeAnneePays,
+         ['annee', 'id_pays', 'nb_classements', 'moy_enseig', 'moy_qualite_rech',
+          'somme_enseig', 'nb_enseig', 'somme_qualite_rech', 'nb_qualite_rech',
+          'somme_score_global', 'nb_score_global'],
+         [_requete_resume_annee_pays()]),
+        (ResumeAnneeRegion,
+         ['annee', 'id_region', 'nb_classements', 'somme_enseig', 'nb_enseig',
+          'somme_qualite_rech', 'nb_qualite_rech'],
+         [_requete_resume_annee_region()]),
+        (ResumeTranche, tranche_cols,
+         [_requete_resume_tranche('intern', tranche_intern()),
+          _requete_resume_tranche('ratio_fh', tranche_ratio_fh())]),
+    ]
+
+
+def construire_resumes():
+    """
+    Reconstruit toutes les tables de synthese a partir des tables de base.
+
+    Returns:
+        dict: Nombre de lignes ecrites par table.
+    """
+    comptes = {}
+    for modele, colonnes, requetes in _definitions():
+        db.session.query(modele).delete()
+        for requete in requetes:
+            db.session.execute(insert(modele).from_select(colonnes, requete))
+        comptes[modele.__tablename__] = db.session.query(modele).count()
+    db.session.commit()
+
+    for table, nb in comptes.items():
+        logger.info(f"Synthese {table} : {nb} lignes")
+    return comptes
+
+
+def completer_resumes():
+    """
+    Construit les tables de synthese d'une base peuplee avant leur creation.
+
+    Sans effet si resume_annee contient deja des lignes ou si la base est vide.
+
+    Returns:
+        bool: Vrai si les tables ont ete construites.
+    """
+    if db.session.query(ResumeAnnee.annee).first() is not None:
+        return False
+    if not db.session.query(func.count(Classement.id_classement)).scalar():
+        return False
+    construire_resumes()
+    return True
+
+
+def _valeurs_egales(a, b):
+    """Compare deux valeurs agregees en tolerant les ecarts d'arrondi flottant."""
+    if a is None or b is None:
+        return a is None and b is None
+    if isinstance(a, float) or isinstance(b, float):
+        return math.isclose(float(a), float(b), rel_tol=1e-9, abs_tol=1e-9)
+    return a == b
+
+
+def verifier_resumes():
+    """
+    Verifie les tables de synthese contre les tables de base.
+
+    Returns:
+        list: Descriptions des divergences (liste vide si tout est coherent).
+    """
+    anomalies = []
+    for modele, colonnes, requetes in _definitions():
+        table = modele.__tablename__
+        nb_cle = len(modele.__table__.primary_key.columns)
+
+        attendu = {}
+        for requete in requetes:
+            for ligne in db.session.execute(requete):
+                attendu[tuple(ligne[:nb_cle])] = tuple(ligne[nb_cle:])
+
+        stocke = {}
+        for ligne in db.session.query(*[getattr(modele, c) for c in colonnes]):
+            stocke[tuple(ligne[:nb_cle])] = tuple(ligne[nb_cle:])
+
+        for cle in sorted(attendu.keys() - stocke.keys(), key=str):
+            anomalies.append(f"{table} {cle} : ligne manquante")
+        for cle in sorted(stocke.keys() - attendu.keys(), key=str):
+            anomalies.append(f"{table} {cle} : ligne en trop")
+        for cle in sorted(attendu.keys() & stocke.keys(), key=str):
+            for nom, a, b in zip(colonnes[nb_cle:], attendu[cle], stocke[cle]):
+                if not _valeurs_egales(a, b):
+                    anomalies.append(f"{table} {cle} : {nom} = {b}, attendu {a}")
+
+    # Controle independant : chaque classement est compte une seule fois par annee
+    total = db.session.query(func.count(Classement.id_classement)).scalar() or 0
+    total_resume = db.session.query(func.sum(ResumeAnnee.nb_classements)).scalar() or 0
+    if total != total_resume:
+        anomalies.append(f"resume_annee : {total_resume} classements resumes pour {total} en base")
+
+    return anomalies
@@ -0,0 +1,112 @@
+"""
+Mise a niveau d'une base existante et controle du schema au demarrage.
+
+Une base complete n'est jamais modifiee au demarrage : create_app lit
+seulement le catalogue SQLite (verifier_schema). Une base construite par
+une version anterieure de scripts/populate_db.py (univ.db livree : tables
+region, pays, universite et classement seules) est mise a niveau une fois,
+au premier demarrage ou par la commande `flask --app application init-db` ;
+populate_db.py construit directement une base complete.
+
+- mettre_a_niveau_base : tables, colonnes et index manquants, table plein
+  texte, recits, centiles et tables de synthese d'une base existante ;
+- verifier_schema : elements du schema absents de la base (lecture seule) ;
+- preparer_base : appele par create_app, met a niveau une base incomplete
+  et echoue si des elements manquent encore.
+"""
+
+import logging
+
+from sqlalchemy import inspect
+
+from models import db, Classement
+from services.centiles import completer_centiles
+from services.denormalisation import migrer_cles_geographiques
+from services.index import creer_index_manquants
+from services.plein_texte import TABLE_TEXTE, installer_index_texte
+from services.recits import completer_recits
+from services.resume import completer_resumes
+
+logger = logging.getLogger(__name__)
+
+# Colonnes ajoutees a classement apres sa creation (services.denormalisation)
+COLONNES_AJOUTEES = ('id_pays', 'id_region')
+
+
+def verifier_schema():
+    """
+    Liste les tables et colonnes attendues mais absentes de la base.
+
+    Seul le catalogue SQLite est lu : rien n'est cree ni modifie.
+
+    Returns:
+        list: Elements manquants ("table recit_classement",
+        "colonne classement.id_pays", ...), vide si la base est a jour.
+    """
+    inspecteur = inspect(db.engine)
+    tables = set(inspecteur.get_table_names())
+    manquants = [f"table {t.name}" for t in db.metadata.sorted_tables if t.name not in tables]
+    if TABLE_TEXTE not in tables:
+        manquants.append(f"table {TABLE_TEXTE}")
+    if Classement.__tablename__ in tables:
+        colonnes = {c['name'] for c in inspecteur.get_columns(Classement.__tablename__)}
+        manquants += [f"colonne {Classement.__tablename__}.{c}" for c in COLONNES_AJOUTEES if c not in colonnes]
+    return manquants
+
+
+def mettre_a_niveau_base():
+    """
+    Complete une base existante : schema, index et donnees derivees.
+
+    Chaque etape est sans effet sur une base deja a jour.
+
+    Returns:
+        list: Libelles des etapes ayant modifie la base.
+    """
+    # Tables des metadonnees absentes (la table plein texte est traitee a part)
+    etapes = [m for m in verifier_schema() if m.startswith('table ') and m != f"table {TABLE_TEXTE}"]
+    db.create_all()
+    # Base construite avant l'ajout des cles pays/region sur classement
+    if migrer_cles_geographiques():
+        etapes.append("cles pays/region de classement")
+    # Base construite avant la declaration des index secondaires
+    etapes += [f"index {nom}" for nom in creer_index_manquants()]
+    # Table plein texte des noms (hors metadonnees SQLAlchemy)
+    if installer_index_texte():
+        etapes.append(f"table {TABLE_TEXTE}")
+    # Base peuplee avant la creation des tables des recits et des centiles
+    if completer_recits():
+        etapes.append("recits des classements")
+    if completer_centiles():
+        etapes.append("centiles des classements")
+    # Base peuplee avant la creation des tables de synthese
+    if completer_resumes():
+        etapes.append("tables de synthese")
+    for etape in etapes:
+        logger.info("Mise a niveau de la base : %s", etape)
+    return etapes
+
+
+def preparer_base():
+    """
+    Verifie le schema au demarrage, apres une mise a niveau si besoin.
+
+    Une base complete n'est pas modifiee ; une base incomplete est mise a
+    niveau une fois (mettre_a_niveau_base).
+
+    Returns:
+        list: Libelles des etapes de mise a niveau (vide si la base etait a jour).
+
+    Raises:
+        RuntimeError: Si des elements du schema manquent encore.
+    """
+    if not verifier_schema():
+        return []
+    etapes = mettre_a_niveau_base()
+    manquants = verifier_schema()
+    if manquants:
+        raise RuntimeError(
+            f"Base incomplete apres mise a niveau ({', '.join(manquants)}) : "
+            f"reconstruire la base avec scripts/populate_db.py"
+        )
+    return etapes
@@ -0,0 +1,180 @@
+"""
+Universites similaires (plus proches voisins par profil d'indicateurs).
+
+Le profil d'une ligne de classement est le vecteur des cinq indicateurs,
+du pourcentage d'etudiants internationaux et du ratio etudiants/personnel,
+centres-reduits sur son annee (colonnes du magasin services.colonnes, sans
+nouvelle lecture de la table). Pour chaque annee, les plus proches voisins
+(distance euclidienne) de toutes les lignes sont calcules une fois par
+version des donnees, par blocs matriciels NumPy : la liste des universites
+similaires d'une fiche est ensuite une simple lecture, en O(k).
+
+Une valeur manquante est remplacee par la moyenne de l'annee (0 une fois
+centree) : l'universite reste indexee et la dimension absente ne l'eloigne
+ni ne la rapproche d'aucune autre.
+"""
+
+import threading
+from collections import namedtuple
+
+import numpy as np
+
+from services.colonnes import obtenir_magasin
+from services.version import obtenir_par_version
+
+
+# Dimensions du profil (colonnes de Classement)
+DIMENSIONS = (
+    'indic_enseig',
+    'indic_env_rech',
+    'indic_qualite_rech',
+    'indic_impact_industrie',
+    'indic_rel_intern',
+    'etud_internationaux_pct',
+    'ratio_etud_pers',
+)
+
+# Voisins conserves par ligne
+VOISINS_MAX = 20
+
+# Lignes traitees par bloc de distances (memoire : TAILLE_BLOC x lignes de l'annee)
+TAILLE_BLOC = 512
+
+# Universite similaire : ligne de classement de la meme annee et distance des profils
+Voisin = namedtuple('Voisin', ['id_classement', 'id_univ', 'nom_univ', 'nom_pays', 'score_global', 'distance'])
+
+
+def profils_centres_reduits(valeurs):
+    """
+    Centre et reduit chaque colonne ; les valeurs manquantes valent 0 (moyenne).
+
+    Args:
+        valeurs (np.ndarray): Matrice lignes x dimensions (NaN si absente).
+
+    Returns:
+        np.ndarray: Matrice centree-reduite, sans NaN.
+    """
+    presentes = ~np.isnan(valeurs)
+    nombres = presentes.sum(axis=0)
+    moyennes = np.where(presentes, valeurs, 0.0).sum(axis=0) / np.maximum(nombres, 1)
+    ecarts = np.where(presentes, valeurs - moyennes, 0.0)
+    ecarts_types = np.sqrt((ecarts ** 2).sum(axis=0) / np.maximum(nombres, 1))
+    # Dimension constante ou absente toute l'annee : sans effet sur les distances
+    ecarts_types[ecarts_types == 0] = 1.0
+    return ecarts / ecarts_types
+
+
+def plus_proches_voisins(profils, ids, k):
+    """
+    k plus proches voisins de chaque ligne (elle-meme exclue), par blocs.
+
+    Args:
+        profils (np.ndarray): Matrice lignes x dimensions sans NaN.
+        ids (np.ndarray): Identifiants des lignes, pour departager les egalites.
+        k (int): Nombre de voisins.
+
+    Returns:
+        tuple: (indices, distances), matrices lignes x min(k, lignes - 1),
+        du plus proche au plus lointain.
+    """
+    n = len(profils)
+    k = min(k, n - 1)
+    indices = np.empty((n, max(k, 0)), dtype=np.int64)
+    distances = np.empty((n, max(k, 0)), dtype=np.float64)
+    if k <= 0:
+        return indices, distances
+
+    normes = (profils ** 2).sum(axis=1)
+    # Rang de chaque identifiant : parmi les lignes a egalite avec le k-ieme voisin,
+    # les plus petits identifiants sont retenus
+    rangs_ids = np.argsort(np.argsort(ids, kind='stable'), kind='stable')
+    for debut in range(0, n, TAILLE_BLOC):
+        fin = min(debut + TAILLE_BLOC, n)
+        carres = normes[debut:fin, None] + normes[None, :] - 2.0 * profils[debut:fin] @ profils.T
+        np.maximum(carres, 0.0, out=carres)
+        carres[np.arange(fin - debut), np.arange(debut, fin)] = np.inf
+
+        seuils = np.partition(carres, k - 1, axis=1)[:, k - 1:k]
+        cles = np.where(carres < seuils, -1, np.where(carres == seuils, rangs_ids, n))
+        candidats = np.argpartition(cles, k - 1, axis=1)[:, :k]
+        carres_candidats = np.take_along_axis(carres, candidats, axis=1)
+        # Tri des k candidats de chaque ligne : distance, puis identifiant
+        ordre = np.lexsort((ids[candidats], carres_candidats))
+        indices[debut:fin] = np.take_along_axis(candidats, ordre, axis=1)
+        distances[debut:fin] = np.sqrt(np.take_along_axis(carres_candidats, ordre, axis=1))
+    return indices, distances
+
+
+class IndexSimilaires:
+    """
+    Plus proches voisins annuels des profils d'indicateurs.
+
+    Les voisins d'une annee sont calcules a la premiere consultation de
+    cette annee, puis conserves avec l'index.
+
+    Attributes:
+        version (str): Empreinte des donnees indexees.
+        magasin (MagasinColonnes): Classements en colonnes (identifiants,
+            noms, annees, scores) de la meme version.
+        profils (np.ndarray): Matrice lignes du magasin x DIMENSIONS (NaN si absente).
+    """
+
+    def __init__(self, version):
+        self.version = version
+        self.magasin = obtenir_magasin()
+        self.profils = np.column_stack([getattr(self.magasin, d) for d in DIMENSIONS])
+        # annee -> (positions des lignes de l'annee, indices des voisins, distances)
+        self._voisins = {}
+        self._verrou = threading.Lock()
+
+    def _voisins_annee(self, annee):
+        """Voisins de toutes les lignes d'une annee (calcules une fois)."""
+        voisins = self._voisins.get(annee)
+        if voisins is None:
+            with self._verrou:
+                voisins = self._voisins.get(annee)
+                if voisins is None:
+                    positions = self.magasin.lignes_de_l_annee(annee)
+                    indices, distances = plus_proches_voisins(
+                        profils_centres_reduits(self.profils[positions]), self.magasin.id_classement[positions],
+                        VOISINS_MAX
+                    )
+                    voisins = self._voisins[annee] = (positions, indices, distances)
+        return voisins
+
+    def similaires(self, id_classement, k=10):
+        """
+        Universites au profil le plus proche, la meme annee.
+
+        Args:
+            id_classement (int): Ligne de classement de reference.
+            k (int): Nombre de voisins (au plus VOISINS_MAX).
+
+        Returns:
+            list: Voisin, du plus proche au plus lointain (vide si ligne inconnue).
+        """
+        magasin = self.magasin
+        # Lignes du magasin triees par id_classement
+        position = int(np.searchsorted(magasin.id_classement, id_classement))
+        if position >= magasin.taille or magasin.id_classement[position] != id_classement:
+            return []
+        positions, indices, distances = self._voisins_annee(int(magasin.annee[position]))
+        rang = int(np.searchsorted(positions, position))
+        return [
+            Voisin(
+                int(magasin.id_classement[p]), int(magasin.id_univ[p]), magasin.univ_noms[p],
+                magasin.pays_noms[magasin.pays_idx[p]] if magasin.pays_idx[p] >= 0 else None,
+                None if np.isnan(magasin.score_global[p]) else float(magasin.score_global[p]), round(float(d), 4)
+            )
+            for p, d in zip(positions[indices[rang, :k]], distances[rang, :k])
+        ]
+
+
+def obtenir_index_similaires():
+    """
+    Renvoie l'index des universites similaires de la version courante des donnees.
+
+    Returns:
+        IndexSimilaires: Index a jour, reconstruit apres une nouvelle ingestion.
+    """
+    return obtenir_par_version('similaires', IndexSimilaires)
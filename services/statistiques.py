@@ -0,0 +1,210 @@
+"""
+Calcul des donnees de la page Statistiques.
+
+Les tranches (part d'etudiants internationaux, PIB, alphabetisation,
+ratio F/H) sont definies une seule fois ici : elles servent au calcul
+direct sur les tables de base comme a la construction des tables de
+synthese (services.resume).
+"""
+
+from sqlalchemy import case, func
+
+from models import (db, Region, Pays, Classement,
+                    ResumeAnneePays, ResumeAnneeRegion, ResumeTranche)
+from services.colonnes import moteur_colonnes_actif, obtenir_magasin
+
+
+# Ordres personnalises pour les categories
+ORDRE_PIB = {'Inconnu': 0, 'Faible revenu': 1, 'Revenu intermédiaire': 2, 'Haut revenu': 3}
+ORDRE_RATIO = {'Inconnu': 0, '< 40%': 1, '[40–60%]': 2, '>60%': 3}
+
+
+def tranche_intern():
+    """Tranche de la part d'etudiants internationaux d'un classement."""
+    return case(
+        (Classement.etud_internationaux_pct < 10, '[0–10%['),
+        (Classement.etud_internationaux_pct < 20, '[10–20%['),
+        (Classement.etud_internationaux_pct < 30, '[20–30%['),
+        (Classement.etud_internationaux_pct >= 30, '[30%+]'),
+        else_='Inconnu'
+    )
+
+
+def tranche_pib():
+    """Tranche de revenu d'un pays selon son PIB par habitant."""
+    return case(
+        (Pays.pib_hab <= 1135, 'Faible revenu'),
+        (Pays.pib_hab.between(1136, 4495), 'Revenu intermédiaire'),
+        (Pays.pib_hab >= 4496, 'Haut revenu'),
+        else_='Inconnu'
+    )
+
+
+def tranche_alpha():
+    """Tranche du taux d'alphabetisation d'un pays."""
+    return case(
+        (Pays.alphabetisation_pct < 80, '<80%'),
+        (Pays.alphabetisation_pct.between(80, 90), '[80–90%]'),
+        (Pays.alphabetisation_pct > 90, '>90%'),
+        else_='Inconnu'
+    )
+
+
+def tranche_ratio_fh():
+    """Tranche du ratio femmes / hommes d'un classement."""
+    return case(
+        (Classement.ratio_fem_hom < 40, '< 40%'),
+        (Classement.ratio_fem_hom.between(40, 60), '[40–60%]'),
+        (Classement.ratio_fem_hom > 60, '>60%'),
+        else_='Inconnu'
+    )
+
+
+def _moyenne_ponderee(somme, effectif):
+    """Moyenne recombinee a partir des sommes et effectifs non nuls stockes."""
+    return func.sum(somme) / func.sum(effectif)
+
+
+def _flottant(valeur):
+    """Convertit une moyenne SQL en float, 0 si absente."""
+    return float(valeur) if valeur else 0
+
+
+# ---------------------------------------------------------------------------
+# Lecture des lignes agregees : tables de synthese ou tables de base
+# ---------------------------------------------------------------------------
+
+def _lignes_depuis_base():
+    """Agregats calcules directement sur Region/Pays/Universite/Classement."""
+    intern = tranche_intern().label('classe')
+    pib = tranche_pib().label('classe')
+    alpha = tranche_alpha().label('classe')
+    ratio = tranche_ratio_fh().label('classe')
+
+    lignes = {}
+    lignes['intern'] = db.session.query(
+        intern, func.avg(Classement.indic_env_rech)
+    ).group_by(intern).all()
+
+    lignes['pib'] = db.session.query(
+        pib, func.avg(Classement.indic_enseig), func.avg(Classement.indic_qualite_rech)
+    ).select_from(Pays).join(
+        Classement, Classement.id_pays == Pays.id_pays
+    ).group_by(pib).all()
+
+    lignes['alpha'] = db.session.query(
+        alpha, func.avg(Classement.score_global)
+    ).select_from(Pays).join(
+        Classement, Classement.id_pays == Pays.id_pays
+    ).group_by(alpha).all()
+
+    lignes['ratio'] = db.session.query(
+        ratio, func.avg(Classement.indic_enseig), func.avg(Classement.indic_qualite_rech)
+    ).group_by(ratio).all()
+
+    lignes['region'] = db.session.query(
+        Region.nom_region, func.avg(Classement.indic_enseig), func.avg(Classement.indic_qualite_rech)
+    ).select_from(Region).join(
+        Classement, Classement.id_region == Region.id_region
+    ).group_by(Region.nom_region).all()
+    return lignes
+
+
+def _lignes_depuis_resumes():
+    """Memes agregats recombines a partir des tables de synthese (toutes annees)."""
+    pib = tranche_pib().label('classe')
+    alpha = tranche_alpha().label('classe')
+
+    lignes = {}
+    lignes['intern'] = db.session.query(
+        ResumeTranche.classe,
+        _moyenne_ponderee(ResumeTranche.somme_env_rech, ResumeTranche.nb_env_rech)
+    ).filter(ResumeTranche.axe == 'intern').group_by(ResumeTranche.classe).all()
+
+    lignes['pib'] = db.session.query(
+        pib,
+        _moyenne_ponderee(ResumeAnneePays.somme_enseig, ResumeAnneePays.nb_enseig),
+        _moyenne_ponderee(ResumeAnneePays.somme_qualite_rech, ResumeAnneePays.nb_qualite_rech)
+    ).select_from(ResumeAnneePays).join(
+        Pays, ResumeAnneePays.id_pays == Pays.id_pays
+    ).group_by(pib).all()
+
+    lignes['alpha'] = db.session.query(
+        alpha,
+        _moyenne_ponderee(ResumeAnneePays.somme_score_global, ResumeAnneePays.nb_score_global)
+    ).select_from(ResumeAnneePays).join(
+        Pays, ResumeAnneePays.id_pays == Pays.id_pays
+    ).group_by(alpha).all()
+
+    lignes['ratio'] = db.session.query(
+        ResumeTranche.classe,
+        _moyenne_ponderee(ResumeTranche.somme_enseig, ResumeTranche.nb_enseig),
+        _moyenne_ponderee(ResumeTranche.somme_qualite_rech, ResumeTranche.nb_qualite_rech)
+    ).filter(ResumeTranche.axe == 'ratio_fh').group_by(ResumeTranche.classe).all()
+
+    lignes['region'] = db.session.query(
+        Region.nom_region,
+        _moyenne_ponderee(ResumeAnneeRegion.somme_enseig, ResumeAnneeRegion.nb_enseig),
+        _moyenne_ponderee(ResumeAnneeRegion.somme_qualite_rech, ResumeAnneeRegion.nb_qualite_rech)
+    ).select_from(ResumeAnneeRegion).join(
+        Region, ResumeAnneeRegion.id_region == Region.id_region
+    ).group_by(Region.nom_region).all()
+    return lignes
+
+
+def calculer_statistiques():
+    """
+    Calcule les donnees des graphiques de la page Statistiques.
+
+    Avec le moteur en colonnes, les agregats sont calcules sur le magasin
+    NumPy. Sinon les tables de synthese sont utilisees des qu'elles sont
+    peuplees, et a defaut (base non reconstruite) les tables de base.
+
+    Returns:
+        dict: data_intern, data_pib, data_alpha, data_ratio et data_region.
+    """
+    lignes = None
+    if moteur_colonnes_actif():
+        lignes = obtenir_magasin().lignes_statistiques()
+    elif db.session.query(ResumeTranche.annee).first() is not None:
+        lignes = _lignes_depuis_resumes()
+    if not lignes or not lignes['intern']:
+        lignes = _lignes_depuis_base()
+
+    data_intern = [
+        {'classe': classe, 'score': _flottant(score)}
+        for classe, score in lignes['intern']
+    ]
+
+    data_pib = sorted([
+        {'classe': classe, 'enseignement': _flottant(enseig), 'recherche': _flottant(rech)}
+        for classe, enseig, rech in lignes['pib']
+    ], key=lambda x: ORDRE_PIB.get(x['classe'], 999))
+
+    data_alpha = [
+        {'classe': classe, 'count': _flottant(score)}
+        for classe, score in lignes['alpha']
+    ]
+
+    data_ratio = sorted([
+        {'classe': classe, 'enseignement': _flottant(enseig), 'recherche': _flottant(rech)}
+        for classe, enseig, rech in lignes['ratio']
+    ], key=lambda x: ORDRE_RATIO.get(x['classe'], 999))
+
+    data_region = [
+        {
+            'region': region,
+            'enseignement': _flottant(enseig),
+            'recherche': _flottant(rech),
+            'global': (float(enseig) if enseig else 0 + float(rech) if rech else 0) / 2
+        }
+        for region, enseig, rech in lignes['region']
+    ]
+
+    return {
+        'data_intern': data_intern,
+        'data_pib': data_pib,
+        'data_alpha': data_alpha,
+        'data_ratio': data_ratio,
+        'data_region': data_region,
+    }
@@ -0,0 +1,286 @@
+"""
+Agregation des indicateurs de la page d'accueil.
+
+Toutes les valeurs dependant de l'annee sont calculees en deux parcours
+groupes de la table Classement (un global, un par pays) au lieu d'une
+requete par indicateur. Les classements par pays et par region sont ensuite
+derives en Python a partir du resultat groupe par pays.
+
+Lorsque les tables de synthese (models.resume) sont peuplees, ces deux
+parcours sont remplaces par la lecture des lignes precalculees. Avec le
+moteur en colonnes (MOTEUR_REQUETES = 'colonnes'), tout est calcule sur
+le magasin NumPy de services.colonnes.
+
+Les graphiques de l'accueil (/api/charts/accueil) n'ont besoin que du
+parcours par pays : calculer_repartitions le fait seul, sans les KPI
+globaux ni le top 10.
+"""
+
+from dataclasses import dataclass, field
+from typing import List, Optional, Tuple
+
+from sqlalchemy import func, select
+
+from models import (db, Region, Pays, Classement, ResumeAnnee, ResumeAnneePays,
+                    options_classement_complet)
+from services.colonnes import moteur_colonnes_actif, obtenir_magasin
+from services.dimensions import obtenir_dimensions
+
+
+ANNEE_PAR_DEFAUT = 2025
+
+
+def _arrondir(valeur, decimales):
+    """Arrondit une moyenne SQL en renvoyant 0 si elle est absente."""
+    return round(valeur, decimales) if valeur else 0
+
+
+def _cle_tri_desc(valeur):
+    """Cle de tri decroissant qui place les valeurs NULL en dernier (comme SQLite)."""
+    return (valeur is None, -(valeur or 0))
+
+
+@dataclass
+class RepartitionsPays:
+    """
+    Classements par pays et par region d'une annee (parcours groupe par pays).
+
+    Attributes:
+        annee (int): Annee affichee.
+        top_pays_enseig (list): Couples (pays, moyenne enseignement), 5 premiers.
+        top_pays_rech (list): Couples (pays, moyenne recherche), 5 premiers.
+        top_pays_nb_univ (list): Couples (pays, nb classements), 5 premiers.
+        repartition_region (list): Couples (region, nb classements) tries par nom.
+    """
+
+    annee: int
+    nb_pays: int = 0
+    pays_top_univ: str = "N/A"
+    pays_top_univ_nb: int = 0
+    region_top_univ: str = "N/A"
+    region_top_univ_nb: int = 0
+    top_pays_enseig: List[Tuple[str, Optional[float]]] = field(default_factory=list)
+    top_pays_rech: List[Tuple[str, Optional[float]]] = field(default_factory=list)
+    top_pays_nb_univ: List[Tuple[str, int]] = field(default_factory=list)
+    repartition_region: List[Tuple[str, int]] = field(default_factory=list)
+
+    @property
+    def data_top_pays_enseig(self):
+        """Donnees Chart.js du top 5 des pays en enseignement."""
+        return {"labels": [r[0] for r in self.top_pays_enseig],
+                "data": [float(r[1]) if r[1] is not None else 0 for r in self.top_pays_enseig]}
+
+    @property
+    def data_top_pays_rech(self):
+        """Donnees Chart.js du top 5 des pays en recherche."""
+        return {"labels": [r[0] for r in self.top_pays_rech],
+                "data": [float(r[1]) if r[1] is not None else 0 for r in self.top_pays_rech]}
+
+    @property
+    def data_repartition_region(self):
+        """Donnees Chart.js de la repartition des classements par region."""
+        return {"labels": [r[0] for r in self.repartition_region],
+                "data": [int(r[1]) if r[1] is not None else 0 for r in self.repartition_region]}
+
+
+@dataclass
+class IndicateursTableauBord(RepartitionsPays):
+    """
+    Resultat type des KPI de la page d'accueil pour une annee.
+
+    Attributes:
+        annees (list): Annees disponibles, de la plus recente a la plus ancienne.
+        top_10 (list): Objets Classement des 10 premiers rangs.
+        (et les classements par pays et par region de RepartitionsPays)
+    """
+
+    annees: List[int] = field(default_factory=list)
+    # KPI pays
+    pib_moyen: float = 0
+    alpha_moyen: float = 0
+    migration_moy: float = 0
+    # KPI universites
+    nb_universites: int = 0
+    nb_regions: int = 0
+    score_moyen: float = 0
+    enseig_moyen: float = 0
+    rech_moyen: float = 0
+    ratio_fh_moyen: float = 0
+    etud_inter_moyen: float = 0
+    # Tableau
+    top_10: list = field(default_factory=list)
+
+
+def _moyennes_pays():
+    """Moyennes socio-economiques (toutes annees) et nombre de regions, en une requete."""
+    return db.session.query(
+        func.avg(Pays.pib_hab),
+        func.avg(Pays.alphabetisation_pct),
+        func.avg(Pays.migration_nette),
+        select(func.count(Region.id_region)).scalar_subquery()
+    ).one()
+
+
+def _agregats_annee(annee, depuis_resumes=False):
+    """Parcours global : moyennes des scores de l'annee."""
+    if depuis_resumes:
+        return db.session.query(
+            ResumeAnnee.moy_score_global,
+            ResumeAnnee.moy_enseig,
+            ResumeAnnee.moy_qualite_rech,
+            ResumeAnnee.moy_ratio_fem_hom,
+            ResumeAnnee.moy_etud_internationaux
+        ).filter(ResumeAnnee.annee == annee).first() or (None,) * 5
+    return db.session.query(
+        func.avg(Classement.score_global),
+        func.avg(Classement.indic_enseig),
+        func.avg(Classement.indic_qualite_rech),
+        func.avg(Classement.ratio_fem_hom),
+        func.avg(Classement.etud_internationaux_pct)
+    ).filter(Classement.annee == annee).one()
+
+
+def _agregats_par_pays(annee, depuis_resumes=False):
+    """Parcours groupe par pays : effectif et moyennes, avec la region de chaque pays."""
+    if depuis_resumes:
+        return db.session.query(
+            Pays.nom_pays,
+            Region.nom_region,
+            ResumeAnneePays.nb_classements,
+            ResumeAnneePays.moy_enseig,
+            ResumeAnneePays.moy_qualite_rech
+        ).select_from(ResumeAnneePays).join(
+            Pays, ResumeAnneePays.id_pays == Pays.id_pays
+        ).outerjoin(
+            Region, Pays.id_region == Region.id_region
+        ).filter(
+            ResumeAnneePays.annee == annee
+        ).order_by(Pays.nom_pays).all()
+    return db.session.query(
+        Pays.nom_pays,
+        Region.nom_region,
+        func.count(Classement.id_classement),
+        func.avg(Classement.indic_enseig),
+        func.avg(Classement.indic_qualite_rech)
+    ).select_from(Classement).join(
+        Pays, Classement.id_pays == Pays.id_pays
+    ).outerjoin(
+        Region, Classement.id_region == Region.id_region
+    ).filter(
+        Classement.annee == annee
+    ).group_by(Classement.id_pays).order_by(Pays.nom_pays).all()
+
+
+def _top_10(annee):
+    """Les dix premiers classements de l'annee."""
+    return Classement.query.options(options_classement_complet()).filter_by(annee=annee).order_by(
+        Classement.rang
+    ).limit(10).all()
+
+
+def _classements_par_id(ids):
+    """Charge des objets Classement en conservant l'ordre des identifiants donnes."""
+    ids = [int(i) for i in ids]
+    requete = Classement.query.options(options_classement_complet()).filter(Classement.id_classement.in_(ids))
+    objets = {c.id_classement: c for c in requete}
+    return [objets[i] for i in ids if i in objets]
+
+
+def _sources(annee):
+    """
+    Magasin en colonnes (None en moteur SQL), annee retenue, effectifs par
+    annee et provenance des agregats (tables de synthese ou non).
+    """
+    magasin = obtenir_magasin() if moteur_colonnes_actif() else None
+    if magasin:
+        annees_effectifs, depuis_resumes = magasin.lister_annees(), False
+    else:
+        dimensions = obtenir_dimensions()
+        annees_effectifs, depuis_resumes = dimensions.annees_effectifs, dimensions.depuis_resumes
+    if annee is None:
+        annee = annees_effectifs[0][0] if annees_effectifs else ANNEE_PAR_DEFAUT
+    return magasin, annee, annees_effectifs, depuis_resumes
+
+
+def _remplir_repartitions(resultat, par_pays):
+    """Renseigne les champs de RepartitionsPays a partir du parcours groupe par pays."""
+    resultat.nb_pays = len(par_pays)
+
+    par_nb = sorted(par_pays, key=lambda r: -r[2])
+    if par_nb:
+        resultat.pays_top_univ, resultat.pays_top_univ_nb = par_nb[0][0], par_nb[0][2]
+    resultat.top_pays_nb_univ = [(r[0], r[2]) for r in par_nb[:5]]
+    resultat.top_pays_enseig = [(r[0], r[3]) for r in sorted(par_pays, key=lambda r: _cle_tri_desc(r[3]))[:5]]
+    resultat.top_pays_rech = [(r[0], r[4]) for r in sorted(par_pays, key=lambda r: _cle_tri_desc(r[4]))[:5]]
+
+    par_region = {}
+    for nom_pays, nom_region, nb, _, _ in par_pays:
+        if nom_region is not None:
+            par_region[nom_region] = par_region.get(nom_region, 0) + nb
+    resultat.repartition_region = sorted(par_region.items())
+    if par_region:
+        resultat.region_top_univ, resultat.region_top_univ_nb = max(
+            resultat.repartition_region, key=lambda r: r[1]
+        )
+
+
+def calculer_repartitions(annee=None):
+    """
+    Classements par pays et par region d'une annee, seuls (graphiques de l'accueil).
+
+    Args:
+        annee (int): Annee demandee. Par defaut, l'annee la plus recente.
+
+    Returns:
+        RepartitionsPays: Resultat du seul parcours groupe par pays.
+    """
+    magasin, annee, _, depuis_resumes = _sources(annee)
+    repartitions = RepartitionsPays(annee=annee)
+    _remplir_repartitions(
+        repartitions, magasin.agregats_par_pays(annee) if magasin else _agregats_par_pays(annee, depuis_resumes)
+    )
+    return repartitions
+
+
+def calculer_tableau_bord(annee=None):
+    """
+    Calcule l'ensemble des KPI de la page d'accueil pour une annee.
+
+    Args:
+        annee (int): Annee demandee. Par defaut, l'annee la plus recente.
+
+    Returns:
+        IndicateursTableauBord: KPI, donnees des graphiques et top 10.
+    """
+    magasin, annee, annees_effectifs, depuis_resumes = _sources(annee)
+    effectifs = dict(annees_effectifs)
+
+    kpi = IndicateursTableauBord(annee=annee, annees=[a for a, _ in annees_effectifs])
+
+    pib, alpha, migration, nb_regions = magasin.moyennes_pays() if magasin else _moyennes_pays()
+    kpi.pib_moyen = _arrondir(pib, 0)
+    kpi.alpha_moyen = _arrondir(alpha, 1)
+    kpi.migration_moy = _arrondir(migration, 2)
+    kpi.nb_regions = nb_regions or 0
+
+    kpi.nb_universites = effectifs.get(annee, 0)
+    score, enseig, rech, ratio_fh, etud_inter = (
+        magasin.agregats_annee(annee) if magasin else _agregats_annee(annee, depuis_resumes)
+    )
+    kpi.score_moyen = _arrondir(score, 2)
+    kpi.enseig_moyen = _arrondir(enseig, 2)
+    kpi.rech_moyen = _arrondir(rech, 2)
+    kpi.ratio_fh_moyen = _arrondir(ratio_fh, 2)
+    kpi.etud_inter_moyen = _arrondir(etud_inter, 1)
+
+    # Tout ce qui est groupe par pays ou par region vient du meme parcours
+    _remplir_repartitions(
+        kpi, magasin.agregats_par_pays(annee) if magasin else _agregats_par_pays(annee, depuis_resumes)
+    )
+
+    if magasin:
+        indices = magasin.top_k(annee, 'rang', 10, decroissant=False)
+        kpi.top_10 = _classements_par_id(magasin.id_classement[indices])
+    else:
+        kpi.top_10 = _top_10(annee)
+    return kpi
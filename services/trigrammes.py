@@ -0,0 +1,217 @@
+"""
+Correspondance approchee des noms d'universites (index de trigrammes).
+
+Les noms THE varient d'une annee a l'autre ("Univ.", accents, "The ...") :
+chaque nom est normalise (minuscules, sans accents ni ponctuation,
+abreviations developpees, mots vides retires) puis decoupe en trigrammes
+de caracteres, a la maniere de pg_trgm. Un index inverse trigramme ->
+universites permet de ne scorer que les candidats partageant assez de
+trigrammes avec la saisie, jamais tous les noms deux a deux.
+
+- IndexTrigrammes.rechercher : correspondances classees d'une saisie mal orthographiee ;
+- IndexTrigrammes.doublons : paires de noms quasi identiques (controle de l'ingestion) ;
+- obtenir_index_trigrammes : index de la version courante des donnees.
+"""
+
+import math
+import re
+import unicodedata
+from collections import namedtuple
+
+import numpy as np
+
+from models import db, Pays, Universite
+from services.version import obtenir_par_version
+
+
+# Abreviations courantes dans les noms, developpees avant decoupage
+ABREVIATIONS = {
+    'univ': 'university',
+    'uni': 'university',
+    'inst': 'institute',
+    'tech': 'technology',
+    'sci': 'science',
+    'st': 'saint',
+}
+
+# Mots sans valeur discriminante ("The University of ...")
+MOTS_VIDES = frozenset({'the', 'of', 'and', 'at', 'in', 'for', 'de', 'du', 'des', 'la', 'le', 'les', 'di', 'der'})
+
+_MOTIF_NON_MOT = re.compile(r'[^0-9a-z]+')
+
+# Universite trouvee : id, nom, pays et similarite (0 a 1)
+Correspondance = namedtuple('Correspondance', ['id_universite', 'nom_univ', 'nom_pays', 'score'])
+
+
+def normaliser_nom(nom):
+    """
+    Forme canonique d'un nom pour la comparaison approchee.
+
+    Returns:
+        str: Mots en minuscules ASCII, separes par une espace.
+    """
+    ascii_ = unicodedata.normalize('NFKD', nom or '').encode('ascii', 'ignore').decode('ascii')
+    mots = _MOTIF_NON_MOT.sub(' ', ascii_.lower()).split()
+    mots = [ABREVIATIONS.get(mot, mot) for mot in mots]
+    return ' '.join(mot for mot in mots if mot not in MOTS_VIDES)
+
+
+def trigrammes(nom):
+    """
+    Trigrammes d'un nom normalise, chaque mot etant borde d'espaces ("  x", "x ").
+
+    Returns:
+        frozenset: Trigrammes distincts.
+    """
+    resultat = set()
+    for mot in nom.split():
+        borde = '  ' + mot + ' '
+        resultat.update(borde[i:i + 3] for i in range(len(borde) - 2))
+    return frozenset(resultat)
+
+
+class IndexTrigrammes:
+    """
+    Index inverse des trigrammes des noms d'universites.
+
+    Attributes:
+        version (str): Empreinte des donnees indexees (None hors base).
+        ids (np.ndarray): id_universite par position.
+        noms (list): Noms d'origine par position.
+        pays (list): Noms des pays par position.
+        tailles (np.ndarray): Nombre de trigrammes de chaque nom.
+        postings (dict): Trigramme -> positions (np.ndarray triees) des noms le contenant.
+    """
+
+    def __init__(self, universites, version=None):
+        """
+        Args:
+            universites (list): Triplets (id_universite, nom_univ, nom_pays).
+            version (str): Empreinte des donnees indexees.
+        """
+        self.version = version
+        self.ids = np.array([u[0] for u in universites], dtype=np.int64)
+        self.noms = [u[1] or '' for u in universites]
+        self.pays = [u[2] for u in universites]
+        self.trigrammes = [trigrammes(normaliser_nom(nom)) for nom in self.noms]
+        self.tailles = np.array([len(t) for t in self.trigrammes], dtype=np.int64)
+
+        positions = {}
+        for position, ensemble in enumerate(self.trigrammes):
+            for trigramme in ensemble:
+                positions.setdefault(trigramme, []).append(position)
+        self.postings = {t: np.array(p, dtype=np.int64) for t, p in positions.items()}
+
+    @classmethod
+    def depuis_base(cls, version=None):
+        """
+        Construit l'index des universites de la base.
+
+        Returns:
+            IndexTrigrammes: Index de toutes les universites.
+        """
+        lignes = db.session.query(
+            Universite.id_universite, Universite.nom_univ, Pays.nom_pays
+        ).outerjoin(Pays, Universite.id_pays == Pays.id_pays).order_by(Universite.id_universite).all()
+        return cls([tuple(l) for l in lignes], version)
+
+    def _recouvrements(self, requete, minimum):
+        """
+        Nombre de trigrammes partages avec la requete, pour les seuls candidats.
+
+        Un nom partageant au moins `minimum` trigrammes avec une requete de
+        n trigrammes en contient au moins un parmi ses n - minimum + 1 plus
+        rares : seules les listes de ces trigrammes designent les candidats,
+        dont le recouvrement est ensuite compte sur toutes les listes.
+
+        Returns:
+            tuple: (positions des candidats, recouvrements), tableaux alignes.
+        """
+        listes = sorted((self.postings[t] for t in requete if t in self.postings), key=len)
+        if not listes or len(listes) < minimum:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+        candidats = np.unique(np.concatenate(listes[:len(listes) - minimum + 1]))
+        recouvrements = np.zeros(candidats.size, dtype=np.int64)
+        for liste in listes:
+            # Listes triees : appartenance de chaque candidat par recherche dichotomique
+            rangs = np.minimum(np.searchsorted(liste, candidats), liste.size - 1)
+            recouvrements += liste[rangs] == candidats
+        garde = recouvrements >= minimum
+        return candidats[garde], recouvrements[garde]
+
+    def rechercher(self, saisie, limite=10, seuil=0.3):
+        """
+        Universites dont le nom ressemble le plus a une saisie.
+
+        Le score est la part des trigrammes de la saisie presents dans le nom
+        (une saisie partielle peut donc etre complete) ; a egalite, le nom le
+        plus proche dans son ensemble (indice de Jaccard) passe devant.
+
+        Args:
+            saisie (str): Nom approche, eventuellement mal orthographie.
+            limite (int): Nombre maximal de resultats.
+            seuil (float): Score minimal (0 a 1).
+
+        Returns:
+            list: Correspondance, par score decroissant.
+        """
+        requete = trigrammes(normaliser_nom(saisie))
+        if not requete:
+            return []
+        candidats, communs = self._recouvrements(requete, max(1, math.ceil(seuil * len(requete))))
+        if not candidats.size:
+            return []
+
+        scores = communs / len(requete)
+        jaccard = communs / (len(requete) + self.tailles[candidats] - communs)
+        ordre = np.lexsort((candidats, -jaccard, -scores))[:limite]
+        return [
+            Correspondance(int(self.ids[p]), self.noms[p], self.pays[p], round(float(scores[i]), 4))
+            for i, p in ((i, candidats[i]) for i in ordre)
+        ]
+
+    def doublons(self, seuil=0.8, meme_pays=True):
+        """
+        Paires de noms quasi identiques (indice de Jaccard des trigrammes).
+
+        Args:
+            seuil (float): Similarite minimale (0 a 1).
+            meme_pays (bool): Ne rapprocher que des universites du meme pays
+                ("University of York" et "York University" sont distinctes).
+
+        Returns:
+            list: Triplets (Correspondance, Correspondance, similarite), les
+            plus proches en tete.
+        """
+        paires = []
+        for position, requete in enumerate(self.trigrammes):
+            if not requete:
+                continue
+            # Jaccard >= seuil impose au moins seuil * |requete| trigrammes communs
+            candidats, communs = self._recouvrements(requete, max(1, math.ceil(seuil * len(requete))))
+            apres = candidats > position
+            candidats, communs = candidats[apres], communs[apres]
+            jaccard = communs / (len(requete) + self.tailles[candidats] - communs)
+            for autre, similarite in zip(candidats[jaccard >= seuil], jaccard[jaccard >= seuil]):
+                if meme_pays and self.pays[autre] != self.pays[position]:
+                    continue
+                similarite = round(float(similarite), 4)
+                paires.append((self._correspondance(position, similarite),
+                               self._correspondance(autre, similarite), similarite))
+        paires.sort(key=lambda p: (-p[2], p[0].id_universite, p[1].id_universite))
+        return paires
+
+    def _correspondance(self, position, score):
+        """Correspondance du nom a une position de l'index."""
+        return Correspondance(int(self.ids[position]), self.noms[position], self.pays[position], score)
+
+
+def obtenir_index_trigrammes():
+    """
+    Renvoie l'index de trigrammes de la version courante des donnees.
+
+    Returns:
+        IndexTrigrammes: Index a jour, reconstruit apres une nouvelle ingestion.
+    """
+    return obtenir_par_version('trigrammes', IndexTrigrammes.depuis_base)
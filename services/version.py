@@ -0,0 +1,195 @@
+"""
+Version des donnees servies par l'application.
+
+L'empreinte est le jeton de la derniere ingestion (table ingestion), ou a
+defaut (table vide ou absente d'une base anterieure) la date et la taille
+du fichier univ.db. Pour eviter une requete a
+chaque appel, elle n'est relue en base que lorsque le fichier SQLite change
+(date de modification ou taille) : une reconstruction par populate_db.py
+produit donc automatiquement une nouvelle version.
+
+Une base en memoire (TestingConfig) n'a pas de fichier : sa version est le
+nombre de transactions validees sur son moteur, qui change a chaque COMMIT,
+et l'identite du moteur (deux applications de test ne partagent rien).
+
+obtenir_par_version sert aux index et memoires construits une fois par
+version des donnees (services.bitmaps, services.colonnes...).
+"""
+
+import itertools
+import os
+import threading
+import uuid
+import weakref
+from collections import namedtuple
+from datetime import datetime, timezone
+
+from sqlalchemy import event, inspect
+
+from models import db, Classement, Ingestion
+
+
+VersionDonnees = namedtuple('VersionDonnees', ['empreinte', 'horodatage'])
+
+_verrou = threading.Lock()
+# Chemin du fichier SQLite -> (signature du fichier, VersionDonnees)
+_versions_connues = {}
+# Moteur d'une base en memoire -> (numero du moteur, transactions validees, VersionDonnees)
+_versions_memoire = weakref.WeakKeyDictionary()
+# Numeros des moteurs suivis (id() peut etre reutilise apres la fin d'un moteur)
+_numeros_moteurs = itertools.count(1)
+
+# (URL de la base, nom) -> (empreinte, objet construit pour cette version)
+_objets = {}
+# (URL de la base, nom) -> verrou de construction
+_verrous_objets = {}
+
+
+def _chemin_base():
+    """Chemin du fichier SQLite courant, None pour une base en memoire."""
+    chemin = db.engine.url.database
+    if not chemin or chemin == ':memory:':
+        return None
+    return chemin
+
+
+def _lire_version(signature):
+    """Lit la derniere ingestion, sinon derive la version de la signature du fichier."""
+    derniere = None
+    # Base construite avant la creation de la table ingestion
+    if inspect(db.engine).has_table(Ingestion.__tablename__):
+        derniere = db.session.query(
+            Ingestion.jeton, Ingestion.horodatage
+        ).order_by(Ingestion.id_ingestion.desc()).first()
+    if derniere:
+        horodatage = derniere.horodatage.replace(tzinfo=timezone.utc)
+        return VersionDonnees(derniere.jeton, horodatage)
+    mtime_ns, taille = signature
+    horodatage = datetime.fromtimestamp(mtime_ns / 1e9, tz=timezone.utc)
+    return VersionDonnees(f"f{mtime_ns:x}-{taille:x}", horodatage)
+
+
+def _nouvelle_version_memoire(numero_moteur, validations):
+    """Version d'une base en memoire apres `validations` transactions validees."""
+    return (numero_moteur, validations, VersionDonnees(
+        f"m{numero_moteur}-{validations}", datetime.now(timezone.utc).replace(microsecond=0)
+    ))
+
+
+def _version_memoire(moteur):
+    """
+    Version d'une base en memoire, incrementee a chaque COMMIT du moteur.
+
+    Le suivi commence au premier appel : les transactions anterieures sont
+    comprises dans la version initiale.
+    """
+    connue = _versions_memoire.get(moteur)
+    if connue is not None:
+        return connue[2]
+    with _verrou:
+        connue = _versions_memoire.get(moteur)
+        if connue is None:
+            connue = _versions_memoire[moteur] = _nouvelle_version_memoire(next(_numeros_moteurs), 0)
+            reference = weakref.ref(moteur)
+
+            def apres_commit(connexion):
+                suivi = reference()
+                if suivi is None:
+                    return
+                with _verrou:
+                    numero_moteur, validations, _ = _versions_memoire[suivi]
+                    _versions_memoire[suivi] = _nouvelle_version_memoire(numero_moteur, validations + 1)
+
+            event.listen(moteur, 'commit', apres_commit)
+        return connue[2]
+
+
+def version_donnees():
+    """
+    Renvoie la version courante des donnees.
+
+    Returns:
+        VersionDonnees: empreinte (str) et horodatage (datetime UTC).
+    """
+    chemin = _chemin_base()
+    if chemin is None:
+        return _version_memoire(db.engine)
+
+    try:
+        stat = os.stat(chemin)
+    except OSError:
+        # Fichier pas encore cree : pas de signature, suivi des COMMIT comme en memoire
+        return _version_memoire(db.engine)
+    signature = (stat.st_mtime_ns, stat.st_size)
+
+    with _verrou:
+        connue = _versions_connues.get(chemin)
+    if connue and connue[0] == signature:
+        return connue[1]
+
+    version = _lire_version(signature)
+    with _verrou:
+        _versions_connues[chemin] = (signature, version)
+    return version
+
+
+def empreinte_donnees():
+    """Raccourci : empreinte de la version courante des donnees."""
+    return version_donnees().empreinte
+
+
+def obtenir_par_version(nom, construire):
+    """
+    Renvoie l'objet `nom` de la version courante des donnees, construit une fois.
+
+    Un seul appel construit l'objet d'une version, meme sous requetes
+    concurrentes ; les objets de noms differents se construisent en
+    parallele (et l'un peut utiliser l'autre).
+
+    Args:
+        nom (str): Nom de l'objet, unique par module.
+        construire (callable): Fonction de l'empreinte (str) qui construit l'objet.
+
+    Returns:
+        L'objet a jour, reconstruit apres une nouvelle ingestion.
+    """
+    cle = (str(db.engine.url), nom)
+    version = empreinte_donnees()
+    connu = _objets.get(cle)
+    if connu is not None and connu[0] == version:
+        return connu[1]
+    with _verrou:
+        verrou = _verrous_objets.setdefault(cle, threading.Lock())
+    with verrou:
+        connu = _objets.get(cle)
+        if connu is None or connu[0] != version:
+            connu = _objets[cle] = (version, construire(version))
+        return connu[1]
+
+
+def oublier_objets():
+    """
+    Oublie les objets construits par obtenir_par_version.
+
+    Chaque objet est reconstruit a son prochain appel, comme apres une
+    nouvelle ingestion (mesures a froid de scripts/benchmark_routes.py).
+    """
+    with _verrou:
+        _objets.clear()
+
+
+def enregistrer_ingestion():
+    """
+    Enregistre une nouvelle ingestion ; a appeler en fin de peuplement.
+
+    Returns:
+        Ingestion: La ligne creee.
+    """
+    ingestion = Ingestion(
+        jeton=uuid.uuid4().hex,
+        horodatage=datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0),
+        nb_classements=db.session.query(Classement).count()
+    )
+    db.session.add(ingestion)
+    db.session.commit()
+    return ingestion
@@ -0,0 +1,78 @@
+"""
+Fixtures communes : application de test (TestingConfig, base SQLite en
+memoire) et petit jeu de classements.
+"""
+
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+# Le module application cree son application a l'import : pas sur univ.db
+os.environ['FLASK_CONFIG'] = 'testing'
+
+from application import create_app  # noqa: E402
+from models import db, Region, Pays, Universite, Classement  # noqa: E402
+
+
+# (nom, pays, {annee: (rang, score_global, indic_enseig, indic_qualite_rech)})
+UNIVERSITES = [
+    ("Universite de Paris", "France", {2024: (1, 90.0, 99.9, 95.0), 2025: (2, 88.0, 100.0, 94.5)}),
+    ("Sorbonne Universite", "France", {2024: (3, 70.0, 50.25, 60.0), 2025: (1, 91.0, 50.5, 61.25)}),
+    ("Universite de Lyon", "France", {2024: (4, 60.0, 50.0, 49.5), 2025: (3, 65.0, 49.75, 50.0)}),
+    ("University of Tokyo", "Japon", {2024: (2, 80.0, 49.5, 80.0), 2025: (4, 60.0, None, 79.0)}),
+    ("Kyoto University", "Japon", {2024: (5, 50.0, 0.0, 10.0), 2025: (5, None, 20.0, 30.0)}),
+    ("Universidad de Chile", "Chili", {2025: (6, 40.0, 55.0, 45.0)}),
+]
+
+# Pays -> (region, pib_hab, alphabetisation_pct, migration_nette) ; le Chili n'a pas de region
+PAYS = {
+    "France": ("Europe", 44000.0, 99.0, 0.66),
+    "Japon": ("Asie", 39000.0, 99.5, 0.0),
+    "Chili": (None, 15000.0, 96.2, 0.35),
+}
+
+
+@pytest.fixture
+def app():
+    """Application de test, schema complet (cree par create_app) sur une base en memoire vide."""
+    app = create_app('testing')
+    with app.app_context():
+        yield app
+        db.session.remove()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+def peupler():
+    """Insere UNIVERSITES dans la base courante (cles pays/region recopiees sur classement)."""
+    regions = {nom: Region(nom_region=nom) for nom in sorted({p[0] for p in PAYS.values() if p[0]})}
+    pays = {
+        nom: Pays(nom_pays=nom, region=regions.get(region), pib_hab=pib, alphabetisation_pct=alpha,
+                  migration_nette=migration)
+        for nom, (region, pib, alpha, migration) in PAYS.items()
+    }
+    db.session.add_all(list(regions.values()) + list(pays.values()))
+    db.session.flush()
+    for nom, nom_pays, annees in UNIVERSITES:
+        universite = Universite(nom_univ=nom, id_pays=pays[nom_pays].id_pays)
+        db.session.add(universite)
+        db.session.flush()
+        for annee, (rang, score, enseig, rech) in annees.items():
+            db.session.add(Classement(
+                annee=annee, rang=rang, score_global=score, indic_enseig=enseig, indic_qualite_rech=rech,
+                etud_internationaux_pct=10.0 * rang, ratio_fem_hom=f"{40 + rang} : {60 - rang}",
+                id_univ=universite.id_universite, id_pays=pays[nom_pays].id_pays,
+                id_region=pays[nom_pays].id_region
+            ))
+    db.session.commit()
+
+
+@pytest.fixture
+def donnees(app):
+    """Peuple la base en memoire avec UNIVERSITES."""
+    peupler()
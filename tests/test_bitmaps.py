@@ -0,0 +1,59 @@
+"""Index bitmap des classements (services.bitmaps)."""
+
+import numpy as np
+import pytest
+
+from models import db, Classement
+from services.bitmaps import obtenir_index_bitmaps, positions_bitmap
+
+
+SEUILS = [-5, 0, 0.5, 20, 49.5, 49.6, 49.75, 50, 50.1, 50.25, 50.3, 50.5, 99.9, 99.95, 100, 100.5]
+
+
+@pytest.fixture
+def index(donnees):
+    return obtenir_index_bitmaps()
+
+
+def test_lignes_eligibles(index):
+    # Score global et region renseignes : ni le Chili ni Kyoto 2025
+    assert index.taille == 9
+    assert sorted(index.annees) == [2024, 2025]
+    assert set(index.regions) == {'Europe', 'Asie'}
+
+
+@pytest.mark.parametrize('colonne', ['indic_enseig', 'indic_qualite_rech'])
+@pytest.mark.parametrize('seuil', SEUILS)
+def test_au_moins_egale_la_comparaison_directe(index, colonne, seuil):
+    attendu = np.flatnonzero(index.valeurs(colonne) >= seuil)
+    assert positions_bitmap(index._au_moins(colonne, seuil), index.taille).tolist() == attendu.tolist()
+
+
+def test_seuil_decimal_entre_deux_entiers(index):
+    ids = set(index.ids_classement(index._au_moins('indic_enseig', 50.25)).tolist())
+    valeurs = dict(db.session.query(Classement.id_classement, Classement.indic_enseig))
+    # 50.25 et 50.5 retenus, 50.0 et 49.75 ecartes
+    assert {valeurs[i] for i in ids} == {50.25, 50.5, 99.9, 100.0}
+
+
+def test_filtrer_comme_sql(index):
+    filtres = {'annee': 2025, 'score_enseig_min': 49.75, 'score_rech_min': 50}
+    attendu = [i for i, in db.session.query(Classement.id_classement).filter(
+        Classement.annee == 2025, Classement.score_global.isnot(None), Classement.id_region.isnot(None),
+        Classement.indic_enseig >= 49.75, Classement.indic_qualite_rech >= 50
+    ).order_by(Classement.rang)]
+    assert index.ids_classement(index.filtrer(**filtres)).tolist() == attendu
+
+
+def test_facettes_ignorent_le_filtre_de_leur_dimension(index):
+    facettes = index.facettes(annee=2025)
+    assert facettes.total == 4
+    assert dict(facettes.annees) == {2024: 5, 2025: 4}
+    assert dict(facettes.pays) == {'France': 3, 'Japon': 1}
+
+
+def test_route_universites_facettes(client, donnees):
+    texte = client.get('/universites?annee=2025&pays=France').get_data(as_text=True)
+    assert '2024 (3)' in texte and '2025 (3)' in texte
+    # Le filtre pays n'est pas applique a sa propre facette
+    assert 'France (3)' in texte and 'Japon (1)' in texte
@@ -0,0 +1,93 @@
+"""Invalidation du cache et des objets par version des donnees."""
+
+import pytest
+
+from models import db, Region, Universite
+from services.cache import cache
+from services.trigrammes import obtenir_index_trigrammes
+from services.version import empreinte_donnees
+
+
+@pytest.fixture
+def app_cache(app):
+    """Application de test avec le cache actif (TestingConfig le desactive)."""
+    app.config['CACHE_ACTIF'] = True
+    cache.init_app(app)
+    return app
+
+
+def _compter_regions(appels):
+    appels.append(1)
+    return db.session.query(Region).count()
+
+
+def test_valeur_servie_depuis_le_cache(app_cache):
+    appels = []
+    assert cache.obtenir('regions', (), lambda: _compter_regions(appels)) == 0
+    assert cache.obtenir('regions', (), lambda: _compter_regions(appels)) == 0
+    assert len(appels) == 1
+
+
+def test_recalcul_apres_changement_de_version(app_cache):
+    appels = []
+    cache.obtenir('regions', (), lambda: _compter_regions(appels))
+    version = empreinte_donnees()
+
+    db.session.add(Region(nom_region="Oceanie"))
+    db.session.commit()
+
+    assert empreinte_donnees() != version
+    assert cache.obtenir('regions', (), lambda: _compter_regions(appels)) == 1
+    assert len(appels) == 2
+
+
+def test_version_inchangee_sans_commit(app_cache):
+    version = empreinte_donnees()
+    db.session.query(Region).count()
+    db.session.rollback()
+    assert empreinte_donnees() == version
+
+
+def test_cache_inactif_recalcule(app):
+    appels = []
+    cache.obtenir('regions', (), lambda: _compter_regions(appels))
+    cache.obtenir('regions', (), lambda: _compter_regions(appels))
+    assert len(appels) == 2
+
+
+def test_objet_par_version_reconstruit(donnees):
+    index = obtenir_index_trigrammes()
+    assert obtenir_index_trigrammes() is index
+    assert not index.rechercher("Universite de Bordeaux", seuil=0.9)
+
+    db.session.add(Universite(nom_univ="Universite de Bordeaux"))
+    db.session.commit()
+
+    nouvel_index = obtenir_index_trigrammes()
+    assert nouvel_index is not index
+    assert nouvel_index.rechercher("Universite de Bordeaux", seuil=0.9)[0].nom_univ == "Universite de Bordeaux"
+
+
+def test_niveau_fichier_borne_et_purge(app, tmp_path):
+    app.config.update(CACHE_ACTIF=True, CACHE_REPERTOIRE=str(tmp_path), CACHE_FICHIER_MAX=3)
+    cache.init_app(app)
+    for i in range(5):
+        cache.obtenir('carre', (i,), lambda i=i: i * i)
+    repertoire = tmp_path / empreinte_donnees()
+    assert len(list(repertoire.glob('*.pkl'))) == 3
+
+    db.session.add(Region(nom_region="Oceanie"))
+    db.session.commit()
+    cache.obtenir('carre', (0,), lambda: 0)
+    assert [p.name for p in tmp_path.iterdir()] == [empreinte_donnees()]
+
+
+def test_fichier_illisible_supprime(app, tmp_path):
+    app.config.update(CACHE_ACTIF=True, CACHE_REPERTOIRE=str(tmp_path))
+    cache.init_app(app)
+    cache.obtenir('valeur', (), lambda: 1)
+    fichier, = (tmp_path / empreinte_donnees()).glob('*.pkl')
+    fichier.write_bytes(b'tronque')
+    # Niveau memoire seul vide : la lecture passe par le fichier
+    app.extensions['cache_resultats'].memoire.vider()
+    assert cache.obtenir('valeur', (), lambda: 2) == 2
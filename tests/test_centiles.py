@@ -0,0 +1,56 @@
+"""Centiles annuels des indicateurs (services.centiles) et leur affichage « Top x % »."""
+
+import pytest
+
+from models import db, Classement, CentileClassement
+from services.centiles import (centiles_classements, completer_centiles, construire_centiles,
+                               verifier_centiles)
+
+
+def test_construire_et_verifier(donnees):
+    assert construire_centiles() == 11
+    assert verifier_centiles() == []
+    assert completer_centiles() is False
+
+
+def test_part_des_lignes_au_moins_aussi_elevees(donnees):
+    construire_centiles()
+    # 2025, scores globaux connus : Sorbonne 91, Paris 88, Lyon 65, Tokyo 60, Chili 40 (Kyoto absent)
+    centiles = centiles_classements([4, 2, 6, 8, 11, 10])
+    assert [centiles[i].top_score_global for i in (4, 2, 6, 8, 11)] == pytest.approx([20, 40, 60, 80, 100])
+    assert centiles[10].top_score_global is None
+    # Chaque annee est classee separement
+    assert centiles_classements([1])[1].top_enseig == pytest.approx(20)
+
+
+def test_egalites_au_rang_le_plus_bas(donnees):
+    db.session.get(Classement, 6).score_global = 88.0
+    db.session.commit()
+    construire_centiles()
+    centiles = centiles_classements([2, 6])
+    # Paris et Lyon ex aequo : 3 lignes sur 5 au moins aussi elevees
+    assert centiles[2].top_score_global == centiles[6].top_score_global == pytest.approx(60)
+
+
+def test_divergence_signalee(donnees):
+    construire_centiles()
+    db.session.get(CentileClassement, 4).top_enseig = 1.0
+    db.session.commit()
+    assert verifier_centiles() == [f"centile_classement 4 : top_enseig = 1.0, attendu {60.0}"]
+
+
+def test_centiles_classements_vide(donnees):
+    assert centiles_classements([]) == {}
+
+
+@pytest.mark.parametrize('centile, texte', [
+    (None, ''), (0.5, 'Top 0.5 %'), (20.0, 'Top 20 %'), (20.000000001, 'Top 20 %'), (33.4, 'Top 34 %'),
+])
+def test_format_top(app, centile, texte):
+    assert app.jinja_env.filters['format_top'](centile) == texte
+
+
+def test_routes_affichent_le_centile(client, donnees):
+    construire_centiles()
+    assert 'Top 20 %' in client.get('/universites').get_data(as_text=True)
+    assert 'Top 20 %' in client.get('/universite/4').get_data(as_text=True)
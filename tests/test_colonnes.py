@@ -0,0 +1,56 @@
+"""Magasin en colonnes (services.colonnes) : memes resultats que les requetes SQL."""
+
+import pytest
+
+from services.colonnes import obtenir_magasin
+from services.recherche import compter_universites, page_universites
+
+
+FILTRES = [
+    {},
+    {'annee': 2025},
+    {'pays': 'France'},
+    {'score_enseig_min': 50.25},
+    {'annee': 2024, 'score_rech_min': 49.5},
+    {'nom': 'universite'},
+]
+
+
+def _cles(lignes):
+    return [(l.id_classement, l.rang, l.nom_univ, l.nom_pays, l.nom_region, l.score_global) for l in lignes]
+
+
+@pytest.mark.parametrize('filtres', FILTRES)
+def test_recherche_identique_au_sql(donnees, filtres):
+    total, page = obtenir_magasin().rechercher(3, **filtres)
+    attendu = page_universites(3, **filtres)
+    assert total == compter_universites(**filtres)
+    assert _cles(page.lignes) == _cles(attendu.lignes)
+    assert (page.suivant, page.precedent) == (attendu.suivant, attendu.precedent)
+
+
+def test_pages_par_curseur_identiques_au_sql(donnees):
+    magasin = obtenir_magasin()
+    _, page = magasin.rechercher(2)
+    cle = (page.lignes[-1].annee, page.lignes[-1].rang, page.lignes[-1].id_classement)
+    _, suivante = magasin.rechercher(2, apres=cle)
+    assert _cles(suivante.lignes) == _cles(page_universites(2, apres=cle).lignes)
+    _, precedente = magasin.rechercher(2, avant=cle)
+    assert _cles(precedente.lignes) == _cles(page_universites(2, avant=cle).lignes)
+
+
+def test_ordre_annuel_valeurs_manquantes_en_fin(donnees):
+    magasin = obtenir_magasin()
+    ordre = magasin.ordre(2025, 'indic_enseig', decroissant=True)
+    valeurs = magasin.indic_enseig[ordre].tolist()
+    assert valeurs[:5] == [100.0, 55.0, 50.5, 49.75, 20.0]
+    assert valeurs[5] != valeurs[5]  # NaN
+    croissant = magasin.indic_enseig[magasin.ordre(2025, 'indic_enseig', decroissant=False)].tolist()
+    assert croissant[:5] == [20.0, 49.75, 50.5, 55.0, 100.0]
+
+
+def test_route_universites_moteur_colonnes(app, client, donnees):
+    app.config['MOTEUR_REQUETES'] = 'colonnes'
+    reponse = client.get('/universites?annee=2025')
+    assert reponse.status_code == 200
+    assert "Sorbonne Universite" in reponse.get_data(as_text=True)
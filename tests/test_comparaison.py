@@ -0,0 +1,66 @@
+"""Comparaison de plusieurs universites (services.comparaison, /comparer et /api/comparer)."""
+
+import math
+
+import pytest
+
+from services.comparaison import INDICATEURS_COMPARAISON, comparer_universites, donnees_comparaison, lire_ids
+
+
+@pytest.mark.parametrize('texte, attendu', [
+    ('1,2,3', [1, 2, 3]), (' 3; 1 2,,3 ', [3, 1, 2]), ('', []), (None, []), ('9223372036854775807', [2 ** 63 - 1]),
+])
+def test_lire_ids(texte, attendu):
+    assert lire_ids(texte, 5) == attendu
+
+
+@pytest.mark.parametrize('texte', ['1,a', '-1', '1.5', '²', '9223372036854775808', '99999999999999999999999', '1,2,3,4,5,6'])
+def test_lire_ids_invalides(texte):
+    with pytest.raises(ValueError):
+        lire_ids(texte, 5)
+
+
+def test_comparer_universites(donnees):
+    comparaison = comparer_universites([4, 999, 1])
+    assert comparaison.annees == [2024, 2025]
+    assert [u.nom_univ for u in comparaison.universites] == ["University of Tokyo", "Universite de Paris"]
+    assert comparaison.introuvables == [999]
+    assert comparaison.valeurs.shape == (2, 2, len(INDICATEURS_COMPARAISON))
+    # Tokyo 2025 : enseignement absent
+    assert math.isnan(comparaison.valeurs[0, 1, INDICATEURS_COMPARAISON.index('indic_enseig')])
+
+
+def test_donnees_comparaison(donnees):
+    donnees_json = donnees_comparaison(comparer_universites([4, 1]))
+    tokyo = donnees_json['universites'][0]
+    assert tokyo['series']['indic_enseig'] == [49.5, None]
+    assert tokyo['series']['rang'] == [2, 4]
+    assert (tokyo['annee_recente'], tokyo['id_classement_recent'], tokyo['recent']['rang']) == (2025, 8, 4)
+
+
+def test_route_comparer(client, donnees):
+    reponse = client.get('/comparer?ids=1,2')
+    assert reponse.status_code == 200
+    texte = reponse.get_data(as_text=True)
+    assert "Universite de Paris" in texte and "Sorbonne Universite" in texte
+
+
+def test_route_api_comparer(client, donnees):
+    donnees_json = client.get('/api/comparer?ids=2,1').get_json()
+    assert [u['id_univ'] for u in donnees_json['universites']] == [2, 1]
+
+
+@pytest.mark.parametrize('ids', ['1,x', '99999999999999999999999', ','.join(str(i) for i in range(1, 30))])
+def test_routes_comparer_ids_invalides(client, donnees, ids):
+    assert client.get(f'/comparer?ids={ids}').status_code == 400
+    reponse = client.get(f'/api/comparer?ids={ids}')
+    assert reponse.status_code == 400 and 'erreur' in reponse.get_json()
+
+
+@pytest.mark.parametrize('url', [
+    '/api/charts/historique?id_univ=99999999999999999999999',
+    '/api/charts/historique?id_univ=-9223372036854775809',
+    '/api/charts/accueil?annee=99999999999999999999999',
+])
+def test_route_graphiques_entier_hors_bornes(client, donnees, url):
+    assert client.get(url).status_code == 400
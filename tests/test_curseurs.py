@@ -0,0 +1,79 @@
+"""Curseurs opaques de pagination (services.curseurs)."""
+
+import base64
+
+import pytest
+
+from services.curseurs import curseurs_page, decoder_curseur, encoder_curseur
+
+
+def test_aller_retour():
+    jeton = encoder_curseur(2025, 17, 1234)
+    assert decoder_curseur(jeton) == (2025, 17, 1234)
+
+
+def test_bornes_sqlite():
+    jeton = encoder_curseur(2025, -2 ** 63, 2 ** 63 - 1)
+    assert decoder_curseur(jeton) == (2025, -2 ** 63, 2 ** 63 - 1)
+
+
+def test_jeton_utilisable_dans_une_url():
+    jeton = encoder_curseur(2016, 1, 987654321)
+    assert '=' not in jeton and '+' not in jeton and '/' not in jeton
+
+
+def _jeton(brut):
+    return base64.urlsafe_b64encode(brut.encode('ascii')).decode('ascii').rstrip('=')
+
+
+@pytest.mark.parametrize('jeton', [
+    None,
+    '',
+    '!!!',
+    'a',
+    _jeton('pas du json'),
+    _jeton('[2025, 1]'),
+    _jeton('[2025, 1, 2, 3]'),
+    _jeton('{"annee": 2025}'),
+    _jeton('[2025, "x", 3]'),
+    _jeton('[2025, null, 3]'),
+    _jeton('[1e400, 1, 2]'),
+    _jeton('[2025.0, 1, 2]'),
+    _jeton('[true, 1, 2]'),
+    _jeton('[2025, 1, 99999999999999999999999]'),
+    _jeton('[2025, -9223372036854775809, 2]'),
+    _jeton('"abc"'),
+    _jeton('[' * 100000),
+])
+def test_jeton_invalide(jeton):
+    assert decoder_curseur(jeton) is None
+
+
+def test_curseurs_page():
+    cles = [(2025, 1, 10), (2025, 2, 11), (2025, 3, 12)]
+    suivant, precedent = curseurs_page(cles, plus_avant=True, plus_apres=True)
+    assert decoder_curseur(suivant) == (2025, 3, 12)
+    assert decoder_curseur(precedent) == (2025, 1, 10)
+
+
+def test_curseurs_bouts_de_liste():
+    cles = [(2025, 1, 10), (2025, 2, 11)]
+    assert curseurs_page(cles, plus_avant=False, plus_apres=False) == (None, None)
+    assert curseurs_page([], plus_avant=True, plus_apres=True) == (None, None)
+
+
+@pytest.mark.parametrize('parametre', ['apres', 'avant'])
+@pytest.mark.parametrize('jeton', [_jeton('[1e400, 1, 2]'), _jeton('[2025, 1, 99999999999999999999999]'), '%%%'])
+def test_route_curseur_invalide_premiere_page(client, donnees, parametre, jeton):
+    reponse = client.get(f'/universites?{parametre}={jeton}')
+    assert reponse.status_code == 200
+    assert "Sorbonne Universite" in reponse.get_data(as_text=True)
+
+
+def test_route_pages_par_curseur(client, donnees):
+    from services.recherche import page_universites
+
+    page = page_universites(2)
+    suivante = client.get(f'/universites?apres={page.suivant}')
+    assert suivante.status_code == 200
+    assert "Universite de Lyon" in suivante.get_data(as_text=True)
@@ -0,0 +1,62 @@
+"""Export en flux de la liste filtree (services.export, /universites/export.<format>)."""
+
+import csv
+import io
+import json
+
+import pytest
+
+from services import export
+from services.export import COLONNES_EXPORT, exporter_csv, exporter_ndjson
+from services.recherche import compter_universites, normaliser_filtres
+
+
+def _filtres(**kwargs):
+    return normaliser_filtres(**kwargs)
+
+
+def test_csv_en_tete_et_lignes(donnees):
+    lignes = list(csv.reader(io.StringIO(''.join(exporter_csv(_filtres(annee=2024))))))
+    assert lignes[0] == [nom for nom, _ in COLONNES_EXPORT]
+    assert [ligne[1] for ligne in lignes[1:]] == ['1', '2', '3', '4', '5']
+    assert lignes[1][2:5] == ['Universite de Paris', 'France', 'Europe']
+
+
+def test_tout_le_resultat_par_lots(donnees, monkeypatch):
+    monkeypatch.setattr(export, 'TAILLE_LOT', 2)
+    filtres = _filtres()
+    morceaux = list(exporter_ndjson(filtres))
+    objets = [json.loads(ligne) for ligne in ''.join(morceaux).splitlines()]
+    # Un morceau par lot, et toutes les lignes (pas seulement la premiere page)
+    assert len(morceaux) == 5
+    assert len(objets) == compter_universites(**filtres) == 9
+    assert set(objets[0]) == {nom for nom, _ in COLONNES_EXPORT}
+
+
+def test_route_csv(client, donnees):
+    reponse = client.get('/universites/export.csv')
+    assert reponse.status_code == 200
+    assert reponse.mimetype == 'text/csv'
+    assert reponse.headers['Content-Disposition'] == 'attachment; filename="universites_2025.csv"'
+    lignes = reponse.get_data(as_text=True).splitlines()
+    # Annee la plus recente par defaut, comme la page /universites
+    assert len(lignes) == 5
+    assert all(ligne.startswith('2025,') for ligne in lignes[1:])
+
+
+def test_route_ndjson_filtree(client, donnees):
+    reponse = client.get('/universites/export.ndjson?pays=France&annee=2024&score_enseig_min=50.1')
+    assert reponse.mimetype == 'application/x-ndjson'
+    objets = [json.loads(ligne) for ligne in reponse.get_data(as_text=True).splitlines()]
+    assert [o['universite'] for o in objets] == ['Universite de Paris', 'Sorbonne Universite']
+
+
+def test_route_format_inconnu(client, donnees):
+    assert client.get('/universites/export.xml').status_code == 404
+
+
+@pytest.mark.parametrize('parametres', ['annee=abc', 'pays=Atlantide', 'score_rech_min=x', 'annee=99999999999999999999'])
+def test_route_parametres_invalides_ignores(client, donnees, parametres):
+    reponse = client.get(f'/universites/export.csv?{parametres}')
+    assert reponse.status_code == 200
+    assert len(reponse.get_data(as_text=True).splitlines()) == 10
@@ -0,0 +1,55 @@
+"""Palmares annuels top-k / bottom-k (services.palmares) et graphiques de /universites."""
+
+import pytest
+
+from models import db, Classement
+from services.palmares import INDICATEURS, obtenir_palmares
+
+
+def _valeurs(entrees):
+    return [e.valeur for e in entrees]
+
+
+def test_premiers_et_derniers(donnees):
+    palmares = obtenir_palmares()
+    assert palmares.annees == [2025, 2024]
+    assert _valeurs(palmares.premiers(2025, 'indic_enseig', 3)) == [100.0, 55.0, 50.5]
+    # Valeur manquante (Tokyo 2025) exclue
+    assert _valeurs(palmares.derniers(2025, 'indic_enseig', 10)) == [20.0, 49.75, 50.5, 55.0, 100.0]
+    assert palmares.premiers(1990, 'indic_enseig', 3) == []
+
+
+@pytest.mark.parametrize('indicateur', INDICATEURS)
+@pytest.mark.parametrize('k', [1, 3, 10])
+def test_identique_au_tri_sql(donnees, indicateur, k):
+    colonne = getattr(Classement, indicateur)
+    attendu = [i for i, in db.session.query(Classement.id_classement).filter(
+        Classement.annee == 2024, colonne.isnot(None)
+    ).order_by(colonne.desc(), Classement.rang, Classement.id_classement).limit(k)]
+    assert [e.id_classement for e in obtenir_palmares().premiers(2024, indicateur, k)] == attendu
+
+
+def test_route_graphiques_universites(client, donnees):
+    graphiques = client.get('/api/charts/universites?annee=2025&k=2').get_json()
+    assert set(graphiques) == {'top_teaching', 'bottom_teaching', 'top_research', 'bottom_research'}
+    assert graphiques['top_teaching']['labels'] == ["Universite de Paris", "Universidad de Chile"]
+    assert graphiques['bottom_research']['data'] == [30.0, 45.0]
+
+
+@pytest.mark.parametrize('k, attendu', [('', 4), ('0', 1), ('3', 3), ('999', 4), ('abc', 4)])
+def test_route_k_borne(app, client, donnees, k, attendu):
+    # PALMARES_K (5) est lui aussi ramene a PALMARES_K_MAX
+    app.config['PALMARES_K_MAX'] = 4
+    graphiques = client.get(f'/api/charts/universites?annee=2025&k={k}').get_json()
+    assert len(graphiques['bottom_teaching']['labels']) == attendu
+
+
+def test_route_graphiques_palmares(client, donnees):
+    graphiques = client.get('/api/charts/palmares?annee=2024&k=2').get_json()
+    assert set(graphiques) == set(INDICATEURS)
+    assert graphiques['score_global']['premiers']['labels'] == ["Universite de Paris", "University of Tokyo"]
+
+
+def test_page_universites_canvas(client, donnees):
+    texte = client.get('/universites').get_data(as_text=True)
+    assert 'id="chartTopTeaching"' in texte and 'graphiques.top_teaching' in texte
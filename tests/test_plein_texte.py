@@ -0,0 +1,68 @@
+"""Recherche plein texte des noms (services.plein_texte, FTS5)."""
+
+import pytest
+
+from models import db, Pays, Universite
+from services.plein_texte import (ids_universites_texte, reconstruire_index_texte, requete_texte,
+                                  suggerer_universites, verifier_index_texte)
+
+
+def _noms(saisie):
+    ids = db.session.execute(ids_universites_texte(saisie)).scalars().all()
+    return sorted(db.session.get(Universite, i).nom_univ for i in ids)
+
+
+def test_requete_texte_mots_en_prefixes():
+    assert requete_texte("Sorb  univ-") == '"Sorb"* "univ"*'
+    assert requete_texte(' " * - ') is None
+    assert requete_texte(None) is None
+
+
+def test_recherche_par_prefixes_sans_accents(donnees):
+    assert _noms("sorb") == ["Sorbonne Universite"]
+    assert _noms("univ tok") == ["University of Tokyo"]
+    # Nom du pays indexe, accents ignores
+    assert _noms("japón") == ["Kyoto University", "University of Tokyo"]
+    assert _noms("sorbonne kyoto") == []
+
+
+def test_declencheurs_tiennent_l_index_a_jour(donnees):
+    assert verifier_index_texte() == []
+    universite = Universite.query.filter_by(nom_univ="Kyoto University").one()
+    universite.nom_univ = "Universite de Kyoto"
+    Pays.query.filter_by(nom_pays="France").one().nom_pays = "Republique francaise"
+    db.session.add(Universite(nom_univ="Universite de Bordeaux", id_pays=universite.id_pays))
+    db.session.commit()
+
+    assert verifier_index_texte() == []
+    assert _noms("kyoto") == ["Universite de Kyoto"]
+    assert len(_noms("republique")) == 3
+    assert "Universite de Bordeaux" in _noms("bordeaux")
+
+
+def test_reconstruction(donnees):
+    assert reconstruire_index_texte() == 6
+    assert verifier_index_texte() == []
+
+
+def test_suggestions_par_pertinence(donnees):
+    suggestions = suggerer_universites("univ", limite=2)
+    assert len(suggestions) == 2
+    assert set(suggestions[0]) == {'id_universite', 'nom_univ', 'nom_pays'}
+    assert suggerer_universites("") == []
+
+
+@pytest.mark.parametrize('requete, attendu', [
+    ('q=sorb', ["Sorbonne Universite"]),
+    ('q=%22%29%28*&limite=abc', []),
+    ('q=', []),
+])
+def test_route_suggestions(client, donnees, requete, attendu):
+    reponse = client.get(f'/api/universites/suggestions?{requete}')
+    assert reponse.status_code == 200
+    assert [s['nom_univ'] for s in reponse.get_json()][:len(attendu)] == attendu
+
+
+def test_route_liste_par_nom(client, donnees):
+    texte = client.get('/universites?nom=sorb').get_data(as_text=True)
+    assert "Sorbonne Universite" in texte and "Kyoto University" not in texte
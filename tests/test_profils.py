@@ -0,0 +1,75 @@
+"""Profils memorises des universites (services.profils) et routes qui les lisent."""
+
+import pytest
+from sqlalchemy import event
+
+from models import db, Classement
+from services.profils import profil_classement, profil_universite, profils_universites
+
+
+def test_profil_universite(donnees):
+    profil = profil_universite(1)
+    assert profil.universite.nom_univ == "Universite de Paris"
+    assert (profil.pays.nom_pays, profil.region.nom_region) == ("France", "Europe")
+    assert [c.annee for c in profil.classements] == [2024, 2025]
+    assert profil.historique == {
+        'labels': [2024, 2025], 'data_enseig': [99.9, 100.0], 'data_rech': [95.0, 94.5], 'data_global': [90.0, 88.0],
+    }
+
+
+def test_profil_absent(donnees):
+    # Universite inconnue, ou sans region (Chili) : pas de profil
+    assert profil_universite(999) is None
+    assert profil_universite(6) is None
+    assert profil_classement(999) is None
+
+
+def test_profil_classement(donnees):
+    profil, ligne = profil_classement(8)
+    assert profil.universite.nom_univ == "University of Tokyo"
+    assert (ligne.annee, ligne.rang, ligne.indic_enseig) == (2025, 4, None)
+
+
+def test_profils_universites_une_requete(app, donnees):
+    requetes = []
+
+    def compter(*args):
+        requetes.append(args[2])
+
+    event.listen(db.engine, 'before_cursor_execute', compter)
+    try:
+        profils = profils_universites([1, 4, 5, 999])
+        assert sorted(profils) == [1, 4, 5]
+        assert len(requetes) == 1
+        # Memorises : ni les profils ni les lignes deja vues ne relisent la base
+        assert profil_universite(4) is profils[4]
+        assert profil_classement(9)[0] is profils[5]
+        assert len(requetes) == 1
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', compter)
+
+
+def test_profils_relus_apres_modification(donnees):
+    assert profil_universite(1).classements[0].rang == 1
+    db.session.get(Classement, 1).rang = 7
+    db.session.commit()
+    assert profil_universite(1).classements[0].rang == 7
+
+
+def test_route_fiche(client, donnees):
+    reponse = client.get('/universite/3')
+    assert reponse.status_code == 200
+    assert "Sorbonne Universite" in reponse.get_data(as_text=True)
+
+
+@pytest.mark.parametrize('id_classement', [999, 11])
+def test_route_fiche_absente(client, donnees, id_classement):
+    assert client.get(f'/universite/{id_classement}').status_code == 404
+
+
+def test_route_historique(client, donnees):
+    assert client.get('/api/charts/historique?id_univ=2').get_json() == {
+        'labels': [2024, 2025], 'data_enseig': [50.25, 50.5], 'data_rech': [60.0, 61.25], 'data_global': [70.0, 91.0],
+    }
+    assert client.get('/api/charts/historique?id_univ=999').get_json()['labels'] == []
+    assert client.get('/api/charts/historique').status_code == 400
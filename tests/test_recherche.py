@@ -0,0 +1,67 @@
+"""Recherche de la liste des universites (services.recherche) et route /universites."""
+
+import pytest
+
+from models import db, Classement
+from services.cache import cache
+from services.recherche import normaliser_filtres, rechercher_ids
+
+
+def test_normaliser_filtres_forme_canonique():
+    assert normaliser_filtres(annee='2025', pays=' France ', score_enseig_min='50.25', nom='  la   sorbonne ') == {
+        'annee': 2025, 'pays': 'France', 'score_enseig_min': 50.25, 'score_rech_min': None, 'nom': 'la sorbonne',
+    }
+    assert normaliser_filtres(annee='', pays='', score_rech_min='') == normaliser_filtres()
+
+
+@pytest.mark.parametrize('valeur', ['abc', 'nan', 'inf', '1e400', '99999999999999999999999'])
+def test_normaliser_filtres_valeurs_invalides(valeur):
+    filtres = normaliser_filtres(annee=valeur, score_enseig_min=valeur, score_rech_min=valeur)
+    if valeur == '99999999999999999999999':
+        assert filtres['annee'] is None
+    else:
+        assert filtres == normaliser_filtres()
+
+
+def test_recherche_memorisee_par_filtres_normalises(app, donnees):
+    app.config['CACHE_ACTIF'] = True
+    cache.init_app(app)
+    premier = rechercher_ids(**normaliser_filtres(annee='2025', pays='France '))
+    assert premier.total == 3
+    assert rechercher_ids(**normaliser_filtres(annee=2025, pays='France')) is premier
+
+    db.session.delete(Classement.query.filter_by(annee=2025, rang=3).one())
+    db.session.commit()
+    assert rechercher_ids(**normaliser_filtres(annee=2025, pays='France')).total == 2
+
+
+@pytest.mark.parametrize('requete', [
+    'annee=abc',
+    'annee=1900',
+    'annee=99999999999999999999999',
+    'pays=Atlantide',
+    'score_enseig_min=abc',
+    'score_enseig_min=nan',
+    'score_rech_min=150',
+    'score_rech_min=1e400',
+    'tri=rang;drop&ordre=x',
+    'page=abc',
+])
+@pytest.mark.parametrize('route', ['/universites', '/universites/export.csv'])
+def test_parametres_invalides_ignores(client, donnees, route, requete):
+    reponse = client.get(f'{route}?{requete}')
+    assert reponse.status_code == 200
+
+
+def test_filtres_valides_appliques(client, donnees):
+    texte = client.get('/universites?annee=2024&pays=Japon&score_rech_min=50').get_data(as_text=True)
+    assert "University of Tokyo" in texte
+    assert "Kyoto University" not in texte and "Sorbonne" not in texte
+
+
+def test_recherche_par_formulaire(app, client, donnees):
+    app.config['WTF_CSRF_ENABLED'] = False
+    reponse = client.post('/universites', data={'annee': 'abc', 'pays': 'France', 'score_enseig_min': '50.3'})
+    assert reponse.status_code == 200
+    texte = reponse.get_data(as_text=True)
+    assert "Universite de Paris" in texte and "Universite de Lyon" not in texte
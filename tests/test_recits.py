@@ -0,0 +1,49 @@
+"""Recits des fiches, generes en bloc (services.recits)."""
+
+from models import db, Classement, RecitClassement
+from services.recits import calculer_recits, completer_recits, construire_recits, verifier_recits
+
+
+def test_construire_et_verifier(donnees):
+    assert construire_recits() == 11
+    assert verifier_recits() == []
+    # Sans effet sur une table deja remplie
+    assert completer_recits() is False
+
+
+def test_completer_base_vide(app):
+    assert completer_recits() is False
+    assert db.session.query(RecitClassement).count() == 0
+
+
+def test_divergences_signalees(donnees):
+    construire_recits()
+    db.session.get(RecitClassement, 1).texte = 'perime'
+    db.session.delete(db.session.get(RecitClassement, 2))
+    db.session.commit()
+    anomalies = verifier_recits()
+    assert len(anomalies) == 2
+    assert any('manquant' in a for a in anomalies) and any('perime' in a for a in anomalies)
+
+
+def test_recit_long_et_court(donnees):
+    recits = calculer_recits()
+    # Paris : deux scores globaux, en baisse de 2 points
+    assert "#2</strong>" in recits[2] and "France" in recits[2]
+    # Chili : une seule annee
+    assert recits[11].startswith("Seulement un ou zéro point") and "2025" in recits[11]
+
+
+def test_recit_suit_les_classements(donnees):
+    construire_recits()
+    db.session.get(Classement, 11).score_global = 42.0
+    db.session.commit()
+    assert verifier_recits() != []
+    construire_recits()
+    assert "42.0" in db.session.get(RecitClassement, 11).texte
+
+
+def test_route_fiche_affiche_le_recit(client, donnees):
+    construire_recits()
+    texte = client.get('/universite/2').get_data(as_text=True)
+    assert db.session.get(RecitClassement, 2).texte in texte
@@ -0,0 +1,38 @@
+"""Tables de synthese (services.resume) et page Statistiques."""
+
+from models import db, Classement, ResumeAnnee
+from services.resume import construire_resumes, verifier_resumes
+from services.statistiques import calculer_statistiques
+
+
+def test_synthese_coherente_apres_construction(donnees):
+    comptes = construire_resumes()
+    assert comptes['resume_annee'] == 2
+    assert verifier_resumes() == []
+    assert db.session.get(ResumeAnnee, 2025).nb_classements == 6
+
+
+def test_divergence_signalee(donnees):
+    construire_resumes()
+    classement = Classement.query.filter_by(annee=2025, rang=1).one()
+    classement.indic_enseig = 10.0
+    db.session.commit()
+
+    anomalies = verifier_resumes()
+    assert anomalies and all('2025' in a for a in anomalies)
+    construire_resumes()
+    assert verifier_resumes() == []
+
+
+def test_statistiques_identiques_depuis_les_syntheses(donnees):
+    depuis_base = calculer_statistiques()
+    construire_resumes()
+    assert calculer_statistiques() == depuis_base
+
+
+def test_route_statistiques(client, donnees):
+    construire_resumes()
+    assert client.get('/statistiques').status_code == 200
+    reponse = client.get('/api/charts/statistiques')
+    assert reponse.status_code == 200
+    assert set(reponse.get_json()) == {'intern', 'pib', 'alpha', 'ratio', 'region'}
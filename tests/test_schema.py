@@ -0,0 +1,69 @@
+"""Controle du schema au demarrage et mise a niveau d'une base anterieure (services.schema)."""
+
+import os
+import sqlite3
+
+import pytest
+
+from application import create_app
+from config import TestingConfig
+from conftest import peupler
+from models import db, ResumeAnnee
+from services import schema
+from services.schema import verifier_schema
+from services.version import version_donnees
+
+# Tables absentes d'une base construite par une version anterieure de populate_db.py
+TABLES_RECENTES = ('ingestion', 'resume_annee', 'resume_annee_pays', 'resume_annee_region', 'resume_tranche',
+                   'recit_classement', 'centile_classement', 'universite_fts')
+
+
+@pytest.fixture
+def chemin(tmp_path, monkeypatch):
+    """Fichier SQLite peuple, puis ramene au schema d'une base anterieure."""
+    chemin = tmp_path / 'univ.db'
+    monkeypatch.setattr(TestingConfig, 'SQLALCHEMY_DATABASE_URI', f'sqlite:///{chemin}')
+    app = create_app('testing')
+    with app.app_context():
+        peupler()
+        db.engine.dispose()
+    connexion = sqlite3.connect(chemin)
+    for nom, in connexion.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'").fetchall():
+        connexion.execute(f'DROP TRIGGER "{nom}"')
+    for table in TABLES_RECENTES:
+        connexion.execute(f'DROP TABLE "{table}"')
+    connexion.commit()
+    connexion.close()
+    return chemin
+
+
+def test_version_sans_table_ingestion(chemin):
+    app = create_app('testing')
+    with app.app_context():
+        db.session.execute(db.text('DROP TABLE ingestion'))
+        db.session.commit()
+        # Repli sur la signature du fichier
+        assert version_donnees().empreinte.startswith('f')
+
+
+def test_base_anterieure_mise_a_niveau_au_demarrage(chemin):
+    app = create_app('testing')
+    with app.app_context():
+        assert verifier_schema() == []
+        assert db.session.query(ResumeAnnee).count() == 2
+    client = app.test_client()
+    for url in ('/?annee=2024', '/universites', '/universite/1', '/statistiques', '/api/charts/statistiques'):
+        assert client.get(url).status_code == 200, url
+
+
+def test_base_complete_non_modifiee(chemin):
+    create_app('testing')
+    signature = os.stat(chemin).st_mtime_ns
+    create_app('testing')
+    assert os.stat(chemin).st_mtime_ns == signature
+
+
+def test_base_incomplete_apres_mise_a_niveau(chemin, monkeypatch):
+    monkeypatch.setattr(schema, 'mettre_a_niveau_base', lambda: [])
+    with pytest.raises(RuntimeError, match='table ingestion'):
+        create_app('testing')
@@ -0,0 +1,74 @@
+"""Universites similaires, plus proches voisins par profil d'indicateurs (services.similaires)."""
+
+import numpy as np
+import pytest
+
+from services import similaires
+from services.colonnes import obtenir_magasin
+from services.similaires import (DIMENSIONS, obtenir_index_similaires, plus_proches_voisins,
+                                 profils_centres_reduits)
+
+
+def _voisins_directs(profils, ids, k):
+    """Tri complet des distances de chaque ligne (distance, puis identifiant)."""
+    resultat = []
+    for i in range(len(profils)):
+        distances = np.sqrt(((profils - profils[i]) ** 2).sum(axis=1))
+        autres = [j for j in range(len(profils)) if j != i]
+        resultat.append(sorted(autres, key=lambda j: (round(distances[j], 9), ids[j]))[:k])
+    return resultat
+
+
+@pytest.mark.parametrize('k', [1, 5, 29, 40])
+def test_voisins_par_blocs_identiques_au_tri_complet(monkeypatch, k):
+    monkeypatch.setattr(similaires, 'TAILLE_BLOC', 7)
+    generateur = np.random.default_rng(3)
+    # Valeurs arrondies : egalites de distance departagees par l'identifiant
+    profils = generateur.integers(0, 4, size=(30, 3)).astype(float)
+    ids = generateur.permutation(100)[:30]
+    indices, distances = plus_proches_voisins(profils, ids, k)
+    assert indices.shape == distances.shape == (30, min(k, 29))
+    assert indices.tolist() == _voisins_directs(profils, ids, k)
+    assert np.all(np.diff(distances, axis=1) >= 0)
+
+
+def test_une_seule_ligne():
+    indices, distances = plus_proches_voisins(np.zeros((1, 3)), np.array([1]), 5)
+    assert indices.shape == distances.shape == (1, 0)
+
+
+def test_profils_centres_reduits():
+    valeurs = np.array([[1.0, 5.0, np.nan], [3.0, 5.0, np.nan], [np.nan, 5.0, np.nan]])
+    profils = profils_centres_reduits(valeurs)
+    # Valeur manquante a la moyenne (0), colonne constante ou absente sans effet
+    assert profils.tolist() == [[-1.0, 0.0, 0.0], [1.0, 0.0, 0.0], [0.0, 0.0, 0.0]]
+
+
+def test_similaires_meme_annee(donnees):
+    magasin = obtenir_magasin()
+    voisins = obtenir_index_similaires().similaires(2, k=10)
+    # Paris 2025 : les cinq autres lignes de 2025, du plus proche au plus lointain
+    assert sorted(v.id_classement for v in voisins) == [4, 6, 8, 10, 11]
+    assert [v.distance for v in voisins] == sorted(v.distance for v in voisins)
+
+    positions = magasin.lignes_de_l_annee(2025)
+    profils = profils_centres_reduits(np.column_stack([getattr(magasin, d) for d in DIMENSIONS])[positions])
+    ids = magasin.id_classement[positions]
+    attendu = _voisins_directs(profils, ids, 10)[int(np.flatnonzero(ids == 2)[0])]
+    assert [v.id_classement for v in voisins] == ids[attendu].tolist()
+
+    kyoto = next(v for v in voisins if v.id_classement == 10)
+    assert (kyoto.nom_univ, kyoto.nom_pays, kyoto.score_global) == ("Kyoto University", "Japon", None)
+
+
+def test_similaires_k_et_ligne_inconnue(donnees):
+    index = obtenir_index_similaires()
+    assert len(index.similaires(1, k=2)) == 2
+    assert index.similaires(999) == []
+
+
+def test_route_fiche_similaires(client, donnees):
+    texte = client.get('/universite/1').get_data(as_text=True)
+    assert 'Universités au Profil Similaire (2024)' in texte
+    assert 'University of Tokyo' in texte
+    assert 'ids=1,' in texte
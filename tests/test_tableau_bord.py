@@ -0,0 +1,109 @@
+"""KPI de la page d'accueil (services.tableau_bord) : memes valeurs que les requetes d'origine."""
+
+import pytest
+
+from models import db, Region, Pays, Universite, Classement
+from services.resume import construire_resumes
+from services.tableau_bord import calculer_repartitions, calculer_tableau_bord
+
+
+def _moyenne(colonne, annee, decimales):
+    valeur = db.session.query(db.func.avg(colonne)).filter(Classement.annee == annee).scalar()
+    return round(valeur, decimales) if valeur else 0
+
+
+def _par_pays(agregat, annee):
+    return db.session.query(Pays.nom_pays, agregat.label('v')).select_from(Pays).join(
+        Universite, Pays.id_pays == Universite.id_pays
+    ).join(
+        Classement, Universite.id_universite == Classement.id_univ
+    ).filter(Classement.annee == annee).group_by(Pays.nom_pays).order_by(db.desc('v'))
+
+
+def _reference(annee):
+    """Une requete par indicateur, comme la route index() avant le calcul groupe."""
+    par_region = db.session.query(
+        Region.nom_region, db.func.count(Classement.id_classement).label('nb')
+    ).select_from(Region).join(Pays, Region.id_region == Pays.id_region).join(
+        Universite, Pays.id_pays == Universite.id_pays
+    ).join(
+        Classement, Universite.id_universite == Classement.id_univ
+    ).filter(Classement.annee == annee).group_by(Region.nom_region)
+    nb_pays = db.session.query(db.func.count(db.distinct(Pays.id_pays))).join(Universite).join(
+        Classement
+    ).filter(Classement.annee == annee).scalar()
+    pib = db.session.query(db.func.avg(Pays.pib_hab)).scalar()
+    alpha = db.session.query(db.func.avg(Pays.alphabetisation_pct)).scalar()
+    migration = db.session.query(db.func.avg(Pays.migration_nette)).scalar()
+    top_pays = _par_pays(db.func.count(Classement.id_classement), annee).first()
+    top_region = par_region.order_by(db.desc('nb')).first()
+    return {
+        'annees': [a for a, in db.session.query(Classement.annee).distinct().order_by(Classement.annee.desc())],
+        'nb_pays': nb_pays,
+        'pib_moyen': round(pib, 0), 'alpha_moyen': round(alpha, 1), 'migration_moy': round(migration, 2),
+        'pays_top_univ': top_pays[0], 'pays_top_univ_nb': top_pays[1],
+        'region_top_univ': top_region[0], 'region_top_univ_nb': top_region[1],
+        'nb_universites': Classement.query.filter_by(annee=annee).count(),
+        'nb_regions': Region.query.count(),
+        'score_moyen': _moyenne(Classement.score_global, annee, 2),
+        'enseig_moyen': _moyenne(Classement.indic_enseig, annee, 2),
+        'rech_moyen': _moyenne(Classement.indic_qualite_rech, annee, 2),
+        'ratio_fh_moyen': _moyenne(Classement.ratio_fem_hom, annee, 2),
+        'etud_inter_moyen': _moyenne(Classement.etud_internationaux_pct, annee, 1),
+        'top_pays_enseig': [tuple(r) for r in _par_pays(db.func.avg(Classement.indic_enseig), annee).limit(5)],
+        'top_pays_rech': [tuple(r) for r in _par_pays(db.func.avg(Classement.indic_qualite_rech), annee).limit(5)],
+        'top_pays_nb_univ': [tuple(r) for r in _par_pays(db.func.count(Classement.id_classement), annee).limit(5)],
+        'repartition_region': sorted(tuple(r) for r in par_region),
+        'top_10': [c.id_classement for c in Classement.query.filter_by(annee=annee).order_by(
+            Classement.rang).limit(10)],
+    }
+
+
+def _approx(valeur):
+    if isinstance(valeur, list):
+        return [_approx(v) for v in valeur]
+    if isinstance(valeur, tuple):
+        return tuple(_approx(v) for v in valeur)
+    return pytest.approx(valeur) if isinstance(valeur, float) else valeur
+
+
+@pytest.fixture(params=['sql', 'resumes', 'colonnes'])
+def moteur(request, app, donnees):
+    """Les trois sources des agregats : requetes groupees, tables de synthese, magasin en colonnes."""
+    if request.param == 'resumes':
+        construire_resumes()
+    elif request.param == 'colonnes':
+        app.config['MOTEUR_REQUETES'] = 'colonnes'
+    return request.param
+
+
+@pytest.mark.parametrize('annee', [2024, 2025])
+def test_meme_resultat_que_les_requetes_par_indicateur(moteur, annee):
+    attendu = _reference(annee)
+    kpi = calculer_tableau_bord(annee)
+    obtenu = {cle: getattr(kpi, cle) for cle in attendu}
+    obtenu['top_10'] = [c.id_classement for c in kpi.top_10]
+    assert obtenu == {cle: _approx(v) for cle, v in attendu.items()}
+
+
+def test_annee_la_plus_recente_par_defaut(moteur):
+    assert calculer_tableau_bord().annee == 2025
+
+
+def test_repartitions_seules_identiques(moteur):
+    kpi = calculer_tableau_bord(2025)
+    repartitions = calculer_repartitions(2025)
+    assert repartitions.data_top_pays_enseig == kpi.data_top_pays_enseig
+    assert repartitions.data_top_pays_rech == kpi.data_top_pays_rech
+    assert repartitions.data_repartition_region == kpi.data_repartition_region
+
+
+def test_base_vide(app):
+    kpi = calculer_tableau_bord()
+    assert kpi.nb_universites == 0 and kpi.top_10 == [] and kpi.pays_top_univ == "N/A"
+
+
+def test_route_accueil(client, donnees):
+    reponse = client.get('/?annee=2024')
+    assert reponse.status_code == 200
+    assert "Universite de Paris" in reponse.get_data(as_text=True)
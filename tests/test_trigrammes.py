@@ -0,0 +1,77 @@
+"""Correspondance approchee des noms (services.trigrammes)."""
+
+from services.trigrammes import IndexTrigrammes, normaliser_nom
+
+
+UNIVERSITES = [
+    (1, "Harvard University", "Etats-Unis"),
+    (2, "Stanford University", "Etats-Unis"),
+    (3, "University of York", "Royaume-Uni"),
+    (4, "York University", "Canada"),
+    (5, "Université Paris-Saclay", "France"),
+    (6, "Universite Paris Saclay", "France"),
+    (7, "Massachusetts Institute of Technology", "Etats-Unis"),
+]
+
+
+def test_normaliser_nom_sans_accents_ni_ponctuation():
+    assert normaliser_nom("Université Paris-Saclay") == normaliser_nom("universite paris saclay")
+
+
+def test_rechercher_faute_de_frappe():
+    resultats = IndexTrigrammes(UNIVERSITES).rechercher("harvrd")
+    assert resultats[0].id_universite == 1
+    assert resultats[0].nom_pays == "Etats-Unis"
+    assert 0 < resultats[0].score <= 1
+
+
+def test_rechercher_scores_decroissants_et_limite():
+    resultats = IndexTrigrammes(UNIVERSITES).rechercher("university", limite=3, seuil=0.1)
+    assert len(resultats) == 3
+    scores = [r.score for r in resultats]
+    assert scores == sorted(scores, reverse=True)
+
+
+def test_rechercher_seuil():
+    index = IndexTrigrammes(UNIVERSITES)
+    assert index.rechercher("zzzz") == []
+    assert index.rechercher("") == []
+    assert all(r.score >= 0.9 for r in index.rechercher("stanford", seuil=0.9))
+
+
+def test_doublons_meme_pays():
+    paires = IndexTrigrammes(UNIVERSITES).doublons()
+    assert [(a.id_universite, b.id_universite) for a, b, _ in paires] == [(5, 6)]
+    assert paires[0][2] == 1.0
+
+
+def test_doublons_tous_pays():
+    paires = IndexTrigrammes(UNIVERSITES).doublons(seuil=0.8, meme_pays=False)
+    ids = {(a.id_universite, b.id_universite) for a, b, _ in paires}
+    # Memes mots dans un autre ordre : rapproches seulement hors contrainte de pays
+    assert {(3, 4), (5, 6)} <= ids
+    assert all(s >= 0.8 for _, _, s in paires)
+
+
+def test_index_vide():
+    index = IndexTrigrammes([])
+    assert index.rechercher("harvard") == []
+    assert index.doublons() == []
+
+
+def test_index_depuis_base(donnees):
+    index = IndexTrigrammes.depuis_base()
+    assert len(index.noms) == 6
+    assert index.rechercher("univrsity of tokio")[0].nom_univ == "University of Tokyo"
+
+
+def test_route_suggestions_faute_de_frappe(client, donnees):
+    reponse = client.get('/api/universites/suggestions?q=sorbone')
+    assert reponse.status_code == 200
+    assert reponse.get_json()[0]['nom_univ'] == "Sorbonne Universite"
+
+
+def test_route_liste_propose_une_correction(client, donnees):
+    reponse = client.get('/universites?nom=sorbone')
+    assert reponse.status_code == 200
+    assert "Sorbonne Universite" in reponse.get_data(as_text=True)